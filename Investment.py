@@ -6,10 +6,12 @@ Fixed Investment Tracker - Tkinter GUI
 - Auto-refresh controlled and safe
 - Thread stopped on close
 - Added Gold Investment tab
+- Gold tab generalized to a Commodities tab (batched pricing, one holdings file)
+- Direct-URL fetches share one pooled async quote engine
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import yfinance as yf
 import threading
 import time
@@ -23,193 +25,226 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 import pandas as pd
-import requests
 import webbrowser
-import random
+from quote_engine import get_engine, SEARCH_URL
+from metrics import registry, span, timed
+from market_data import fetch_price, fetch_quotes, fetch_history, fetch_closes, stream_quotes
+from watchlist import Watchlist
+from valuation import PositionBook, valuation_rows
+from ledger import TradeLedger
+from timeseries import align_closes, period_for_start
+from performance import performance_series
+from risk import risk_report
+from monte_carlo import calibrate, simulate_paths, summarize
+import backtest
+from commodities import COMMODITIES, CommodityBook, CommodityPrices, format_age
+from symbol_index import SymbolIndex, load_symbols
+from news_cache import NewsCache
+from earnings import EarningsCalendar
+from comparison import compare, VIEWS
+from indicators import IndicatorEngine, INDICATORS, BAR_MINUTES
+from chart_hover import HoverTooltip
+from live_chart import LiveChart
+from alerts import AlertBook, KINDS, describe
+import ui_watchdog
+from state_store import StateStore, load_json, save_json
+from fx import BASE, CURRENCIES, epoch_days, get_fx, money, reporting_currency, set_reporting_currency, unit
 
 # ---------------------------
 # Config / Constants
 # ---------------------------
 AUTO_REFRESH_SECONDS = 10
+AUTOCOMPLETE_DEBOUNCE_MS = 80
+BENCHMARK = "^GSPC"
+COMPARE_LEGEND_MAX = 12  # beyond this, label only the best and worst lines
+LIVE_INTERVALS = {"1m": "1d", "5m": "5d"}  # live chart interval -> history used to seed it
+LIVE_WINDOW = 390  # bars kept on a live chart (one session of 1m bars)
+LIVE_POLL_MS = 5000
 FAV_FILE = "favorites.json"
 PORT_FILE = "portfolio.json"
-GOLD_FILE = "gold_portfolio.json"
+COMM_FILE = "commodities.json"
+GOLD_FILE = "gold_portfolio.json"  # single-gold layout, migrated into COMM_FILE
+TRADES_FILE = "trades.json"
 POPULAR_TICKERS = [
     "AAPL", "MSFT", "TSLA", "GOOG", "AMZN", "NVDA", "META", "SPY", "QQQ", "AMD",
     "INTC", "NFLX", "BABA", "DIS", "V", "MA", "PYPL", "UBER", "LYFT", "KO", "PEP"
 ]
 
-# Gold price - will be fetched from API
-CURRENT_GOLD_PRICE = 4197.38  # Default value, will be updated
+# Commodity prices - fetched in one batch, USD per unit
+CURRENT_GOLD_PRICE = 4197.38  # used until the first gold quote arrives
+GOLD_TICKER = COMMODITIES["gold"]["ticker"]
+SIM_PATHS = 10000
 
-# Gold portfolio structure
-gold_portfolio = {
-    "balance": 0.0,
-    "gold_owned": 0.0,
-    "avg_purchase_price": 0.0
-}
+# favorites, portfolio, trades and commodities are saved in batches by a background writer
+store = StateStore()
 
 
 # ---------------------------
-# Helpers: Storage
+# Commodity Investment Functions
 # ---------------------------
-def load_json(path, default):
-    if os.path.exists(path):
+@timed("fetch.commodity_quotes")
+def _fetch_commodity_quotes(tickers):
+    """Quotes for every commodity future in one batch; metals.live backs up gold"""
+    quotes = fetch_quotes(tickers)
+    if GOLD_TICKER in quotes and not quotes[GOLD_TICKER]:
         try:
-            with open(path, "r") as f:
-                return json.load(f)
-        except Exception:
-            return default
-    return default
+            response = get_engine().session.get("https://api.metals.live/v1/spot/gold", timeout=5)
+            if response.status_code == 200:
+                data = response.json()
+                if data and data[0].get("price"):
+                    quotes[GOLD_TICKER] = {"symbol": GOLD_TICKER, "price": float(data[0]["price"]),
+                                           "prev_close": None}
+        except Exception as e:
+            print(f"Error fetching gold price: {e}")
+    return quotes
 
 
-def save_json(path, data):
-    try:
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2, default=str)
-    except Exception as e:
-        print("Failed to save", path, e)
+commodity_prices = CommodityPrices(_fetch_commodity_quotes, {"gold": CURRENT_GOLD_PRICE})
 
 
-# ---------------------------
-# Gold Investment Functions
-# ---------------------------
-def fetch_gold_price():
-    """Fetch current gold price from API"""
-    try:
-        # Try yahoo finance for gold (GC=F is gold futures)
-        gold_ticker = yf.Ticker("GC=F")
-        df = gold_ticker.history(period="1d")
-        if not df.empty:
-            return float(df["Close"].iloc[-1])
-
-        # Fallback to metals API
-        url = "https://api.metals.live/v1/spot/gold"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data and len(data) > 0:
-                return float(data[0].get("price", CURRENT_GOLD_PRICE))
-    except Exception as e:
-        print(f"Error fetching gold price: {e}")
+@timed("fetch.commodity_prices")
+def fetch_commodity_prices(keys=None):
+    """{key: USD price}: cached quotes, revalidated in the background"""
+    keys = list(keys or COMMODITIES)
+    ages = [commodity_prices.age(k) for k in keys]
+    if all(a is not None and a <= commodity_prices.ttl for a in ages):
+        registry.hit("fetch.commodity_prices")
+    else:
+        registry.miss("fetch.commodity_prices")
+    return commodity_prices.prices(keys)
 
-    return CURRENT_GOLD_PRICE  # Return default if API fails
 
+def commodity_prices_in(ccy, keys=None):
+    """{key: price per unit in ccy}; quotes are USD"""
+    rate = get_fx().rate(BASE, ccy)
+    return {k: p * rate for k, p in fetch_commodity_prices(keys).items()}
 
-def set_gold_balance(amount):
-    """Set starting balance for gold investment"""
+
+def set_commodity_balance(amount):
+    """Set the cash balance used to buy commodities"""
     try:
-        gold_portfolio["balance"] = float(amount)
-        save_json(GOLD_FILE, gold_portfolio)
-        return True, f"Balance set to ${gold_portfolio['balance']:.2f}"
+        amount = float(amount)
+        with store.edit(COMM_FILE):
+            commodity_book.set_balance(amount)
+        return True, f"Balance set to {money(commodity_book.balance, commodity_book.currency)}"
     except Exception as e:
         return False, f"Error: {str(e)}"
 
 
-def buy_gold(amount):
-    """Buy gold with specified amount"""
+def buy_commodity(key, amount):
+    """Buy a commodity with specified amount"""
     try:
         amount = float(amount)
-        if amount > gold_portfolio["balance"]:
-            return False, "Not enough balance."
-
-        current_price = fetch_gold_price()
-        gold_bought = amount / current_price
-        old_gold = gold_portfolio["gold_owned"]
-        old_price = gold_portfolio["avg_purchase_price"]
-
-        if old_gold == 0:
-            new_avg = current_price
-        else:
-            total_old = old_gold * old_price
-            new_avg = (total_old + amount) / (old_gold + gold_bought)
-
-        gold_portfolio["gold_owned"] += gold_bought
-        gold_portfolio["avg_purchase_price"] = new_avg
-        gold_portfolio["balance"] -= amount
-
-        save_json(GOLD_FILE, gold_portfolio)
-        return True, f"Bought {gold_bought:.4f} oz at ${current_price:.2f} per oz."
-
+        c = COMMODITIES[key]
+        ccy = commodity_book.currency
+        price = commodity_prices.trade_price(key) * get_fx().rate(BASE, ccy)
+        with store.edit(COMM_FILE):
+            units = commodity_book.buy(key, amount, price)
+        return True, f"Bought {units:.4f} {c['unit']} of {c['name']} at {money(price, ccy)} per {c['unit']}."
     except Exception as e:
         return False, f"Error: {str(e)}"
 
 
-def get_portfolio_summary():
-    """Get gold portfolio summary"""
-    current_price = fetch_gold_price()
-    gold = gold_portfolio["gold_owned"]
-
-    if gold == 0:
-        return (
-            f"Balance: ${gold_portfolio['balance']:.2f}\n"
-            f"Gold Owned: 0 oz\n"
-            f"Current Gold Price: ${current_price:.2f}\n"
-            f"Profit/Loss: $0.00 (0.00%)"
+def get_portfolio_summary(key=None):
+    """Commodity holdings summary (every holding valued from one batched price request)"""
+    ccy = commodity_book.currency
+    with store.lock:
+        held = commodity_book.held()
+    keys = held + [key] if key and key not in held else held
+    prices = commodity_prices_in(ccy, keys)
+    with store.lock:
+        s = commodity_book.summary(prices, held)
+    lines = [f"Balance: {money(s['totals']['balance'], ccy)}"]
+    if key:
+        c = COMMODITIES[key]
+        price = money(prices[key], ccy) if key in prices else "--"
+        lines.append(f"Current {c['name']} Price: {price} per {c['unit']}")
+    if not held:
+        lines.append("Holdings: none")
+    for i, k in enumerate(s["keys"]):
+        c = COMMODITIES[k]
+        lines.append(
+            f"{c['name']}: {s['qty'][i]:.4f} {c['unit']} @ {money(s['avg'][i], ccy)} avg | "
+            f"Value {money(s['value'][i], ccy)} | P/L {money(s['profit'][i], ccy)} ({s['pct'][i]:.2f}%)"
         )
-    else:
-        current_value = gold * current_price
-        profit = current_value - gold * gold_portfolio["avg_purchase_price"]
-        pct = (profit / (gold * gold_portfolio["avg_purchase_price"])) * 100 if gold_portfolio[
-                                                                                    "avg_purchase_price"] > 0 else 0
-
-        return (
-            f"Balance: ${gold_portfolio['balance']:.2f}\n"
-            f"Gold Owned: {gold:.4f} oz\n"
-            f"Avg Purchase Price: ${gold_portfolio['avg_purchase_price']:.2f}\n"
-            f"Current Gold Price: ${current_price:.2f}\n"
-            f"Current Value: ${current_value:.2f}\n"
-            f"Profit/Loss: ${profit:.2f} ({pct:.2f}%)"
-        )
-
-
-def simulate_and_sell_best(years):
-    """Simulate gold prices and sell at best year"""
+    t = s["totals"]
+    if held:
+        pct = t["profit"] / t["cost"] * 100 if t["cost"] > 0 else 0
+        lines.append(f"Holdings Value: {money(t['value'], ccy)}")
+        lines.append(f"Profit/Loss: {money(t['profit'], ccy)} ({pct:.2f}%)")
+        if t["unpriced"]:
+            lines.append("Not in totals (no price): " + ", ".join(COMMODITIES[k]["name"] for k in t["unpriced"]))
+    report = reporting_currency()
+    if report != ccy:
+        lines.append(f"Total in {report}: {money(t['total'] * get_fx().rate(ccy, report), report)}")
+    return "\n".join(lines)
+
+
+def run_commodity_simulation(key, years, n_paths=SIM_PATHS, method="gbm", seed=None, workers=1):
+    """Monte Carlo outcome distribution for one commodity holding"""
+    years = int(years)
+    if years < 1:
+        raise ValueError("Years must be at least 1")
+    start = commodity_prices.trade_price(key)  # the sale settles against this run
+    hist = fetch_history(COMMODITIES[key]["ticker"], period="10y")
+    params = calibrate(hist["Close"].to_numpy() if hist is not None else [])
+    paths = simulate_paths(start, years, int(n_paths), params, method=method, seed=seed, workers=workers)
+    # paths are in USD like the futures quotes; compare against the average cost in USD too
+    with store.lock:
+        qty, avg = commodity_book.holding(key)
+    avg_usd = avg * get_fx().rate(commodity_book.currency, BASE)
+    return summarize(paths, start, qty, avg_usd)
+
+
+def simulate_and_sell_best(key, years, sim=None, rate=None, **sim_options):
+    """Simulate a commodity's prices and sell it at the most likely best year (median price);
+    rate (book currency per USD) is fetched when not given"""
     try:
         years = int(years)
-        if gold_portfolio["gold_owned"] == 0:
-            return False, "You do not own any gold.", None
-
-        gold = gold_portfolio["gold_owned"]
-        avg_price = gold_portfolio["avg_purchase_price"]
-        future_price = fetch_gold_price()
-        best_year = (0, 0, -999999)  # (year, price, profit)
-        result_text = ""
-
-        for year in range(1, years + 1):
-            # Moderate yearly growth: +1% to +5%
-            change = random.uniform(0.01, 0.05)
-            future_price = round(future_price * (1 + change), 2)
-
-            value = gold * future_price
-            profit = value - gold * avg_price
-            pct = (profit / (gold * avg_price)) * 100 if avg_price > 0 else 0
-
+        c = COMMODITIES[key]
+        qty, avg_price = commodity_book.holding(key)
+        if qty == 0:
+            return False, f"You do not own any {c['name'].lower()}.", None
+
+        ccy = commodity_book.currency
+        if sim is None:
+            sim = run_commodity_simulation(key, years, **sim_options)
+        result_text = f"{c['name']}: {sim['paths']:,} simulated paths\n"
+
+        # simulated prices are USD; report and settle in the book's currency
+        if rate is None:
+            rate = get_fx().rate(BASE, ccy)
+        low, high = sim["fan"][0] * rate, sim["fan"][-1] * rate
+        for i, median in enumerate(sim["median_by_year"] * rate):
+            profit = qty * median - qty * avg_price
+            pct = (profit / (qty * avg_price)) * 100 if avg_price > 0 else 0
             result_text += (
-                f"Year {year}: Price = ${future_price:.2f} | "
-                f"Profit = ${profit:.2f} ({pct:.2f}%)\n"
+                f"Year {i + 1}: Median = {money(median, ccy)} "
+                f"(5-95%: {money(low[i], ccy)}-{money(high[i], ccy)}) | "
+                f"Profit = {money(profit, ccy)} ({pct:.2f}%)\n"
             )
 
-            if profit > best_year[2]:
-                best_year = (year, future_price, profit)
-
-        # Sell at best year
-        year, price, profit = best_year
-        cash = gold * price
-
-        gold_portfolio["balance"] += cash
-        gold_portfolio["gold_owned"] = 0
-        gold_portfolio["avg_purchase_price"] = 0
+        result_text += (
+            f"\nProbability of loss at year {sim['years']}: {sim['prob_loss_final'] * 100:.1f}%\n"
+            f"Probability even the best year loses: {sim['prob_loss_best'] * 100:.1f}%\n"
+            f"Expected best-sell year: {sim['best_year_mean']:.1f}\n"
+        )
 
-        save_json(GOLD_FILE, gold_portfolio)
+        # Sell at the year most paths peak in, at that year's median price
+        year = sim["best_year_mode"]
+        price = float(sim["median_by_year"][year - 1]) * rate
+        with store.edit(COMM_FILE):
+            qty, avg_price = commodity_book.holding(key)
+            cash = commodity_book.sell(key, price)
+        profit = cash - qty * avg_price
 
         final_message = (
             f"{result_text}\n"
             f"--- BEST YEAR TO SELL ---\n"
             f"Year: {year}\n"
-            f"Sell Price: ${price:.2f}\n"
-            f"Cash Received: ${cash:.2f}\n"
-            f"Profit: ${profit:.2f}"
+            f"Sell Price: {money(price, ccy)} per {c['unit']}\n"
+            f"Cash Received: {money(cash, ccy)}\n"
+            f"Profit: {money(profit, ccy)}"
         )
         return True, final_message, cash
 
@@ -220,18 +255,37 @@ def simulate_and_sell_best(years):
 # ---------------------------
 # App State
 # ---------------------------
+# Commodity holdings, migrating gold_portfolio.json on first run
+_comm = load_json(COMM_FILE, None)
+commodity_book = CommodityBook(_comm) if _comm is not None else CommodityBook.from_gold(load_json(GOLD_FILE, {}))
+
+# persisted documents are mutated only inside store.edit(...) (or under store.lock)
 state = {
-    "favorites": load_json(FAV_FILE, []),
-    "portfolio": load_json(PORT_FILE, {"cash": 10000.0, "positions": {}}),
-    "gold_portfolio": load_json(GOLD_FILE, gold_portfolio),
+    "favorites": store.register(FAV_FILE, load_json(FAV_FILE, [])),
+    "portfolio": store.register(PORT_FILE, load_json(PORT_FILE, {"cash": 10000.0, "positions": {}})),
+    "commodities": store.register(COMM_FILE, commodity_book.data),
     "mode": "light",
     "last_price": None,
     "auto_refresh": True,
     "_running": True,  # controls background threads
 }
 
-# Update gold_portfolio from saved state
-gold_portfolio.update(state["gold_portfolio"])
+
+def load_ledger():
+    """Load the trade ledger, migrating portfolio.json positions on first run"""
+    trades = load_json(TRADES_FILE, None)
+    if trades is not None:
+        return TradeLedger(trades)
+    positions = state["portfolio"].get("positions", {})
+    migrated = TradeLedger.from_positions(positions)
+    if positions:
+        save_json(TRADES_FILE, migrated.to_json())
+    return migrated
+
+
+ledger = load_ledger()
+store.register(TRADES_FILE, ledger.to_json)
+set_reporting_currency(state["portfolio"].get("reporting_currency") or BASE)
 
 
 # ---------------------------
@@ -240,182 +294,337 @@ gold_portfolio.update(state["gold_portfolio"])
 class AutocompleteEntry(ttk.Entry):
     def __init__(self, master=None, tickers=None, **kwargs):
         super().__init__(master, **kwargs)
-        self.tickers = sorted(set(tickers or []))
+        # small index over the given tickers until the full symbol master is loaded
+        self.index = SymbolIndex((t, "") for t in tickers or [])
         self.var = tk.StringVar()
         self.configure(textvariable=self.var)
         self.var.trace_add("write", self._on_change)
         self.listbox = None
+        self.lb_win = None
+        self._matches = []
+        self._pending = None
+        self._suppress = False
         self.master = master
-        # handle clicking elsewhere to hide
+        # handle clicking elsewhere to hide; keys move the highlight while focus stays here
         self.bind("<FocusOut>", lambda e: self._hide_listbox_delayed())
+        self.bind("<Down>", lambda e: self._move_selection(1))
+        self.bind("<Up>", lambda e: self._move_selection(-1))
+        self.bind("<Return>", self._on_return)
+        self.bind("<Escape>", lambda e: self.hide_listbox())
+
+    def set_index(self, index):
+        self.index = index
 
     def _on_change(self, *args):
-        val = self.var.get().upper().strip()
+        # debounce: only search once typing pauses
+        if self._suppress:
+            return
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(AUTOCOMPLETE_DEBOUNCE_MS, self._update_suggestions)
+
+    def _update_suggestions(self):
+        self._pending = None
+        val = self.var.get().strip()
         if val == "":
             self.hide_listbox()
             return
-        matches = [t for t in self.tickers if t.startswith(val)]
+        matches = self.index.search(val, limit=20)
         if not matches:
             self.hide_listbox()
             return
         self.show_listbox(matches)
 
     def show_listbox(self, matches):
-        # create listbox as a Toplevel so it floats above other widgets
+        # one floating Toplevel, created once and reused
         if self.listbox is None:
             self.lb_win = tk.Toplevel(self)
             self.lb_win.wm_overrideredirect(True)
-            self.listbox = tk.Listbox(self.lb_win, height=6)
+            self.listbox = tk.Listbox(self.lb_win, height=8, width=48, takefocus=0, exportselection=False)
             self.listbox.pack()
-            self.listbox.bind("<<ListboxSelect>>", self._on_select)
+            # accept on click only; highlighting a row doesn't fill the entry
+            self.listbox.bind("<ButtonRelease-1>", self._on_click)
+        self._matches = matches
         self.listbox.delete(0, tk.END)
-        for m in matches[:20]:
-            self.listbox.insert(tk.END, m)
+        for sym, name in matches:
+            self.listbox.insert(tk.END, f"{sym:8} {name}" if name else sym)
 
         # position under the entry
         x = self.winfo_rootx()
         y = self.winfo_rooty() + self.winfo_height()
         self.lb_win.geometry(f"+{x}+{y}")
         self.lb_win.deiconify()
+        self.lb_win.lift()
 
-    def _on_select(self, evt):
-        if not self.listbox: return
+    def _visible(self):
+        return self.lb_win is not None and self.lb_win.winfo_viewable()
+
+    def _move_selection(self, step):
+        if not self._visible():
+            return None
         sel = self.listbox.curselection()
-        if sel:
-            val = self.listbox.get(sel[0])
-            self.var.set(val)
+        i = max(0, min((sel[0] + step) if sel else 0, len(self._matches) - 1))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(i)
+        self.listbox.see(i)
+        return "break"
+
+    def _on_return(self, evt=None):
+        # accept the highlighted suggestion; other <Return> bindings (load ticker) still run
+        if self._visible() and self.listbox.curselection():
+            self._accept(self.listbox.curselection()[0])
+
+    def _on_click(self, evt):
+        self._accept(self.listbox.nearest(evt.y))
+        self.focus_set()
+
+    def _accept(self, i):
+        if 0 <= i < len(self._matches):
+            self._suppress = True
+            self.var.set(self._matches[i][0])
+            self._suppress = False
+            self.icursor(tk.END)
         self.hide_listbox()
 
     def hide_listbox(self):
-        if hasattr(self, "lb_win") and self.lb_win:
+        if self.lb_win is not None:
             try:
                 self.lb_win.withdraw()
-                self.lb_win.destroy()
             except Exception:
                 pass
-            self.listbox = None
-            self.lb_win = None
 
     def _hide_listbox_delayed(self):
-        # slight delay so double-clicks register
-        self.after(150, self.hide_listbox)
+        # slight delay so clicks on the popup register; keep it if focus went into the popup
+        def hide():
+            try:
+                focus = self.focus_get()
+            except Exception:
+                focus = None
+            if focus is None or self.lb_win is None or not str(focus).startswith(str(self.lb_win)):
+                self.hide_listbox()
+        self.after(150, hide)
 
 
 # ---------------------------
-# Networking / Data helpers
+# Analytics (prices come from market_data)
 # ---------------------------
-def fetch_price(ticker, timeout=6):
-    """Return float price or None"""
-    if not ticker:
+def compute_performance():
+    """Performance series for the ledger's history, benchmarked against BENCHMARK"""
+    with store.lock:
+        trades = list(ledger.trades)  # trades may land on the UI thread while this runs
+    if not trades:
         return None
-    try:
-        t = yf.Ticker(ticker)
-        # try historical closes (5d)
-        df = t.history(period="5d")
-        if isinstance(df, (pd.DataFrame,)) and not df.empty:
-            closes = df["Close"].dropna()
-            if not closes.empty:
-                return float(closes.iloc[-1])
-        # fallback: try fast_info safely
-        try:
-            fast = getattr(t, "fast_info", None)
-            if fast:
-                # fast_info might be a dict-like
-                if isinstance(fast, dict):
-                    p = fast.get("last_price")
-                else:
-                    p = getattr(fast, "get", lambda k, d=None: None)("last_price")
-                if p:
-                    return float(p)
-        except Exception:
-            pass
-        # last fallback: direct Yahoo chart API
-        try:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-            r = requests.get(url, timeout=timeout)
-            r.raise_for_status()
-            data = r.json()
-            return float(data["chart"]["result"][0]["meta"]["regularMarketPrice"])
-        except Exception:
-            return None
-    except Exception:
+    first = min(t["date"] for t in trades)
+    tickers = sorted({t["ticker"] for t in trades})
+    closes = fetch_closes(tickers + [BENCHMARK], period=period_for_start(first[:10]))
+    frame = align_closes(closes)
+    if frame.empty:
         return None
-
-
-def fetch_history(ticker, period="1y", interval="1d", timeout=8):
-    if not ticker:
+    bench = frame.pop(BENCHMARK) if BENCHMARK in frame else None
+    frame, trades = _in_reporting_currency(frame, trades)
+    return performance_series(trades, frame, bench)
+
+
+def _in_reporting_currency(frame, trades):
+    # closes and trade prices are in each ticker's own currency; convert both at each day's
+    # rate so values and cash flows add up in one currency
+    ccy, fx = reporting_currency(), get_fx()
+    ccys = {t: trade_currency(t) for t in set(frame.columns) | {tr["ticker"] for tr in trades}}
+    index = frame.index.tz_localize(None) if getattr(frame.index, "tz", None) else frame.index
+    days = epoch_days(index.normalize())
+    frame = frame.copy()
+    for t in frame.columns:
+        if unit(ccys[t]) != unit(ccy):
+            frame[t] = frame[t].to_numpy() * fx.rate(ccys[t], ccy, days)
+    trades = [dict(tr) for tr in trades]
+    for c in {ccys[tr["ticker"]] for tr in trades}:
+        if unit(c) == unit(ccy):
+            continue
+        rows = [tr for tr in trades if ccys[tr["ticker"]] == c]
+        rates = fx.rate(c, ccy, epoch_days([str(tr["date"])[:10] for tr in rows]))
+        for tr, r in zip(rows, rates):
+            tr["price"] = float(tr["price"] * r)
+    return frame, trades
+
+
+def compute_comparison(tickers, period="1y", benchmark=None):
+    """Aligned comparison views for tickers (see comparison.compare) or None"""
+    fetch = list(tickers) + ([benchmark] if benchmark and benchmark not in tickers else [])
+    frame = align_closes(fetch_closes(fetch, period=period))
+    if frame.empty:
         return None
-    try:
-        t = yf.Ticker(ticker)
-        df = t.history(period=period, interval=interval)
-        if df is None or df.empty:
-            return None
-        return df
-    except Exception:
+    result = compare(frame, benchmark)
+    result["missing"] = [t for t in tickers if t not in frame.columns]
+    return result
+
+
+def compute_risk(tickers, weights=None, period="5y"):
+    """(risk table, rolling correlation) for tickers against BENCHMARK"""
+    closes = fetch_closes(list(tickers) + [BENCHMARK], period=period)
+    frame = align_closes(closes)
+    if frame.empty:
+        return None, None
+    bench = frame.pop(BENCHMARK) if BENCHMARK in frame else None
+    if frame.empty:
+        return None, None
+    return risk_report(frame, bench, weights=weights)
+
+
+def run_backtest(tickers, strategy, amount, period="5y", frequency="monthly"):
+    """Backtest a strategy over cached daily closes; equal weights across tickers"""
+    frame = align_closes(fetch_closes(tickers, period=period)).dropna()
+    if frame.empty:
         return None
-
-
+    prices = frame.to_numpy()
+    every = backtest.FREQUENCIES[frequency]
+    if strategy == "Lump sum":
+        equity, flows = backtest.lump_sum(prices, amount)
+        labels = ["Lump sum"]
+    elif strategy == "DCA":
+        equity, flows = backtest.dca(prices, amount, every)
+        # same total money invested up front, for comparison
+        lump_eq, lump_flows = backtest.lump_sum(prices, flows.sum())
+        equity, flows = np.vstack([equity, lump_eq]), np.vstack([flows, lump_flows])
+        labels = [f"DCA {frequency}", "Lump sum (same total)"]
+    elif strategy == "Rebalance":
+        thresholds = [0.02, 0.05, 0.10, np.inf]
+        equity, flows = backtest.rebalance(prices, amount, thresholds)
+        labels = ["Band 2%", "Band 5%", "Band 10%", "Buy & hold"]
+    else:
+        equity, flows, labels = backtest.dca_sweep(prices, amount, start_step=5)
+    return {
+        "strategy": strategy,
+        "tickers": list(frame.columns),
+        "dates": frame.index,
+        "equity": equity,
+        "labels": labels,
+        "stats": backtest.summary(equity, flows),
+    }
+
+
+@timed("fetch.news")
 def fetch_news(ticker, timeout=6):
+    """News from yfinance and the Yahoo search endpoint (duplicates merged by the cache)"""
     if not ticker:
         return []
+    items = []
     try:
-        t = yf.Ticker(ticker)
-        news = getattr(t, "news", None)
-        items = []
-        if news:
-            for n in news[:10]:
-                title = n.get("title") or n.get("publisher") or "News"
-                link = n.get("link") or n.get("url") or None
-                items.append({"title": title, "link": link})
-        if not items:
-            url = f"https://query1.finance.yahoo.com/v1/finance/search?q={ticker}"
-            resp = requests.get(url, timeout=timeout).json()
-            for r in resp.get("news", [])[:10]:
-                items.append({"title": r.get("title"), "link": r.get("link")})
-        return items
-    except Exception:
-        return []
+        for n in yf.Ticker(ticker).news or []:
+            if not isinstance(n, dict):
+                continue
+            content = n.get("content") or {}
+            title = n.get("title") or n.get("headline") or content.get("title") or "Untitled Article"
+            link = n.get("link") or n.get("url") or content.get("clickThroughUrl") or None
+            if isinstance(link, dict):
+                link = link.get("url")
+            items.append({"title": title, "link": link})
+    except Exception as e:
+        print(f"Error fetching news: {e}")
+    try:
+        resp = get_engine().session.get(SEARCH_URL, params={"q": ticker}, timeout=timeout).json()
+        for r in resp.get("news", [])[:10]:
+            items.append({"title": r.get("title") or "Untitled Article", "link": r.get("link") or r.get("url")})
+    except Exception as e:
+        print(f"Error fetching alternative news: {e}")
+    return items
+
+
+news_cache = NewsCache(fetch_news, store=store)
 
 
 def fetch_earnings_calendar(ticker):
+    """Calendar as {field: value or [values]}; newer yfinance returns a dict, older a DataFrame"""
     if not ticker:
         return None
     try:
         t = yf.Ticker(ticker)
         cal = getattr(t, "calendar", None)
-        if cal is None or cal.empty:
+        if cal is None or len(cal) == 0:
             return None
-        return cal.to_dict()
+        if isinstance(cal, dict):
+            return cal
+        if "Earnings Date" not in cal.index and "Earnings Date" in cal.columns:
+            cal = cal.T
+        return {str(k): [v for v in row if pd.notna(v)] for k, row in zip(cal.index, cal.values.tolist())}
     except Exception:
         return None
 
 
+earnings = EarningsCalendar(fetch_earnings_calendar)
+alerts = AlertBook()
+
+
+def earnings_watch_tickers():
+    """Holdings and favorites, the tickers the earnings calendar tracks"""
+    return list(dict.fromkeys(list(state["portfolio"].get("positions", {})) + list(state["favorites"])))
+
+
 # ---------------------------
 # Portfolio
 # ---------------------------
-def portfolio_buy(ticker, qty, price):
+def _sync_position(ticker, currency=None):
+    # positions in portfolio.json are a view of the ledger's open lots
     p = state["portfolio"]
-    cost = qty * price
-    if cost > p["cash"]:
-        raise Exception("Not enough cash")
-    p["cash"] -= cost
-    pos = p["positions"].setdefault(ticker, {"qty": 0, "avg": 0.0})
-    total_shares = pos["qty"] + qty
-    pos["avg"] = (pos["avg"] * pos["qty"] + price * qty) / total_shares if total_shares > 0 else 0.0
-    pos["qty"] = total_shares
-    save_json(PORT_FILE, p)
-
-
-def portfolio_sell(ticker, qty, price):
+    qty, avg = ledger.position(ticker)
+    if qty > 0:
+        currency = currency or p["positions"].get(ticker, {}).get("currency") or BASE
+        p["positions"][ticker] = {"qty": qty, "avg": avg, "currency": currency}
+    else:
+        p["positions"].pop(ticker, None)
+
+
+def portfolio_buy(ticker, qty, price, currency=None, rate=1.0):
+    """Buy at price (in the ticker's currency); rate converts it to the cash currency"""
     p = state["portfolio"]
-    pos = p["positions"].get(ticker)
-    if not pos or pos["qty"] < qty:
-        raise Exception("Not enough shares")
-    pos["qty"] -= qty
-    p["cash"] += qty * price
-    if pos["qty"] == 0:
-        del p["positions"][ticker]
-    save_json(PORT_FILE, p)
+    cost = qty * price * rate
+    with store.edit(TRADES_FILE, PORT_FILE):
+        if cost > p["cash"]:
+            raise Exception("Not enough cash")
+        currency = currency or trade_currency(ticker)
+        ledger.record("buy", ticker, qty, price, currency=currency)
+        p["cash"] -= cost
+        _sync_position(ticker, currency)
+
+
+def portfolio_sell(ticker, qty, price, method="fifo", lot_ids=None, rate=1.0):
+    p = state["portfolio"]
+    with store.edit(TRADES_FILE, PORT_FILE):
+        pos = p["positions"].get(ticker)
+        if not pos or pos["qty"] < qty:
+            raise Exception("Not enough shares")
+        ledger.record("sell", ticker, qty, price, method=method, lot_ids=lot_ids,
+                      currency=pos.get("currency") or trade_currency(ticker))
+        p["cash"] += qty * price * rate
+        _sync_position(ticker)
+
+
+def trade_currency(ticker):
+    """Currency a ticker's trades are priced in: the ledger's record, else the position's, else USD"""
+    pos = state["portfolio"].get("positions", {}).get(ticker, {})
+    return ledger.currency(ticker) or pos.get("currency") or BASE
+
+
+def gains_report(prices, rates=None, currency=None):
+    """Realized and unrealized gains per ticker in currency (default: reporting currency);
+    prices is {ticker: price in its own currency}, rates {ccy: units of currency per unit}.
+    Missing rates are fetched, so call it off the Tk thread"""
+    currency = currency or reporting_currency()
+    with store.lock:
+        tickers = sorted(set(ledger.realized) | set(ledger.tickers()))
+        ccys = {t: trade_currency(t) for t in tickers}
+    rates = dict(rates or {})
+    missing = set(ccys.values()) - set(rates)
+    if missing:
+        rates.update(get_fx().rates(missing, currency))  # outside the lock: may be a network call
+    rows = []
+    with store.lock:
+        for t in tickers:
+            rate = rates[ccys[t]]
+            realized = ledger.realized_gains(t)["gain"] * rate
+            price = prices.get(t)
+            unrealized = ledger.unrealized_gains(t, price)["gain"] * rate if price is not None else None
+            rows.append({"ticker": t, "realized": realized, "unrealized": unrealized, "currency": currency})
+    return rows
 
 
 # ---------------------------
@@ -432,8 +641,16 @@ class InvestmentApp:
         self._chart_canvas = None
         self._chart_fig = None
         self._ticker = None
+        self.indicators = IndicatorEngine()
+        self._chart_live = None  # (ticker, {series name: Line2D}) for the chart live ticks extend
+        self.watchlist = Watchlist()
+        self._watch_pending = False
 
         self._build_ui()
+        self._watch_tick()
+        self._prefetch_news()
+        self._seed_alert_mas()
+        threading.Thread(target=self._load_symbol_index, daemon=True).start()
 
         # Start background refresh thread (daemon)
         self._refresh_thread = threading.Thread(target=self._auto_refresh_loop, daemon=True)
@@ -447,7 +664,7 @@ class InvestmentApp:
         self.ticker_entry = AutocompleteEntry(top, tickers=POPULAR_TICKERS, width=12)
         self.ticker_entry.pack(side=tk.LEFT)
         # enter key -> load ticker
-        self.ticker_entry.bind("<Return>", lambda e: self.load_ticker())
+        self.ticker_entry.bind("<Return>", lambda e: self.load_ticker(), add="+")
 
         ttk.Button(top, text="Get Price", command=self.load_ticker).pack(side=tk.LEFT, padx=6)
         ttk.Button(top, text="Add Favorite", command=self.add_favorite).pack(side=tk.LEFT)
@@ -458,12 +675,29 @@ class InvestmentApp:
 
         ttk.Button(top, text="Portfolio", command=self.open_portfolio_dialog).pack(side=tk.LEFT, padx=6)
         ttk.Button(top, text="Compare Multi", command=self.open_compare_dialog).pack(side=tk.LEFT)
-
-        # Left: favorites
+        ttk.Button(top, text="Alerts", command=self.open_alerts_dialog).pack(side=tk.LEFT, padx=6)
+        ttk.Button(top, text="Diagnostics", command=self.open_diagnostics).pack(side=tk.LEFT)
+        ttk.Label(top, text="Currency:").pack(side=tk.LEFT, padx=(8, 2))
+        self.currency_box = ttk.Combobox(top, values=list(CURRENCIES), width=5, state="readonly")
+        self.currency_box.set(reporting_currency())
+        self.currency_box.pack(side=tk.LEFT)
+        self.currency_box.bind("<<ComboboxSelected>>", lambda e: self.set_currency(self.currency_box.get()))
+
+        # Left: favorites (live watchlist)
         left = ttk.Frame(self.root, width=180)
         left.pack(side=tk.LEFT, fill=tk.Y, padx=6, pady=6)
         ttk.Label(left, text="Favorites").pack(anchor=tk.NW)
-        self.fav_list = tk.Listbox(left, height=20)
+        self.fav_list = ttk.Treeview(left, columns=("price", "change", "trend"), height=20)
+        self.fav_list.heading("#0", text="Ticker")
+        self.fav_list.heading("price", text="Price")
+        self.fav_list.heading("change", text="Change")
+        self.fav_list.heading("trend", text="Trend")
+        self.fav_list.column("#0", width=70, stretch=False)
+        self.fav_list.column("price", width=80, anchor=tk.E, stretch=False)
+        self.fav_list.column("change", width=120, anchor=tk.E, stretch=False)
+        self.fav_list.column("trend", width=150, stretch=False)
+        self.fav_list.tag_configure("up", foreground="green")
+        self.fav_list.tag_configure("down", foreground="red")
         self.fav_list.pack(fill=tk.BOTH, expand=True)
         self.fav_list.bind("<Double-Button-1>", lambda e: self._load_selected_favorite())
         self._refresh_fav_list()
@@ -492,10 +726,28 @@ class InvestmentApp:
         self.period_combo.set("1y");
         self.period_combo.pack(side=tk.LEFT, padx=4)
         ttk.Label(chart_controls, text="Interval:").pack(side=tk.LEFT, padx=(8, 0))
-        self.interval_combo = ttk.Combobox(chart_controls, values=["1d", "1wk", "1mo", "1h"], width=6)
+        self.interval_combo = ttk.Combobox(chart_controls, values=["1d", "1wk", "1mo", "1h", "5m", "1m"], width=6)
         self.interval_combo.set("1d");
         self.interval_combo.pack(side=tk.LEFT, padx=4)
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(chart_controls, text="Live", variable=self.live_var).pack(side=tk.LEFT, padx=(6, 0))
         ttk.Button(chart_controls, text="Show Chart", command=self.show_chart).pack(side=tk.LEFT, padx=6)
+        ttk.Button(chart_controls, text="Risk", command=self.show_compare_risk).pack(side=tk.LEFT)
+        ttk.Label(chart_controls, text="Compare view:").pack(side=tk.LEFT, padx=(8, 0))
+        self.compare_view = ttk.Combobox(chart_controls, values=list(VIEWS), width=16, state="readonly")
+        self.compare_view.set(VIEWS[0])
+        self.compare_view.pack(side=tk.LEFT, padx=4)
+        self.compare_view.bind("<<ComboboxSelected>>", lambda e: self._plot_comparison())
+        ind_btn = ttk.Menubutton(chart_controls, text="Indicators")
+        ind_menu = tk.Menu(ind_btn, tearoff=0)
+        self.ind_vars = {}
+        for name in INDICATORS:
+            self.ind_vars[name] = tk.BooleanVar(value=name in ("SMA 20", "SMA 50"))
+            ind_menu.add_checkbutton(label=name, variable=self.ind_vars[name], command=self._replot_chart)
+        ind_btn["menu"] = ind_menu
+        ind_btn.pack(side=tk.LEFT, padx=(8, 0))
+        self.ind_label = ttk.Label(self.tab_chart, text="", font=("Courier New", 9))
+        self.ind_label.pack(fill=tk.X, padx=6)
         self.chart_frame = ttk.Frame(self.tab_chart)
         self.chart_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -506,10 +758,10 @@ class InvestmentApp:
         self.market_text = tk.Text(self.tab_market, height=15)
         self.market_text.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
 
-        # Gold Investment Tab
-        self.tab_gold = ttk.Frame(self.nb)
-        self.nb.add(self.tab_gold, text="Gold Investment")
-        self._build_gold_tab()
+        # Commodities Tab
+        self.tab_commodities = ttk.Frame(self.nb)
+        self.nb.add(self.tab_commodities, text="Commodities")
+        self._build_commodity_tab()
 
         # Tips & Tricks tab
         self.tab_tips = ttk.Frame(self.nb)
@@ -530,6 +782,7 @@ class InvestmentApp:
         # Text widget with spacing
         txt = tk.Text(
             tips_frame,
+            height=10,
             font=("Segoe UI", 12),
             spacing1=10,  # space above each line
             spacing2=4,  # space between wrapped lines
@@ -544,6 +797,8 @@ class InvestmentApp:
         # Make read-only
         txt.config(state="disabled")
 
+        self._build_backtest_panel(tips_frame)
+
         # News Tab
         self.tab_news = ttk.Frame(self.nb)
         self.nb.add(self.tab_news, text="News")
@@ -579,41 +834,51 @@ class InvestmentApp:
         self.status = ttk.Label(self.root, text="Ready", anchor=tk.W)
         self.status.pack(side=tk.BOTTOM, fill=tk.X)
 
-    def _build_gold_tab(self):
-        """Build the Gold Investment tab interface"""
+    def _build_commodity_tab(self):
+        """Build the Commodities tab interface"""
         # Main container with padding
-        main_frame = ttk.Frame(self.tab_gold, padding=20)
+        main_frame = ttk.Frame(self.tab_commodities, padding=20)
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # Title
-        title_label = ttk.Label(main_frame, text="Gold Investment System", font=("Arial", 16, "bold"))
+        title_label = ttk.Label(main_frame, text="Commodity Investment System", font=("Arial", 16, "bold"))
         title_label.pack(pady=(0, 20))
 
-        # Current Gold Price Display
+        # Commodity picker and its current price
         price_frame = ttk.Frame(main_frame)
         price_frame.pack(fill=tk.X, pady=(0, 20))
 
-        self.gold_price_label = ttk.Label(
+        names = [c["name"] for c in COMMODITIES.values()]
+        self.comm_choice = ttk.Combobox(price_frame, values=names, width=18, state="readonly")
+        self.comm_choice.set(COMMODITIES["gold"]["name"])
+        self.comm_choice.bind("<<ComboboxSelected>>", lambda e: self._on_commodity_selected())
+        self.comm_choice.pack(pady=(0, 5))
+
+        self.comm_price_label = ttk.Label(
             price_frame,
             text="Current Gold Price: $--",
             font=("Arial", 12, "bold")
         )
-        self.gold_price_label.pack()
+        self.comm_price_label.pack()
 
-        ttk.Button(price_frame, text="Refresh Gold Price", command=self.refresh_gold_price).pack(pady=5)
+        ttk.Button(price_frame, text="Refresh Prices", command=self.refresh_commodity_prices).pack(pady=5)
+        self.comm_alerts_button = ttk.Button(price_frame, text=f"Gold Alerts ({GOLD_TICKER})",
+                                             command=lambda: self.open_alerts_dialog(
+                                                 COMMODITIES[self._commodity_key()]["ticker"]))
+        self.comm_alerts_button.pack()
 
         # Portfolio Summary Display
         summary_frame = ttk.Frame(main_frame, relief="groove", borderwidth=2)
         summary_frame.pack(fill=tk.X, pady=(0, 20), padx=20)
 
-        self.gold_summary_label = ttk.Label(
+        self.comm_summary_label = ttk.Label(
             summary_frame,
             text="Load your portfolio to see summary...",
             font=("Arial", 10),
-            wraplength=400,
+            wraplength=600,
             justify="left"
         )
-        self.gold_summary_label.pack(padx=10, pady=10)
+        self.comm_summary_label.pack(padx=10, pady=10)
 
         # Balance Section
         balance_frame = ttk.LabelFrame(main_frame, text="Set Balance", padding=10)
@@ -622,16 +887,16 @@ class InvestmentApp:
         ttk.Label(balance_frame, text="Starting Balance ($):").grid(row=0, column=0, padx=(0, 5), sticky="w")
         self.balance_entry = ttk.Entry(balance_frame, width=15)
         self.balance_entry.grid(row=0, column=1, padx=(0, 10))
-        ttk.Button(balance_frame, text="Set Balance", command=self.set_gold_balance).grid(row=0, column=2)
+        ttk.Button(balance_frame, text="Set Balance", command=self.set_commodity_balance).grid(row=0, column=2)
 
-        # Buy Gold Section
-        buy_frame = ttk.LabelFrame(main_frame, text="Buy Gold", padding=10)
-        buy_frame.pack(fill=tk.X, pady=(0, 10))
+        # Buy Section
+        self.comm_buy_frame = ttk.LabelFrame(main_frame, text="Buy Gold", padding=10)
+        self.comm_buy_frame.pack(fill=tk.X, pady=(0, 10))
 
-        ttk.Label(buy_frame, text="Amount to Invest ($):").grid(row=0, column=0, padx=(0, 5), sticky="w")
-        self.buy_entry = ttk.Entry(buy_frame, width=15)
+        ttk.Label(self.comm_buy_frame, text="Amount to Invest ($):").grid(row=0, column=0, padx=(0, 5), sticky="w")
+        self.buy_entry = ttk.Entry(self.comm_buy_frame, width=15)
         self.buy_entry.grid(row=0, column=1, padx=(0, 10))
-        ttk.Button(buy_frame, text="Buy Gold", command=self.buy_gold).grid(row=0, column=2)
+        ttk.Button(self.comm_buy_frame, text="Buy", command=self.buy_commodity).grid(row=0, column=2)
 
         # Simulation Section
         sim_frame = ttk.LabelFrame(main_frame, text="Simulation & Auto-Sell", padding=10)
@@ -642,18 +907,60 @@ class InvestmentApp:
         self.sim_years_entry.grid(row=0, column=1, padx=(0, 10))
         ttk.Button(sim_frame, text="Simulate & Auto-Sell Best Year",
                    command=self.simulate_and_sell).grid(row=0, column=2)
+        ttk.Label(sim_frame, text="Paths:").grid(row=1, column=0, padx=(0, 5), pady=(6, 0), sticky="w")
+        self.sim_paths_entry = ttk.Entry(sim_frame, width=10)
+        self.sim_paths_entry.insert(0, str(SIM_PATHS))
+        self.sim_paths_entry.grid(row=1, column=1, padx=(0, 10), pady=(6, 0))
+        self.sim_model = ttk.Combobox(sim_frame, values=["gbm", "bootstrap"], width=10, state="readonly")
+        self.sim_model.set("gbm")
+        self.sim_model.grid(row=1, column=2, pady=(6, 0), sticky="w")
 
         # Action Buttons
         action_frame = ttk.Frame(main_frame)
         action_frame.pack(pady=20)
 
         ttk.Button(action_frame, text="View Portfolio",
-                   command=self.view_gold_portfolio).pack(side=tk.LEFT, padx=5)
+                   command=self.view_commodity_portfolio).pack(side=tk.LEFT, padx=5)
         ttk.Button(action_frame, text="Reset Portfolio",
-                   command=self.reset_gold_portfolio).pack(side=tk.LEFT, padx=5)
-
-        # Initialize gold price display
-        self.refresh_gold_price()
+                   command=self.reset_commodity_portfolio).pack(side=tk.LEFT, padx=5)
+
+        # Fan chart of the last simulation
+        self.comm_chart_frame = ttk.Frame(main_frame)
+        self.comm_chart_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Initialize price display
+        self.refresh_commodity_prices()
+        self._commodity_age_tick()
+
+    def _build_backtest_panel(self, parent):
+        """Strategy backtester under the tips"""
+        frame = ttk.LabelFrame(parent, text="Test a Strategy", padding=10)
+        frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+
+        controls = ttk.Frame(frame)
+        controls.pack(fill=tk.X)
+        ttk.Label(controls, text="Tickers:").pack(side=tk.LEFT)
+        self.bt_tickers = ttk.Entry(controls, width=18)
+        self.bt_tickers.insert(0, f"SPY,{GOLD_TICKER}")
+        self.bt_tickers.pack(side=tk.LEFT, padx=4)
+        ttk.Label(controls, text="Amount ($):").pack(side=tk.LEFT, padx=(8, 0))
+        self.bt_amount = ttk.Entry(controls, width=8)
+        self.bt_amount.insert(0, "500")
+        self.bt_amount.pack(side=tk.LEFT, padx=4)
+        self.bt_period = ttk.Combobox(controls, values=["1y", "2y", "5y", "10y"], width=5, state="readonly")
+        self.bt_period.set("5y")
+        self.bt_period.pack(side=tk.LEFT, padx=4)
+        self.bt_strategy = ttk.Combobox(controls, values=["Lump sum", "DCA", "Rebalance", "DCA sweep"],
+                                        width=11, state="readonly")
+        self.bt_strategy.set("DCA")
+        self.bt_strategy.pack(side=tk.LEFT, padx=4)
+        self.bt_frequency = ttk.Combobox(controls, values=list(backtest.FREQUENCIES), width=9, state="readonly")
+        self.bt_frequency.set("monthly")
+        self.bt_frequency.pack(side=tk.LEFT, padx=4)
+        ttk.Button(controls, text="Run Backtest", command=self.run_backtest).pack(side=tk.LEFT, padx=6)
+
+        self.bt_result = tk.Text(frame, height=8, font=("Courier New", 10), state="disabled")
+        self.bt_result.pack(fill=tk.BOTH, expand=True, pady=(8, 0))
 
     def _generate_market_sentiment(self, lines):
         ups = sum("▲" in line for line in lines)
@@ -667,87 +974,180 @@ class InvestmentApp:
             return "Markets are mixed with no clear direction."
 
     # -------------------------
-    # Gold Investment Methods
+    # Commodity Investment Methods
     # -------------------------
-    def refresh_gold_price(self):
-        """Fetch and display current gold price"""
+    def _commodity_key(self):
+        name = self.comm_choice.get()
+        return next((k for k, c in COMMODITIES.items() if c["name"] == name), "gold")
+
+    def _on_commodity_selected(self):
+        key = self._commodity_key()
+        c = COMMODITIES[key]
+        self.comm_alerts_button.config(text=f"{c['name']} Alerts ({c['ticker']})")
+        self.comm_buy_frame.config(text=f"Buy {c['name']}")
+        self._update_commodity_price_display()
+        self.view_commodity_portfolio()
+
+    def refresh_commodity_prices(self):
+        """Fetch every commodity price in one batch and update the display"""
 
         def bg_task():
-            price = fetch_gold_price()
-            self.root.after(0, lambda: self._update_gold_price_display(price))
+            # wait for the new quotes (on this thread, not the UI) before redrawing the label
+            commodity_prices.fetch_now()
+            self.root.after(0, self._update_commodity_price_display)
 
         threading.Thread(target=bg_task, daemon=True).start()
 
-    def _update_gold_price_display(self, price):
-        """Update gold price label on UI thread"""
-        self.gold_price_label.config(text=f"Current Gold Price: ${price:,.2f}")
+    def _update_commodity_price_display(self):
+        """Update the selected commodity's price label (with quote age) on UI thread"""
+        c = COMMODITIES[self._commodity_key()]
+        q = commodity_prices.quote(self._commodity_key())
+        if q["price"] is None:
+            self.comm_price_label.config(text=f"Current {c['name']} Price: $-- (no quote yet)", foreground="black")
+            return
+        if q["source"] == "default":
+            note = "default - no live quote"
+        else:
+            note = f"updated {format_age(q['age'])}" + (" - stale" if q["stale"] else "")
+        self.comm_price_label.config(text=f"Current {c['name']} Price: ${q['price']:,.2f}/{c['unit']} ({note})",
+                                     foreground="red" if q["stale"] else "black")
 
-    def set_gold_balance(self):
-        """Set starting balance for gold investment"""
+    def _commodity_age_tick(self):
+        # keep the age text current; also picks up background refreshes
+        if not state.get("_running", True):
+            return
+        self._update_commodity_price_display()
+        self.root.after(5000, self._commodity_age_tick)
+
+    def set_commodity_balance(self):
+        """Set the cash balance used to buy commodities"""
         amount = self.balance_entry.get()
         if not amount:
             messagebox.showerror("Error", "Please enter a balance amount.")
             return
 
-        success, msg = set_gold_balance(amount)
+        success, msg = set_commodity_balance(amount)
         if success:
             messagebox.showinfo("Success", msg)
-            self.view_gold_portfolio()
+            self.view_commodity_portfolio()
         else:
             messagebox.showerror("Error", msg)
 
-    def buy_gold(self):
-        """Buy gold with specified amount"""
+    def buy_commodity(self):
+        """Buy the selected commodity with specified amount"""
         amount = self.buy_entry.get()
         if not amount:
             messagebox.showerror("Error", "Please enter an amount to invest.")
             return
+        key = self._commodity_key()
+
+        def bg():
+            # the price may need a network round trip; keep it off the Tk thread
+            success, msg = buy_commodity(key, amount)
+            self.root.after(0, lambda: self._finish_buy(key, success, msg))
+
+        threading.Thread(target=bg, daemon=True).start()
 
-        success, msg = buy_gold(amount)
+    def _finish_buy(self, key, success, msg):
         if success:
-            messagebox.showinfo("Gold Purchased", msg)
-            self.view_gold_portfolio()
+            messagebox.showinfo(f"{COMMODITIES[key]['name']} Purchased", msg)
+            self.view_commodity_portfolio()
         else:
             messagebox.showerror("Error", msg)
 
-    def view_gold_portfolio(self):
-        """Display gold portfolio summary"""
-        summary = get_portfolio_summary()
-        self.gold_summary_label.config(text=summary)
+    def view_commodity_portfolio(self):
+        """Display the commodity holdings summary"""
+        key = self._commodity_key()
+
+        def bg():
+            summary = get_portfolio_summary(key)
+            self.root.after(0, lambda: self.comm_summary_label.config(text=summary))
+
+        threading.Thread(target=bg, daemon=True).start()
 
     def simulate_and_sell(self):
-        """Run simulation and auto-sell at best year"""
+        """Run simulation for the selected commodity and auto-sell at best year"""
         years = self.sim_years_entry.get()
         if not years:
             messagebox.showerror("Error", "Please enter number of years to simulate.")
             return
+        key = self._commodity_key()
+        c = COMMODITIES[key]
+        if commodity_book.holding(key)[0] == 0:
+            messagebox.showerror("Error", f"You do not own any {c['name'].lower()}.")
+            return
+        try:
+            n_paths = int(self.sim_paths_entry.get() or SIM_PATHS)
+        except ValueError:
+            messagebox.showerror("Error", "Paths must be a whole number.")
+            return
+        method = self.sim_model.get()
+        self._set_status(f"Simulating {n_paths:,} {c['name'].lower()} price paths...")
+
+        def bg():
+            try:
+                sim = run_commodity_simulation(key, years, n_paths=n_paths, method=method)
+                rate = get_fx().rate(BASE, commodity_book.currency)  # here, not on the Tk thread
+            except Exception as e:
+                self.root.after(0, lambda err=e: messagebox.showerror("Error", f"Error: {err}"))
+                return
+            self.root.after(0, lambda: self._finish_simulation(key, years, sim, rate))
 
-        success, msg, cash = simulate_and_sell_best(years)
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _finish_simulation(self, key, years, sim, rate):
+        self._plot_commodity_fan(key, sim)
+        success, msg, cash = simulate_and_sell_best(key, years, sim=sim, rate=rate)
+        self._set_status("Simulation complete")
         if success:
             messagebox.showinfo("Simulation Complete", msg)
-            self.view_gold_portfolio()
+            self.view_commodity_portfolio()
         else:
             messagebox.showerror("Error", msg)
 
-    def reset_gold_portfolio(self):
-        """Reset gold portfolio to initial state"""
-        if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset your gold portfolio?"):
-            gold_portfolio.update({
-                "balance": 0.0,
-                "gold_owned": 0.0,
-                "avg_purchase_price": 0.0
-            })
-            save_json(GOLD_FILE, gold_portfolio)
-            messagebox.showinfo("Success", "Gold portfolio reset successfully.")
-            self.view_gold_portfolio()
+    def _plot_commodity_fan(self, key, sim):
+        c = COMMODITIES[key]
+        for w in self.comm_chart_frame.winfo_children():
+            w.destroy()
+        fig = plt.Figure(figsize=(6, 2.6))
+        ax = fig.add_subplot(111)
+        x = np.arange(sim["years"] + 1)
+        fan = np.hstack([np.full((len(sim["fan"]), 1), sim["start_price"]), sim["fan"]])
+        ax.fill_between(x, fan[0], fan[-1], alpha=0.2, color="goldenrod", label="5-95%")
+        ax.fill_between(x, fan[1], fan[-2], alpha=0.4, color="goldenrod", label="25-75%")
+        ax.plot(x, fan[2], color="darkgoldenrod", linewidth=2, label="Median")
+        ax.set_xlabel("Year")
+        ax.set_ylabel(f"{c['name']} price ($/{c['unit']})")
+        ax.set_title(f"{sim['paths']:,} simulated paths")
+        ax.legend(fontsize=8, loc="upper left")
+        ax.grid(True)
+        fig.tight_layout()
+        canvas = FigureCanvasTkAgg(fig, master=self.comm_chart_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        with span("render.commodity_fan", commodity=key):
+            canvas.draw()
+
+    def reset_commodity_portfolio(self):
+        """Reset commodity holdings and balance to initial state"""
+        if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset your commodity portfolio?"):
+            with store.edit(COMM_FILE):
+                commodity_book.reset()
+            messagebox.showinfo("Success", "Commodity portfolio reset successfully.")
+            self.view_commodity_portfolio()
 
     # -------------------------
     # Favorites
     # -------------------------
     def _refresh_fav_list(self):
-        self.fav_list.delete(0, tk.END)
+        # sync rows with the favorites list; existing rows keep their live values.
+        # Alert tickers are polled too, but only favorites get a row
+        self.watchlist.sync(list(state["favorites"]) + alerts.tickers())
+        for iid in self.fav_list.get_children():
+            if iid not in state["favorites"]:
+                self.fav_list.delete(iid)
         for f in state["favorites"]:
-            self.fav_list.insert(tk.END, f)
+            if not self.fav_list.exists(f):
+                self.fav_list.insert("", tk.END, iid=f, text=f, values=("--", "--", ""))
 
     def add_favorite(self):
         t = self.ticker_entry.var.get().upper().strip()
@@ -757,24 +1157,26 @@ class InvestmentApp:
         if t in state["favorites"]:
             messagebox.showinfo("Info", "Already in favorites")
             return
-        state["favorites"].append(t)
-        save_json(FAV_FILE, state["favorites"])
+        with store.edit(FAV_FILE):
+            state["favorites"].append(t)
         self._refresh_fav_list()
+        news_cache.prefetch([t])
+        earnings.refresh_async([t])
 
     def remove_favorite(self):
         t = self.ticker_entry.var.get().upper().strip()
         if t in state["favorites"]:
-            state["favorites"].remove(t)
-            save_json(FAV_FILE, state["favorites"])
+            with store.edit(FAV_FILE):
+                state["favorites"].remove(t)
             self._refresh_fav_list()
         else:
             messagebox.showinfo("Info", "Ticker not in favorites")
 
     def _load_selected_favorite(self):
-        sel = self.fav_list.curselection()
+        sel = self.fav_list.selection()
         if not sel:
             return
-        t = self.fav_list.get(sel[0])
+        t = sel[0]
         self.ticker_entry.var.set(t)
         self.load_ticker()
 
@@ -799,6 +1201,62 @@ class InvestmentApp:
             except Exception:
                 time.sleep(AUTO_REFRESH_SECONDS)
 
+    def _prefetch_news(self):
+        # warm the news cache for favorites and holdings in the background
+        news_cache.prefetch(list(state["favorites"]) + list(state["portfolio"].get("positions", {})))
+
+    def _load_symbol_index(self):
+        # building the full index takes a moment; swap it in when ready
+        extra = POPULAR_TICKERS + list(state["favorites"]) + [GOLD_TICKER]
+        index = SymbolIndex(load_symbols(extra=extra))
+        self.root.after(0, lambda: self.ticker_entry.set_index(index))
+
+    # -------------------------
+    # Watchlist (favorites) polling
+    # -------------------------
+    def _window_hidden(self):
+        try:
+            top = self.root.winfo_toplevel()
+            return not top.winfo_viewable() or top.state() == "iconic"
+        except Exception:
+            return False
+
+    def _watch_tick(self):
+        # runs on UI thread; polls only the favorites that are due, in one batch
+        if not state.get("_running", True):
+            return
+        if state.get("auto_refresh", True) and not self._watch_pending:
+            due = self.watchlist.due()
+            if due:
+                self._watch_pending = True
+                engine = get_engine()
+                engine.deliver(self.root, engine.quotes(due), self._on_watch_quotes,
+                               lambda e: self._on_watch_failed(due, e))
+        wait = self.watchlist.seconds_until_due()
+        wait = 1.0 if wait is None else min(max(wait, 0.5), 5.0)
+        self.root.after(int(wait * 1000), self._watch_tick)
+
+    def _on_watch_failed(self, due, error):
+        # back off instead of retrying the same batch on the next tick
+        self._watch_pending = False
+        self.watchlist.failed(due)
+        print("Watchlist refresh failed:", error)
+
+    def _on_watch_quotes(self, quotes):
+        self._watch_pending = False
+        changed = self.watchlist.apply(quotes, hidden=self._window_hidden())
+        prices = {s: q["price"] for s, q in quotes.items() if q and q.get("price") is not None}
+        self._check_alerts(prices)
+        # redraw only rows whose text changed
+        for sym in changed:
+            if not self.fav_list.exists(sym):
+                continue
+            item = self.watchlist.items[sym]
+            tags = ()
+            if item.price is not None and item.prev_close:
+                tags = ("up",) if item.price >= item.prev_close else ("down",)
+            self.fav_list.item(sym, values=item.row, tags=tags)
+
     # -------------------------
     # Price loading
     # -------------------------
@@ -810,41 +1268,38 @@ class InvestmentApp:
         self._start_price_thread(ticker)
 
     def _start_price_thread(self, ticker):
-        # spawn a short-lived thread to fetch price
-        threading.Thread(target=self._fetch_and_update_live, args=(ticker,), daemon=True).start()
-
-    def _fetch_and_update_live(self, ticker):
-        # network call, not on UI thread
+        # fetch on the quote engine's pool; result comes back on the UI thread
         self._set_status(f"Fetching price for {ticker}...")
-        price = fetch_price(ticker)
+        engine = get_engine()
+        engine.deliver(self.root, engine.run_blocking(fetch_price, ticker),
+                       lambda price: self._update_live(ticker, price))
+
+    def _update_live(self, ticker, price):
+        # runs on UI thread
         if price is None:
-            # show error on UI thread
-            self.root.after(0, lambda: (self._set_status("Failed to fetch price"),
-                                        messagebox.showerror("Error", f"Price not available for {ticker}")))
+            self._set_status("Failed to fetch price")
+            messagebox.showerror("Error", f"Price not available for {ticker}")
             return
         last = state.get("last_price")
-
-        def ui_update():
-            arrow = ""
-            color = "black"
-            if last is not None:
-                if price > last:
-                    arrow = " ▲";
-                    color = "green"
-                elif price < last:
-                    arrow = " ▼";
-                    color = "red"
-            state["last_price"] = price
-            text = f"{ticker}: ${price:,.2f}{arrow}"
-            try:
-                self.live_price_label.config(text=text, foreground=color)
-            except Exception:
-                self.live_price_label.config(text=text)
-            self.live_time_label.config(text=f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            self._ticker = ticker
-            self._set_status("Price updated")
-
-        self.root.after(0, ui_update)
+        arrow = ""
+        color = "black"
+        if last is not None:
+            if price > last:
+                arrow = " ▲";
+                color = "green"
+            elif price < last:
+                arrow = " ▼";
+                color = "red"
+        state["last_price"] = price
+        text = f"{ticker}: ${price:,.2f}{arrow}"
+        try:
+            self.live_price_label.config(text=text, foreground=color)
+        except Exception:
+            self.live_price_label.config(text=text)
+        self.live_time_label.config(text=f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self._ticker = ticker
+        self._check_alerts({ticker: price})
+        self._set_status("Price updated")
 
     # -------------------------
     # Market overview
@@ -916,83 +1371,52 @@ class InvestmentApp:
         if not ticker:
             messagebox.showerror("Error", "Enter a ticker to load news")
             return
+        items, age = news_cache.cached(ticker)
+        if items is not None and age < news_cache.ttl:
+            registry.hit("news.cache")
+        else:
+            registry.miss("news.cache")
+        if items is not None:
+            # show what we have right away; refresh behind it if expired
+            self._show_news(ticker, items)
+            if age < news_cache.ttl:
+                return
         self._set_status("Loading news...")
         threading.Thread(target=self._fetch_news_thread, args=(ticker,), daemon=True).start()
 
     def _fetch_news_thread(self, ticker):
-        items = []
-
         try:
-            # Try to get news from yfinance
-            stock = yf.Ticker(ticker)
-            raw_items = stock.news or []
-
-            # Normalize each news item safely
-            for n in raw_items:
-                if not isinstance(n, dict):
-                    continue
-
-                # Extract title
-                title = (
-                        n.get("title") or
-                        n.get("headline") or
-                        (n.get("content") or {}).get("title") or
-                        "Untitled Article"
-                )
-
-                # Extract link/URL
-                link = (
-                        n.get("link") or
-                        n.get("url") or
-                        (n.get("content") or {}).get("clickThroughUrl") or
-                        None
-                )
-
-                items.append({"title": title, "link": link})
-
+            items = news_cache.fetch(ticker, force=True)
         except Exception as e:
             print(f"Error fetching news: {e}")
-            items = []
-
-        # If no items from yfinance, try alternative source
-        if not items:
-            try:
-                url = f"https://query1.finance.yahoo.com/v1/finance/search?q={ticker}"
-                resp = requests.get(url, timeout=10).json()
+            items = news_cache.cached(ticker)[0] or []
+        self.root.after(0, lambda: self._show_news(ticker, items))
 
-                for r in resp.get("news", [])[:10]:
-                    title = r.get("title") or "Untitled Article"
-                    link = r.get("link") or r.get("url")
-                    items.append({"title": title, "link": link})
-            except Exception as e:
-                print(f"Error fetching alternative news: {e}")
-
-        def ui():
-            self.news_list.delete(0, tk.END)
+    def _show_news(self, ticker, items):
+        self.news_list.delete(0, tk.END)
+        self.news_list.items = []  # row -> item (None for spacer rows)
 
-            if not items:
-                self.news_list.insert(tk.END, "No news found for this ticker.")
-                self.news_list.links = []
-                return
-
-            links = []
+        if not items:
+            self.news_list.insert(tk.END, "No news found for this ticker.")
+            self.news_list.items = [None]
+            return
 
-            for n in items:
-                title = n["title"]
-                link = n["link"]
+        for n in items:
+            title = n["title"]
+            seen = news_cache.is_seen(n["key"])
 
-                # Shorten long titles for display
-                display = title if len(title) <= 120 else title[:120] + "..."
+            # Shorten long titles for display
+            display = title if len(title) <= 120 else title[:120] + "..."
+            if seen:
+                display = "✓ " + display
 
-                self.news_list.insert(tk.END, display)
-                self.news_list.insert(tk.END, "")
-                links.append(link)
+            self.news_list.insert(tk.END, display)
+            if seen:
+                self.news_list.itemconfig(tk.END, foreground="gray")
+            self.news_list.insert(tk.END, "")
+            self.news_list.items += [n, None]
 
-            # Store the links (could be strings or dicts)
-            self.news_list.links = links
-            self._set_status(f"Loaded {len(items)} news items")
-
-        self.root.after(0, ui)
+        self._set_status(f"Loaded {len(items)} news items for {ticker}")
 
     def open_selected_news(self, evt):
         sel = self.news_list.curselection()
@@ -1000,23 +1424,22 @@ class InvestmentApp:
             return
 
         idx = sel[0]
-        links = getattr(self.news_list, "links", [])
+        items = getattr(self.news_list, "items", [])
 
-        if idx >= len(links):
+        if idx >= len(items) or items[idx] is None:
             return
 
-        link = links[idx]
+        item = items[idx]
+        link = item.get("link")
 
-        # Handle if link is a dictionary (extract the URL)
-        if isinstance(link, dict):
-            # Try to get URL from common dictionary keys
-            url = link.get("link") or link.get("url") or link.get("clickThroughUrl")
-            if url:
-                webbrowser.open(url)
-            else:
-                messagebox.showinfo("Info", "No valid URL found in news data")
-        elif isinstance(link, str) and link:
+        if isinstance(link, str) and link:
             webbrowser.open(link)
+            news_cache.mark_seen(item["key"])
+            text = self.news_list.get(idx)
+            if not text.startswith("✓ "):
+                self.news_list.delete(idx)
+                self.news_list.insert(idx, "✓ " + text)
+            self.news_list.itemconfig(idx, foreground="gray")
         else:
             messagebox.showinfo("Info", "No link available for this article")
 
@@ -1030,16 +1453,22 @@ class InvestmentApp:
             return
         period = self.period_combo.get()
         interval = self.interval_combo.get()
+        live = self.live_var.get()
+        if live:
+            if interval not in LIVE_INTERVALS:
+                messagebox.showerror("Error", "Live mode needs a 1m or 5m interval")
+                return
+            period = LIVE_INTERVALS[interval]
         self._set_status(f"Loading history for {ticker}...")
-        threading.Thread(target=self._fetch_and_plot, args=(ticker, period, interval), daemon=True).start()
+        threading.Thread(target=self._fetch_and_plot, args=(ticker, period, interval, live), daemon=True).start()
 
-    def _fetch_and_plot(self, ticker, period, interval):
+    def _fetch_and_plot(self, ticker, period, interval, live=False):
         df = fetch_history(ticker, period=period, interval=interval)
         if df is None or df.empty:
             self.root.after(0, lambda: (messagebox.showerror("Error", "No historical data"),
                                         self._set_status("Failed to load history")))
             return
-        self.root.after(0, lambda: self._plot_dataframe(ticker, df))
+        self.root.after(0, lambda: self._plot_dataframe(ticker, df, interval, live))
 
     def _clear_chart(self):
         # remove old canvas properly
@@ -1050,63 +1479,143 @@ class InvestmentApp:
                 pass
             self._chart_canvas = None
             self._chart_fig = None
+        self._chart_live = None
+        if getattr(self, "_chart_hover", None) is not None:
+            self._chart_hover.disconnect()
+            self._chart_hover = None
         for w in self.chart_frame.winfo_children():
             try:
                 w.destroy()
             except Exception:
                 pass
 
-    def _plot_dataframe(self, ticker, df):
+    @timed("render.chart")
+    def _embed_chart(self, fig):
+        # replace whatever is in the chart tab with this figure
         self._clear_chart()
-        self._chart_fig = plt.Figure(figsize=(9, 5))
-        ax = self._chart_fig.add_subplot(111)
-
+        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+        self._chart_canvas = canvas
+        self._chart_fig = fig
+        return canvas
+
+    def _selected_indicators(self):
+        return [name for name, var in self.ind_vars.items() if var.get()]
+
+    def _replot_chart(self):
+        # indicator selection changed: redraw the last single-ticker chart from memory
+        last = getattr(self, "_chart_source", None)
+        if last:
+            self._plot_dataframe(*last)
+
+    @timed("render.history")
+    def _plot_dataframe(self, ticker, df, interval="1d", live=False):
+        self._clear_chart()
+        self._chart_source = (ticker, df, interval, live)
+        df = df[df["Close"].notna()]
+        if live:
+            df = df.iloc[-LIVE_WINDOW:]
+        ind = self.indicators.load(ticker, df, self._selected_indicators(), interval)
+        panes = [p for p in ("rsi", "macd") if p in ind.panes.values()]
+
+        self._chart_fig = plt.Figure(figsize=(9, 5 + 1.5 * len(panes)))
+        grid = self._chart_fig.add_gridspec(1 + len(panes), 1, height_ratios=[3] + [1] * len(panes), hspace=0.08)
+        ax = self._chart_fig.add_subplot(grid[0])
+        pane_axes = {"price": ax}
+        for i, p in enumerate(panes):
+            pane_axes[p] = self._chart_fig.add_subplot(grid[i + 1], sharex=ax)
+
+        xdata = matplotlib.dates.date2num(df.index.to_pydatetime())
+        ydata = df["Close"].values
+        lines = {}
         try:
-            ax.plot(df.index, df["Close"], label="Close", linewidth=2)
-            ax.set_title(f"{ticker} - {self.period_combo.get()} {self.interval_combo.get()}")
+            lines["Close"], = ax.plot(xdata, ydata, label="Close", linewidth=2)
+            for key, values in ind.series.items():
+                style = {"linewidth": 1}
+                if key.endswith(("upper", "lower")):
+                    style.update(linestyle="--", color="gray")
+                elif key == "MACD hist":
+                    style.update(color="gray", alpha=0.6)
+                lines[key], = pane_axes[ind.panes[key]].plot(xdata, values, label=key, **style)
+            if "rsi" in pane_axes:
+                for level in (30, 70):
+                    pane_axes["rsi"].axhline(level, color="gray", linewidth=0.6)
+                pane_axes["rsi"].set_ylim(0, 100)
+            ax.set_title(f"{ticker} - live {interval}" if live else f"{ticker} - {self.period_combo.get()} {interval}")
             ax.set_ylabel("Price")
-            ax.legend()
-            ax.grid(True)
+            for a in pane_axes.values():
+                a.xaxis_date()
+                a.legend(fontsize=8, loc="upper left")
+                a.grid(True)
         except Exception as e:
             ax.text(0.5, 0.5, f"Plot error: {e}", transform=ax.transAxes)
-
-        # tooltip
-        try:
-            annot = ax.annotate("", xy=(0, 0), xytext=(15, 15), textcoords="offset points",
-                                bbox=dict(boxstyle="round", fc="w"),
-                                arrowprops=dict(arrowstyle="->"))
-            annot.set_visible(False)
-            xdata = matplotlib.dates.date2num(df.index.to_pydatetime())
-            ydata = df["Close"].values
-
-            def on_move(event):
-                if event.inaxes != ax:
-                    annot.set_visible(False)
-                    try:
-                        self._chart_canvas.draw_idle()
-                    except Exception:
-                        pass
-                    return
-                try:
-                    x = event.xdata
-                    idx = np.abs(xdata - x).argmin()
-                    x_val = df.index.to_pydatetime()[idx]
-                    y_val = ydata[idx]
-                    annot.xy = (matplotlib.dates.date2num(x_val), y_val)
-                    annot.set_text(f"{x_val.strftime('%Y-%m-%d')}\n${y_val:,.2f}")
-                    annot.get_bbox_patch().set_alpha(0.9)
-                    annot.set_visible(True)
-                    self._chart_canvas.draw_idle()
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        self._show_indicator_values(ind.latest)
 
         self._chart_canvas = FigureCanvasTkAgg(self._chart_fig, master=self.chart_frame)
-        self._chart_canvas.mpl_connect("motion_notify_event", on_move)
+        # tooltip: ordinals and labels computed once, crosshair drawn by blitting
+        self._hover_fmt = "%Y-%m-%d %H:%M" if interval in BAR_MINUTES else "%Y-%m-%d"
+        labels = df.index.strftime(self._hover_fmt)
+        self._chart_hover = HoverTooltip(self._chart_canvas, ax, xdata, ydata, labels,
+                                         axes=list(pane_axes.values()))
+        # Live mode only: its poll is the chart's one feed, extending these artists in place over a
+        # sliding window; they are blitted, so a tick inside the axes doesn't redraw the figure
+        self._chart_live = None
+        if live:
+            self._chart_hover.animate(lines.values())
+            self._chart_live = LiveChart(ticker, lines, xdata, labels, LIVE_WINDOW, self._chart_hover)
+        self._chart_interval = interval
+        self._chart_tz = getattr(df.index, "tz", None)
         self._chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         self._chart_canvas.draw()
-        self._set_status("Chart loaded")
+        self._set_status("Live chart - updating every few seconds" if live else "Chart loaded")
+        if live:
+            self._live_gen = getattr(self, "_live_gen", 0) + 1
+            self.root.after(LIVE_POLL_MS, lambda g=self._live_gen: self._live_chart_tick(g))
+
+    def _live_chart_tick(self, gen):
+        # poll the live chart's ticker; stops once another chart replaces it
+        live = self._chart_live
+        if gen != self._live_gen or live is None or not state.get("_running", True):
+            return
+        if state.get("auto_refresh", True):
+            engine = get_engine()
+            engine.deliver(self.root, engine.quote(live.ticker),
+                           lambda q: q and self._tick_indicators({live.ticker: q["price"]}))
+        self.root.after(LIVE_POLL_MS, lambda: self._live_chart_tick(gen))
+
+    def _bar_time(self):
+        # start of the bar a tick arriving now belongs to, as a matplotlib date
+        now = pd.Timestamp.now(tz=self._chart_tz)
+        minutes = BAR_MINUTES.get(self._chart_interval)
+        now = now.floor(f"{minutes}min") if minutes else now.normalize()
+        return matplotlib.dates.date2num(now.to_pydatetime()), now.strftime(self._hover_fmt)
+
+    def _show_indicator_values(self, latest):
+        parts = [f"{k}: {v:,.2f}" for k, v in latest.items()
+                 if not k.endswith(("mid", "hist")) and np.isfinite(v)]
+        self.ind_label.config(text="   ".join(parts))
+
+    def _tick_indicators(self, prices):
+        # the live chart's poll: extends its indicators in O(1); the last point moves (same bar)
+        # or a point is appended (new bar). Only a change of axis limits needs a full draw
+        live = self._chart_live
+        if live is None or self._chart_canvas is None:
+            return
+        updates = self.indicators.tick_many({t: p for t, p in prices.items() if t == live.ticker})
+        if live.ticker not in updates:
+            return
+        latest, new_bar = updates[live.ticker]
+        x, label = self._bar_time()
+        moved = live.push(x, dict(latest, Close=prices[live.ticker]), label, new_bar)
+        self._show_indicator_values(latest)
+        try:
+            if moved:
+                self._chart_canvas.draw_idle()
+            else:
+                self._chart_hover.redraw()
+        except Exception:
+            pass
 
     # -------------------------
     # Compare multiple tickers
@@ -1119,34 +1628,212 @@ class InvestmentApp:
         if len(tickers) < 2:
             messagebox.showerror("Error", "Enter at least two tickers")
             return
-        threading.Thread(target=self._compare_and_plot, args=(tickers,), daemon=True).start()
+        self._compare_tickers = tickers
+        period = self.period_combo.get()  # Tk variables are read on the Tk thread only
+        threading.Thread(target=self._compare_and_plot, args=(tickers, period), daemon=True).start()
 
-    def _compare_and_plot(self, tickers):
-        dfs = {}
-        for t in tickers:
-            df = fetch_history(t, period="1y", interval="1d")
-            dfs[t] = df["Close"] if df is not None else None
+    def _compare_and_plot(self, tickers, period):
+        try:
+            result = compute_comparison(tickers, period=period)
+        except Exception as e:
+            print(f"Error comparing tickers: {e}")
+            result = None
 
         def ui():
-            self._clear_chart()
-            fig = plt.Figure(figsize=(9, 5))
-            ax = fig.add_subplot(111)
-            for t, series in dfs.items():
-                if series is not None:
-                    ax.plot(series.index, series.values, label=t, linewidth=2)
-                else:
-                    ax.plot([], [], label=f"{t} (N/A)")
-            ax.set_title("Comparison (normalized)")
+            if result is None:
+                self._set_status("Comparison failed")
+                messagebox.showinfo("Info", "No price history for those tickers")
+                return
+            self._comparison = result
+            self._plot_comparison()
+
+        self.root.after(0, ui)
+
+    @timed("render.compare")
+    def _plot_comparison(self):
+        result = getattr(self, "_comparison", None)
+        if result is None:
+            return
+        view = self.compare_view.get()
+        data = result["views"][view]
+        tickers = result["tickers"]
+        order = result["order"]
+
+        fig = plt.Figure(figsize=(9, 5))
+        ax = fig.add_subplot(111)
+        if len(tickers) > 10:
+            ax.set_prop_cycle(color=plt.cm.turbo(np.linspace(0, 1, len(tickers))))
+        # one plot call for the whole matrix: one line per ticker column
+        lines = ax.plot(result["dates"], data, linewidth=1.5 if len(tickers) <= COMPARE_LEGEND_MAX else 0.8)
+        if len(tickers) <= COMPARE_LEGEND_MAX:
+            ax.legend([lines[i] for i in order], [tickers[i] for i in order], fontsize=8)
+        else:
+            # too many for a legend: tag the five best and worst at the right edge
+            for i in list(order[:5]) + list(order[-5:]):
+                ax.annotate(tickers[i], (result["dates"][-1], data[-1, i]), fontsize=7,
+                            xytext=(3, 0), textcoords="offset points", va="center")
+        if view in ("Rebased", "Relative strength"):
+            ax.axhline(100, color="gray", linewidth=0.8)
+        else:
+            ax.axhline(0, color="gray", linewidth=0.8)
+        ax.set_title(f"Comparison - {view} (base {result['base_date']:%Y-%m-%d})")
+        ax.grid(True)
+        self._embed_chart(fig)
+        self.nb.select(self.tab_chart)
+
+        status = f"Compared {len(tickers)} tickers"
+        best = order[0]
+        status += f" - best {tickers[best]} {result['stats']['total_return'][best] * 100:+.1f}%"
+        if result["missing"]:
+            status += " - no data: " + ", ".join(result["missing"])
+        self._set_status(status)
+
+    # -------------------------
+    # Backtesting
+    # -------------------------
+    def run_backtest(self):
+        tickers = [t.strip().upper() for t in self.bt_tickers.get().split(",") if t.strip()]
+        if not tickers:
+            messagebox.showerror("Error", "Enter at least one ticker")
+            return
+        try:
+            amount = float(self.bt_amount.get())
+        except ValueError:
+            messagebox.showerror("Error", "Amount must be a number")
+            return
+        args = (tickers, self.bt_strategy.get(), amount, self.bt_period.get(), self.bt_frequency.get())
+        self._set_status("Running backtest...")
+
+        def bg():
+            try:
+                result = run_backtest(*args)
+            except Exception as e:
+                print(f"Error running backtest: {e}")
+                result = None
+            self.root.after(0, lambda: self._show_backtest(result))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _show_backtest(self, result):
+        if result is None:
+            self._set_status("Backtest failed")
+            messagebox.showinfo("Info", "No overlapping price history for those tickers")
+            return
+        st = result["stats"]
+        lines = [f"{result['strategy']} on {', '.join(result['tickers'])} "
+                 f"({result['dates'][0]:%Y-%m-%d} to {result['dates'][-1]:%Y-%m-%d})"]
+        fig = plt.Figure(figsize=(9, 5))
+        ax = fig.add_subplot(111)
+
+        if result["strategy"] == "DCA sweep":
+            # one line per frequency: total return by start date
+            labels = result["labels"]
+            for name in backtest.FREQUENCIES:
+                idx = np.array([i for i, (f, _) in enumerate(labels) if f == name])
+                starts = result["dates"][[labels[i][1] for i in idx]]
+                rets = st["total_return"][idx] * 100
+                ax.plot(starts, rets, label=name)
+                best = idx[np.nanargmax(st["total_return"][idx])]
+                lines.append(f"{name:10} median {np.nanmedian(rets):+7.2f}%  "
+                             f"5-95%: {np.nanpercentile(rets, 5):+7.2f}% / {np.nanpercentile(rets, 95):+7.2f}%  "
+                             f"best start {result['dates'][labels[best][1]]:%Y-%m-%d}")
+            lines.append(f"{len(labels):,} variants")
+            ax.set_title("DCA total return by start date")
+            ax.set_ylabel("Total return (%)")
+        else:
+            ax.plot(result["dates"], result["equity"].T, linewidth=1.5)
+            ax.legend(result["labels"])
+            ax.set_title(f"{result['strategy']} equity curve")
+            ax.set_ylabel("Value ($)")
+            lines.append(f"{'':22} {'Invested':>11} {'Final':>11} {'Return':>8} {'CAGR':>7} {'MaxDD':>7} {'Vol':>6}")
+            for i, label in enumerate(result["labels"]):
+                lines.append(f"{label:22} {st['invested'][i]:11,.0f} {st['final_value'][i]:11,.0f} "
+                             f"{st['total_return'][i] * 100:+7.1f}% {st['cagr'][i] * 100:+6.1f}% "
+                             f"{st['max_drawdown'][i] * 100:6.1f}% {st['volatility'][i] * 100:5.1f}%")
+        ax.grid(True)
+        if result["strategy"] == "DCA sweep":
             ax.legend()
+        self._embed_chart(fig)
+
+        self.bt_result.config(state="normal")
+        self.bt_result.delete("1.0", tk.END)
+        self.bt_result.insert(tk.END, "\n".join(lines))
+        self.bt_result.config(state="disabled")
+        self._set_status("Backtest complete - equity curves in Historical Chart tab")
+
+    # -------------------------
+    # Risk panel
+    # -------------------------
+    def show_compare_risk(self):
+        tickers = getattr(self, "_compare_tickers", None)
+        if not tickers:
+            t = self.ticker_entry.var.get().upper().strip()
+            if not t:
+                messagebox.showerror("Error", "Compare tickers or enter a ticker first")
+                return
+            tickers = [t]
+        self._run_risk(tickers, None, "Risk - " + ", ".join(tickers))
+
+    def show_portfolio_risk(self):
+        positions = state["portfolio"].get("positions", {})
+        if not positions:
+            messagebox.showinfo("Info", "No positions")
+            return
+        # weights by cost when no valuation is on screen
+        val = getattr(self, "_port_valuation", None)
+        if val is not None and val["totals"]["market_value"]:
+            weights = {t: float(mv) for t, mv, ok in zip(val["tickers"], val["market_value"], val["priced"]) if ok}
+        else:
+            weights = {t: v["qty"] * v["avg"] for t, v in positions.items()}
+        self._run_risk(list(positions), weights, "Portfolio Risk")
+
+    def _run_risk(self, tickers, weights, title):
+        self._set_status("Computing risk...")
+
+        def bg():
+            try:
+                table, rolling = compute_risk(tickers, weights)
+            except Exception as e:
+                print(f"Error computing risk: {e}")
+                table, rolling = None, None
+            self.root.after(0, lambda: self._show_risk_window(title, table, rolling))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _show_risk_window(self, title, table, rolling):
+        if table is None or table.empty:
+            self._set_status("Risk unavailable")
+            messagebox.showinfo("Info", "No price history for risk analysis")
+            return
+        win = tk.Toplevel(self.root)
+        win.title(title)
+        win.geometry("900x600")
+
+        cols = list(table.columns)
+        tree = ttk.Treeview(win, columns=cols, height=min(len(table), 12))
+        tree.heading("#0", text="Ticker")
+        tree.column("#0", width=90)
+        for c in cols:
+            tree.heading(c, text=c)
+            tree.column(c, width=95, anchor=tk.E)
+        for name, row in table.iterrows():
+            tree.insert("", tk.END, text=name, values=[f"{v:,.2f}" if not np.isnan(v) else "--" for v in row])
+        tree.pack(fill=tk.X, padx=6, pady=6)
+
+        if rolling is not None:
+            fig = plt.Figure(figsize=(8, 3.5))
+            ax = fig.add_subplot(111)
+            lines = ax.plot(rolling.index, rolling.to_numpy(), linewidth=1)
+            if len(lines) <= 10:
+                ax.legend(lines, list(rolling.columns), fontsize=8)
+            ax.set_title("Rolling 60-day correlation to S&P 500")
             ax.grid(True)
-            canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
+            fig.tight_layout()
+            canvas = FigureCanvasTkAgg(fig, master=win)
             canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            canvas.draw()
-            self._chart_canvas = canvas
-            self._chart_fig = fig
-            self._set_status("Comparison loaded")
-
-        self.root.after(0, ui)
+            with span("render.risk"):
+                canvas.draw()
+        self._set_status("Risk loaded")
 
     # -------------------------
     # Portfolio dialog
@@ -1154,12 +1841,13 @@ class InvestmentApp:
     def open_portfolio_dialog(self):
         dlg = tk.Toplevel(self.root)
         dlg.title("Portfolio Simulator")
-        dlg.geometry("600x400")
+        dlg.geometry("700x400")
 
         # Top frame with cash display
         top = ttk.Frame(dlg)
         top.pack(fill=tk.X, padx=6, pady=6)
-        self.port_cash_lbl = ttk.Label(top, text=f"Cash: ${state['portfolio'].get('cash', 0):,.2f}",
+        p = state["portfolio"]
+        self.port_cash_lbl = ttk.Label(top, text=f"Cash: {money(p.get('cash', 0), p.get('currency') or BASE)}",
                                        font=("Arial", 12, "bold"))
         self.port_cash_lbl.pack(side=tk.LEFT)
 
@@ -1167,7 +1855,7 @@ class InvestmentApp:
         pos_frame = ttk.Frame(dlg)
         pos_frame.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
         ttk.Label(pos_frame, text="Your Positions:").pack(anchor=tk.W)
-        self.pos_list = tk.Listbox(pos_frame)
+        self.pos_list = tk.Listbox(pos_frame, font=("Courier New", 10))
         self.pos_list.pack(fill=tk.BOTH, expand=True)
 
         # Load initial positions
@@ -1178,66 +1866,478 @@ class InvestmentApp:
         ops.pack(fill=tk.X, padx=6, pady=6)
         ttk.Button(ops, text="Buy", command=lambda: self._portfolio_trade(dlg, "buy")).pack(side=tk.LEFT, padx=4)
         ttk.Button(ops, text="Sell", command=lambda: self._portfolio_trade(dlg, "sell")).pack(side=tk.LEFT, padx=4)
-        ttk.Button(ops, text="Export", command=lambda: save_json("portfolio_export.json", state["portfolio"])).pack(
-            side=tk.RIGHT)
+        ttk.Label(ops, text="Lots:").pack(side=tk.LEFT, padx=(8, 2))
+        self.lot_method = ttk.Combobox(ops, values=["fifo", "lifo", "specific"], width=8, state="readonly")
+        self.lot_method.set("fifo")
+        self.lot_method.pack(side=tk.LEFT)
+        ttk.Button(ops, text="Gains", command=lambda: self._show_gains(dlg)).pack(side=tk.LEFT, padx=4)
+        ttk.Button(ops, text="Performance", command=self.show_performance).pack(side=tk.LEFT, padx=4)
+        ttk.Button(ops, text="Risk", command=self.show_portfolio_risk).pack(side=tk.LEFT, padx=4)
+        ttk.Button(ops, text="Export", command=self._export_portfolio).pack(side=tk.RIGHT)
+
+    def value_portfolio(self):
+        """Value the whole book from one batched quote snapshot"""
+        _, p = store.snapshot(PORT_FILE)  # runs off the UI thread; trades may land meanwhile
+        book = PositionBook.from_positions(p.get("positions", {}))
+        quotes = fetch_quotes(book.tickers)
+        ccy, cash_ccy = reporting_currency(), p.get("currency") or BASE
+        rates = get_fx().rates(book.currencies(quotes) + [cash_ccy], ccy)
+        return book.value(quotes, cash=p.get("cash", 0), rates=rates, cash_currency=cash_ccy, currency=ccy)
 
     def _refresh_port_ui(self):
+        """Draw the positions at once, then fill in prices as each quote arrives"""
         p = state["portfolio"]
+        self._port_gen = getattr(self, "_port_gen", 0) + 1
+        gen = self._port_gen
+        book = PositionBook.from_positions(p.get("positions", {}))
+        self._port_book, self._port_quotes, self._port_cash = book, {}, p.get("cash", 0)
+        self._port_ccy, self._port_cash_ccy = reporting_currency(), p.get("currency") or BASE
+        self._port_rates = {c: 1.0 for c in set(book.currency) | {self._port_cash_ccy} if c == self._port_ccy}
+        self._port_valuation = None  # complete valuations only (gains/risk/export use it)
+        self._port_render_pending = False
+        self._render_positions()
+        if not len(book):
+            return
+        self._set_status("Pricing positions...")
+        ccy, cash_ccy = self._port_ccy, self._port_cash_ccy
+        seen = {}
+
+        def on_quote(t, q):
+            seen[t] = q
+            try:
+                self.root.after(0, lambda: self._port_quote(gen, t, q))
+            except Exception:
+                pass  # window closed mid-stream
+
+        def bg():
+            rates = None
+            try:
+                # rates first so rows convert as their quotes land; then any currency only a quote revealed
+                rates = get_fx().rates(book.currencies() + [cash_ccy], ccy)
+                self.root.after(0, lambda r=rates: self._port_set_rates(gen, r))
+                stream_quotes(book.tickers, on_quote)
+                rates = get_fx().rates(book.currencies(seen) + [cash_ccy], ccy)
+            except Exception as e:
+                print(f"Error pricing portfolio: {e}")
+            self.root.after(0, lambda: self._port_priced(gen, rates))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _port_quote(self, gen, ticker, quote):
+        if gen != self._port_gen:
+            return  # a newer refresh owns the list
+        self._port_quotes[ticker] = quote
+        if not self._port_render_pending:
+            # quotes land in bursts; redraw once per burst
+            self._port_render_pending = True
+            self.root.after_idle(self._render_positions)
+
+    def _port_set_rates(self, gen, rates):
+        if gen == self._port_gen:
+            self._port_rates = rates
+            self._render_positions()
+
+    def _port_priced(self, gen, rates):
+        if gen != self._port_gen:
+            return
+        if rates is not None:
+            self._port_rates = rates
+        self._port_valuation = self._port_value()
+        self._render_positions()
+        self._set_status("Portfolio priced")
+
+    def _port_value(self):
+        return self._port_book.value(self._port_quotes, cash=self._port_cash, rates=self._port_rates,
+                                     cash_currency=self._port_cash_ccy, currency=self._port_ccy)
+
+    def _render_positions(self):
+        self._port_render_pending = False
+        book, quotes = self._port_book, self._port_quotes
         try:
             # Update cash label
-            self.port_cash_lbl.config(text=f"Cash: ${p.get('cash', 0):,.2f}")
+            self.port_cash_lbl.config(text=f"Cash: {money(self._port_cash, self._port_cash_ccy)}")
 
             # Update positions list
             self.pos_list.delete(0, tk.END)
+            if not len(book):
+                return
+
+            ccy = self._port_ccy
+            val = self._port_value()
+            self.pos_list.insert(tk.END, f"{'Ticker':8} {'Qty':>8} {'Avg Price':>11} {'Value':>13} "
+                                         f"{'P&L':>12} {'Weight':>7} {'Day':>10}   ({ccy})")
+            self.pos_list.insert(tk.END, "-" * 76)
 
-            # Add header if there are positions
-            if p.get("positions", {}):
-                self.pos_list.insert(tk.END, "Ticker     Quantity     Avg Price     Current Value")
-                self.pos_list.insert(tk.END, "-" * 50)
-
-            # Add each position
-            for t, v in p.get("positions", {}).items():
-                # Try to get current price for value calculation
-                current_price = fetch_price(t)
-                if current_price:
-                    current_value = v['qty'] * current_price
-                    self.pos_list.insert(tk.END, f"{t:10} {v['qty']:10} ${v['avg']:10,.2f} ${current_value:12,.2f}")
-                else:
-                    self.pos_list.insert(tk.END, f"{t:10} {v['qty']:10} ${v['avg']:10,.2f} (Price N/A)")
-
-            # Show total portfolio value if we have positions
-            if p.get("positions", {}):
-                self.pos_list.insert(tk.END, "-" * 50)
-                total_value = p.get("cash", 0)
-                for t, v in p.get("positions", {}).items():
-                    current_price = fetch_price(t)
-                    if current_price:
-                        total_value += v['qty'] * current_price
-                self.pos_list.insert(tk.END, f"Total Portfolio Value: ${total_value:,.2f}")
+            for i, t in enumerate(val["tickers"]):
+                head = f"{t:8} {val['qty'][i]:8g} {val['avg'][i]:11,.2f}"
+                if not val["priced"][i]:
+                    self.pos_list.insert(tk.END, f"{head} ({'Price N/A' if t in quotes else 'loading...'})")
+                    continue
+                day = val["day_change"][i]
+                day_txt = f"{day:+10,.2f}" if not np.isnan(day) else f"{'--':>10}"
+                self.pos_list.insert(
+                    tk.END,
+                    f"{head} {val['market_value'][i]:13,.2f} {val['unrealized'][i]:+12,.2f} "
+                    f"{val['weight'][i]:6.1f}% {day_txt}")
+
+            self.pos_list.insert(tk.END, "-" * 76)
+            if len(quotes) < len(book):
+                self.pos_list.insert(tk.END, f"Pricing... {len(quotes)}/{len(book)} quotes")
+                return
+            tot = val["totals"]
+            self.pos_list.insert(tk.END, f"Unrealized P&L: {money(tot['unrealized'], ccy)}   "
+                                         f"Day Change: {money(tot['day_change'], ccy)}")
+            self.pos_list.insert(tk.END, f"Total Portfolio Value: {money(tot['total_value'], ccy)}")
 
+        except tk.TclError:
+            pass  # portfolio window closed
         except Exception as e:
             print(f"Error refreshing portfolio UI: {e}")
 
+    def _export_portfolio(self):
+        val = getattr(self, "_port_valuation", None)
+        if val is not None or not state["portfolio"].get("positions"):
+            self._write_portfolio_export(val)
+            return
+        self._set_status("Pricing portfolio for export...")
+
+        def bg():
+            val = self.value_portfolio()
+            self.root.after(0, lambda: self._write_portfolio_export(val))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _write_portfolio_export(self, val):
+        _, export = store.snapshot(PORT_FILE)
+        if val is not None:
+            export["valuation"] = valuation_rows(val)
+        save_json("portfolio_export.json", export)
+        self._set_status("Portfolio exported")
+
     def _portfolio_trade(self, parent, action):
         t = simpledialog.askstring("Ticker", "Enter ticker:", parent=parent)
         if not t: return
         t = t.upper().strip()
         qty = simpledialog.askinteger("Quantity", "Enter quantity:", parent=parent, minvalue=1)
         if not qty: return
-        price = fetch_price(t)
-        if price is None:
-            messagebox.showerror("Error", "Can't fetch price")
+        method, lot_ids = "fifo", None
+        if action == "sell":
+            method = self.lot_method.get()
+            if method == "specific":
+                lots = ledger.open_lots(t)
+                if not lots:
+                    messagebox.showerror("Error", "Not enough shares")
+                    return
+                listing = "\n".join(f"{l['lot_id']}: {l['remaining']:g} @ ${l['price']:,.2f} ({l['date'][:10]})"
+                                    for l in lots)
+                ids = simpledialog.askstring("Lots", f"Open lots:\n{listing}\n\nLot ids to sell, in order:",
+                                             parent=parent)
+                if not ids: return
+                lot_ids = [i.strip() for i in ids.split(",") if i.strip()]
+        # the quote (and FX rate) are network round trips; keep the window responsive
+        self._set_status(f"Fetching price for {t}...")
+        cash_ccy = state["portfolio"].get("currency") or BASE
+
+        def bg():
+            quote = fetch_quotes([t]).get(t)
+            ccy = (quote or {}).get("currency") or cash_ccy
+            rate = get_fx().rate(ccy, cash_ccy) if quote else None
+            self.root.after(0, lambda: self._finish_trade(action, t, qty, quote, ccy, rate, method, lot_ids))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _finish_trade(self, action, t, qty, quote, ccy, rate, method, lot_ids):
+        price = (quote or {}).get("price")
+        if price is None or rate is None or np.isnan(rate):
+            self._set_status("Trade cancelled")
+            messagebox.showerror("Error", "Can't fetch price" if price is None else f"No {ccy} exchange rate")
             return
         try:
             if action == "buy":
-                portfolio_buy(t, qty, price)
+                portfolio_buy(t, qty, price, currency=ccy, rate=rate)
             else:
-                portfolio_sell(t, qty, price)
-            messagebox.showinfo("Done", f"{action.title()} {qty} {t} @ ${price:,.2f}")
+                portfolio_sell(t, qty, price, method=method, lot_ids=lot_ids, rate=rate)
+            messagebox.showinfo("Done", f"{action.title()} {qty} {t} @ {money(price, ccy)}")
             self._refresh_port_ui()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def _show_gains(self, parent):
+        # the ledger is kept in each ticker's own currency: native quotes in, converted gains out
+        prices = {}
+        if getattr(self, "_port_valuation", None) is not None:
+            prices = {t: q["price"] for t, q in self._port_quotes.items() if q and q.get("price") is not None}
+        ccy = getattr(self, "_port_ccy", None) or reporting_currency()
+        rates = dict(getattr(self, "_port_rates", None) or {})
+        self._set_status("Computing gains...")
+
+        def bg():
+            # rates for currencies the valuation didn't need may be a network round trip
+            try:
+                rows = gains_report(prices, rates=rates, currency=ccy)
+            except Exception as e:
+                print(f"Error computing gains: {e}")
+                self.root.after(0, lambda: self._set_status("Gains failed"))
+                return
+            self.root.after(0, lambda: self._show_gains_rows(parent, ccy, rows))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _show_gains_rows(self, parent, ccy, rows):
+        self._set_status("Ready")
+        dlg = tk.Toplevel(parent)
+        dlg.title("Realized / Unrealized Gains")
+        txt = tk.Text(dlg, font=("Courier New", 10), height=20, width=60)
+        txt.pack(fill=tk.BOTH, expand=True)
+        txt.insert(tk.END, f"Amounts in {ccy}\n{'Ticker':8} {'Realized':>14} {'Unrealized':>14}\n" + "-" * 38 + "\n")
+        for r in rows:
+            unreal = f"{r['unrealized']:+14,.2f}" if r["unrealized"] is not None else f"{'N/A':>14}"
+            txt.insert(tk.END, f"{r['ticker']:8} {r['realized']:+14,.2f} {unreal}\n")
+        txt.config(state="disabled")
+
+    def show_performance(self):
+        self._set_status("Building performance history...")
+
+        def bg():
+            try:
+                perf = compute_performance()
+            except Exception as e:
+                print(f"Error computing performance: {e}")
+                perf = None
+            self.root.after(0, lambda: self._plot_performance(perf))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _plot_performance(self, perf):
+        if perf is None:
+            self._set_status("No performance history")
+            messagebox.showinfo("Info", "No trade history or price data to build performance from.")
+            return
+        fig = plt.Figure(figsize=(9, 5))
+        ax = fig.add_subplot(111)
+        ax.plot(perf["dates"], perf["twr"] * 100, label="Portfolio (TWR)", linewidth=2)
+        if perf["benchmark"] is not None:
+            ax.plot(perf["dates"], perf["benchmark"] * 100, label="S&P 500", linewidth=1.5)
+        mwr = f"{perf['mwr'] * 100:.2f}%/yr" if perf["mwr"] is not None else "N/A"
+        ax.set_title(f"Performance - TWR {perf['twr_total'] * 100:+.2f}% | MWR {mwr}")
+        ax.set_ylabel("Return (%)")
+        ax.legend()
+        ax.grid(True)
+        self._embed_chart(fig)
+        self.nb.select(self.tab_chart)
+        self._set_status("Performance loaded")
+
+    # -------------------------
+    # Price alerts
+    # -------------------------
+    def _check_alerts(self, prices):
+        fired = alerts.check_many(prices)
+        if not fired:
+            return
+        self._set_status("Alert: " + fired[-1]["message"])
+        self._refresh_fav_list()  # stop polling tickers with no alerts left
+        if getattr(self, "_alerts_dlg", None) is not None:
+            self._refresh_alerts_ui()
+        messagebox.showinfo("Price Alert", "\n".join(
+            e["message"] + (f" - {e['note']}" if e["note"] else "") for e in fired))
+
+    def _seed_alert_mas(self):
+        # moving-average alerts need daily history before they can watch for crosses
+        needs = alerts.ma_needs()
+        if not needs:
+            return
+
+        def bg():
+            for t, n in needs:
+                df = fetch_history(t, period="1y" if n <= 200 else "5y", interval="1d")
+                if df is None or df.empty:
+                    continue
+                closes = df["Close"].dropna()
+                self.root.after(0, lambda t=t, n=n, c=closes: alerts.seed_ma(t, n, c.index, c.to_numpy()))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def _known_price(self, ticker):
+        item = self.watchlist.items.get(ticker)
+        if item is not None and item.price is not None:
+            return item.price
+        if ticker == self._ticker:
+            return state.get("last_price")
+        return None
+
+    def open_alerts_dialog(self, ticker=None):
+        if getattr(self, "_alerts_dlg", None) is not None:
+            self._alerts_dlg.lift()
+            if ticker:
+                self.alert_ticker.delete(0, tk.END)
+                self.alert_ticker.insert(0, ticker)
+            return
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Price Alerts")
+        dlg.geometry("620x420")
+        self._alerts_dlg = dlg
+
+        def on_close():
+            self._alerts_dlg = None
+            dlg.destroy()
+
+        dlg.protocol("WM_DELETE_WINDOW", on_close)
+
+        form = ttk.Frame(dlg)
+        form.pack(fill=tk.X, padx=6, pady=6)
+        ttk.Label(form, text="Ticker:").pack(side=tk.LEFT)
+        self.alert_ticker = ttk.Entry(form, width=8)
+        self.alert_ticker.insert(0, ticker or self.ticker_entry.var.get().upper().strip())
+        self.alert_ticker.pack(side=tk.LEFT, padx=4)
+        self.alert_kind = ttk.Combobox(form, values=list(KINDS), width=9, state="readonly")
+        self.alert_kind.set(KINDS[0])
+        self.alert_kind.pack(side=tk.LEFT, padx=4)
+        ttk.Label(form, text="Value:").pack(side=tk.LEFT)
+        self.alert_value = ttk.Entry(form, width=9)
+        self.alert_value.pack(side=tk.LEFT, padx=4)
+        ttk.Label(form, text="Note:").pack(side=tk.LEFT)
+        self.alert_note = ttk.Entry(form, width=16)
+        self.alert_note.pack(side=tk.LEFT, padx=4)
+        ttk.Button(form, text="Add", command=self._add_alert).pack(side=tk.LEFT, padx=4)
+        ttk.Label(dlg, text="Value is a price, a percent (move %) or a number of days (cross MA)",
+                  foreground="gray").pack(anchor=tk.W, padx=6)
+
+        cols = ("ticker", "condition", "note", "created")
+        self.alert_tree = ttk.Treeview(dlg, columns=cols, show="headings", height=8)
+        for c, w in zip(cols, (70, 220, 150, 140)):
+            self.alert_tree.heading(c, text=c.capitalize())
+            self.alert_tree.column(c, width=w, anchor=tk.W)
+        self.alert_tree.pack(fill=tk.BOTH, expand=True, padx=6, pady=(6, 0))
+        ttk.Button(dlg, text="Remove Selected", command=self._remove_alerts).pack(anchor=tk.W, padx=6, pady=4)
+
+        ttk.Label(dlg, text="Recently fired:").pack(anchor=tk.W, padx=6)
+        self.alert_fired = tk.Listbox(dlg, height=5)
+        self.alert_fired.pack(fill=tk.X, padx=6, pady=(0, 6))
+        self._refresh_alerts_ui()
+
+    def _refresh_alerts_ui(self):
+        self.alert_tree.delete(*self.alert_tree.get_children())
+        for rule in sorted(alerts.rules.values(), key=lambda r: (r["ticker"], r["id"])):
+            self.alert_tree.insert("", tk.END, iid=str(rule["id"]),
+                                   values=(rule["ticker"], describe(rule), rule.get("note", ""), rule["created"]))
+        self.alert_fired.delete(0, tk.END)
+        for e in reversed(alerts.fired[-50:]):
+            self.alert_fired.insert(tk.END, f"{e['time']}  {e['message']}")
+
+    def _add_alert(self):
+        t = self.alert_ticker.get().upper().strip()
+        kind = self.alert_kind.get()
+        if not t:
+            messagebox.showerror("Error", "Enter a ticker")
+            return
+        try:
+            value = float(self.alert_value.get())
+        except ValueError:
+            messagebox.showerror("Error", "Value must be a number")
+            return
+        note = self.alert_note.get().strip()
+
+        def add(ref=None):
+            try:
+                alerts.add(t, kind, value, ref=ref, note=note)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self._refresh_fav_list()  # start polling the ticker if it is new
+            self._seed_alert_mas()
+            self._refresh_alerts_ui()
+            self._set_status(f"Alert added for {t}")
+
+        if kind != "move %":
+            add()
+            return
+        ref = self._known_price(t)
+        if ref is not None:
+            add(ref)
+            return
+        # % moves are measured from the current price; look it up first
+        engine = get_engine()
+        engine.deliver(self.root, engine.run_blocking(fetch_price, t),
+                       lambda price: add(price) if price else messagebox.showerror("Error", f"No price for {t}"))
+
+    def _remove_alerts(self):
+        for iid in self.alert_tree.selection():
+            alerts.remove(int(iid))
+        self._refresh_fav_list()
+        self._refresh_alerts_ui()
+
+    # -------------------------
+    # Diagnostics
+    # -------------------------
+    def open_diagnostics(self):
+        if getattr(self, "_diag_dlg", None) is not None:
+            self._diag_dlg.lift()
+            return
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Diagnostics")
+        dlg.geometry("760x420")
+        self._diag_dlg = dlg
+
+        def on_close():
+            self._diag_dlg = None
+            if getattr(self, "_diag_after", None) is not None:
+                self.root.after_cancel(self._diag_after)  # reopening starts a fresh loop
+                self._diag_after = None
+            dlg.destroy()
+
+        dlg.protocol("WM_DELETE_WINDOW", on_close)
+
+        cols = ("count", "errors", "mean", "p50", "p95", "max", "hit rate")
+        self.diag_tree = ttk.Treeview(dlg, columns=cols, height=14)
+        self.diag_tree.heading("#0", text="Metric")
+        self.diag_tree.column("#0", width=190, anchor=tk.W)
+        for c in cols:
+            self.diag_tree.heading(c, text=c.capitalize() if c in ("count", "errors", "hit rate") else c + " ms")
+            self.diag_tree.column(c, width=75, anchor=tk.E)
+        self.diag_tree.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+        ttk.Label(dlg, text="UI stalls (event loop blocked; full stacks go to the console):").pack(anchor=tk.W, padx=6)
+        self.diag_stalls = tk.Listbox(dlg, height=5, font=("Courier New", 9))
+        self.diag_stalls.pack(fill=tk.X, padx=6)
+
+        bar = ttk.Frame(dlg)
+        bar.pack(fill=tk.X, padx=6, pady=(0, 6))
+        ttk.Button(bar, text="Reset", command=lambda: (registry.reset(), self._refresh_diagnostics(False))).pack(side=tk.LEFT)
+        ttk.Button(bar, text="Export JSON", command=lambda: self._export_metrics(False)).pack(side=tk.LEFT, padx=6)
+        ttk.Button(bar, text="Export Trace", command=lambda: self._export_metrics(True)).pack(side=tk.LEFT)
+        ttk.Label(bar, text="Percentiles are histogram bucket bounds; trace opens in chrome://tracing",
+                  foreground="gray").pack(side=tk.RIGHT)
+        self._refresh_diagnostics()
+
+    def _refresh_diagnostics(self, reschedule=True):
+        if getattr(self, "_diag_dlg", None) is None:
+            return
+        ms = lambda v: "-" if v is None else f"{v:,.1f}"
+        self.diag_tree.delete(*self.diag_tree.get_children())
+        for name, m in registry.snapshot().items():
+            rate = "-" if m["hit_rate"] is None else f"{m['hit_rate']:.0%}"
+            self.diag_tree.insert("", tk.END, text=name, values=(
+                m["count"], m["errors"], ms(m["mean_ms"]), ms(m["p50_ms"]), ms(m["p95_ms"]), ms(m["max_ms"]), rate))
+        self.diag_stalls.delete(0, tk.END)
+        for st in reversed(ui_watchdog.recent_stalls()):
+            self.diag_stalls.insert(tk.END, f"{st['time']}  {st['ms']:8,.0f} ms  {st['where'] or '?'}")
+        if reschedule:
+            self._diag_after = self.root.after(2000, self._refresh_diagnostics)
+
+    def _export_metrics(self, trace):
+        ext = ".trace.json" if trace else ".json"
+        path = filedialog.asksaveasfilename(parent=self._diag_dlg, defaultextension=ext,
+                                            initialfile=("finance_flow" if trace else "metrics") + ext,
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        if trace and not path.endswith(".trace.json"):
+            path = path[:-len(".json")] + ".trace.json" if path.endswith(".json") else path + ".trace.json"
+        try:
+            registry.export(path)
+            self._set_status(f"Exported {os.path.basename(path)}")
+        except OSError as e:
+            messagebox.showerror("Error", f"Export failed: {e}")
+
     # -------------------------
     # Earnings
     # -------------------------
@@ -1246,7 +2346,14 @@ class InvestmentApp:
         if not t:
             messagebox.showerror("Error", "Enter ticker")
             return
-        cal = fetch_earnings_calendar(t)
+        self._set_status(f"Loading earnings for {t}...")
+        engine = get_engine()
+        engine.deliver(self.root, engine.run_blocking(fetch_earnings_calendar, t),
+                       lambda cal: self._show_earnings(t, cal),
+                       lambda e: self._show_earnings(t, None))
+
+    def _show_earnings(self, t, cal):
+        self._set_status(f"Earnings for {t} loaded" if cal else "Ready")
         if not cal:
             messagebox.showinfo("Info", "No earnings calendar data")
             return
@@ -1254,11 +2361,27 @@ class InvestmentApp:
         dlg.title(f"Earnings - {t}")
         txt = tk.Text(dlg)
         txt.pack(fill=tk.BOTH, expand=True)
-        txt.insert(tk.END, json.dumps(cal, indent=2))
+        txt.insert(tk.END, json.dumps(cal, indent=2, default=str))
 
     # -------------------------
     # Utilities
     # -------------------------
+    def set_currency(self, ccy):
+        """Switch the reporting currency for portfolio, commodity and budget totals"""
+        set_reporting_currency(ccy)
+        with store.edit(PORT_FILE):
+            state["portfolio"]["reporting_currency"] = ccy
+        if getattr(self, "pos_list", None) is not None:
+            self._refresh_port_ui()
+        self._set_status(f"Reporting currency: {ccy}")
+
+        def bg():
+            # fetch the new rates here so the commodity summary doesn't wait on them
+            get_fx().rates([commodity_book.currency], ccy)
+            self.root.after(0, self.view_commodity_portfolio)
+
+        threading.Thread(target=bg, daemon=True).start()
+
     def _set_status(self, text):
         try:
             self.status.config(text=text)
@@ -1275,13 +2398,12 @@ class InvestmentApp:
 # ---------------------------
 def main():
     root = tk.Tk()
+    ui_watchdog.watch(root)
     app = InvestmentApp(root)
 
     def on_close():
-        # save state and stop threads
-        save_json(FAV_FILE, state["favorites"])
-        save_json(PORT_FILE, state["portfolio"])
-        save_json(GOLD_FILE, gold_portfolio)
+        # write any batched changes and stop threads
+        store.flush()
         app.stop()
         # give a moment for background thread to see flag (daemon thread will exit on program close)
         root.destroy()
@@ -1,9 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
-from Investment import InvestmentApp  # Import the InvestmentApp
+import threading
 from calendar_ui import CalendarUI  # Import CalendarUI
-from charts_ui import ChartsUI  # Import ChartsUI
 import data_fetch  # Import for data fetching
+import ui_watchdog
+
+# Investment (yfinance, pandas, matplotlib) and charts_ui (matplotlib) are imported
+# on first use or pre-warmed in the background, so the welcome screen shows at once
+
+
+def load_investment():
+    import Investment
+    return Investment
 
 
 class App(tk.Tk):
@@ -16,7 +24,36 @@ class App(tk.Tk):
         self.current_month_index = 0  # Start month index
         self.months = ["January", "February", "March", "April", "May", "June",
                        "July", "August", "September", "October", "November", "December"]
+        self.investment = None  # Investment module once the background pre-warm finishes
         self.show_welcome()
+        ui_watchdog.watch(self)  # logs any handler that blocks the event loop
+        self.after(100, self.prewarm)
+
+    def prewarm(self):
+        # import the heavy stack off the UI thread while the user is on the welcome screens
+        def bg():
+            try:
+                module = load_investment()
+                import charts_ui  # noqa: F401
+            except Exception as e:
+                print("Background import failed:", e)
+                return
+            self.after(0, lambda: self.on_investment_ready(module))
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    def on_investment_ready(self, module):
+        self.investment = module
+        calendar_ui = getattr(self.current_frame, "calendar_ui", None)
+        if calendar_ui is not None:
+            self.attach_earnings(calendar_ui)
+
+    def attach_earnings(self, calendar_ui):
+        # Earnings for holdings/favorites: cached dates show now, stale ones refresh in the background
+        earnings = self.investment.earnings
+        calendar_ui.set_events_source(earnings.events_for_month)
+        earnings.refresh_async(self.investment.earnings_watch_tickers(),
+                               lambda fetched: calendar_ui.after(0, calendar_ui.refresh_events))
 
     def show_welcome(self):
         frame = ttk.Frame(self)
@@ -97,6 +134,8 @@ class App(tk.Tk):
         calendar_ui = CalendarUI(frame, data_fetch.get_transactions_for_day)
         calendar_ui.pack(fill='both', expand=True, pady=40)
         frame.calendar_ui = calendar_ui
+        if self.investment is not None:
+            self.attach_earnings(calendar_ui)
 
         # Additional buttons at the bottom
         extra_frame = ttk.Frame(frame)
@@ -123,7 +162,7 @@ class App(tk.Tk):
         investment_window.transient(self)
         investment_window.grab_set()
 
-        investment_app = InvestmentApp(investment_window)
+        investment_app = load_investment().InvestmentApp(investment_window)
 
         # When closing window: stop threads + destroy window
         def on_close():
@@ -138,6 +177,8 @@ class App(tk.Tk):
         back_btn.pack(side=tk.BOTTOM, pady=10)
 
     def show_charts_ui(self):
+        from charts_ui import ChartsUI
+
         charts_window = tk.Toplevel(self)
         charts_window.title("Visual Charts")
         charts_window.geometry("1200x750")
@@ -162,7 +203,7 @@ class App(tk.Tk):
 
         popup = tk.Toplevel(self)
         popup.title("Add Transaction")
-        popup.geometry("400x400")
+        popup.geometry("400x480")
 
         # Default = today's date (YYYY-MM-DD)
         today = datetime.now().strftime("%Y-%m-%d")
@@ -184,14 +225,21 @@ class App(tk.Tk):
         category_entry = tk.Entry(popup, font=("Arial", 14))
         category_entry.pack(pady=5)
 
+        from fx import CURRENCIES, reporting_currency
+        tk.Label(popup, text="Currency:", font=("Arial", 14)).pack(pady=5)
+        currency_combo = ttk.Combobox(popup, values=CURRENCIES, state="readonly", width=8, font=("Arial", 14))
+        currency_combo.set(reporting_currency())
+        currency_combo.pack(pady=5)
+
         def save_transaction():
             try:
                 date = date_entry.get().strip()
                 desc = desc_entry.get().strip()
                 amount = float(amount_entry.get().strip())
                 category = category_entry.get().strip()
+                currency = currency_combo.get() or reporting_currency()
 
-                with open("transactions.json", "r") as f:
+                with open(data_fetch.DATA_PATH, "r") as f:
                     data = json.load(f)
 
                 if date not in data:
@@ -200,10 +248,11 @@ class App(tk.Tk):
                 data[date].append({
                     "desc": desc,
                     "amount": amount,
-                    "category": category
+                    "category": category,
+                    "currency": currency
                 })
 
-                with open("transactions.json", "w") as f:
+                with open(data_fetch.DATA_PATH, "w") as f:
                     json.dump(data, f, indent=4)
 
                 self.update_summary()
@@ -218,42 +267,29 @@ class App(tk.Tk):
         ).pack(pady=20)
 
     def update_summary(self):
-        import json
-
-        try:
-            with open("transactions.json", "r") as f:
-                data = json.load(f)
-        except:
-            return
-
-        total_income = 0
-        total_expense = 0
-
-        selected_month = self.months[self.current_month_index]
+        # every currency is converted to the reporting one; numpy and fx load off the UI thread
+        month = self.current_month_index + 1
 
-        for date, entries in data.items():
+        def bg():
             try:
-                year, month, day = date.split("-")
-            except:
-                continue
-
-            month_name = self.months[int(month) - 1]
-
-            if month_name != selected_month:
-                continue
-
-            for entry in entries:
-                amt = entry.get("amount", 0)
-                if amt >= 0:
-                    total_income += amt
-                else:
-                    total_expense += abs(amt)
+                totals = data_fetch.get_income_expenses_all_years(month)
+            except Exception as e:
+                print("Failed to load the summary:", e)
+                return
+            self.after(0, lambda: self.show_summary(totals))
 
-        total_balance = total_income - total_expense
+        threading.Thread(target=bg, daemon=True).start()
 
-        self.total_income_label.config(text=f"Total Made: ${total_income:.2f}")
-        self.total_expense_label.config(text=f"Total Expenses: ${total_expense:.2f}")
-        self.total_balance_label.config(text=f"Total: ${total_balance:.2f}")
+    def show_summary(self, totals):
+        from fx import money
+        ccy = totals["currency"]
+        income, expense = totals["income"], totals["expenses"]
+        try:
+            self.total_income_label.config(text=f"Total Made: {money(income, ccy)}")
+            self.total_expense_label.config(text=f"Total Expenses: {money(expense, ccy)}")
+            self.total_balance_label.config(text=f"Total: {money(income - expense, ccy)}")
+        except tk.TclError:
+            pass  # the page was left before the totals came back
 
     def save_and_next(self, value, key, next_screen):
         self.user_data[key] = value
@@ -0,0 +1,211 @@
+"""
+Price Alerts
+- Rules: price above / below a level, % move from a reference price, crossing an N-day SMA
+- Level rules live in per-ticker sorted arrays; a tick bisects to exactly the rules that fire
+- % moves become an above and a below level; MA crosses share one state per (ticker, N)
+- Rules and fired alerts persist to alerts.json; every rule fires once
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+
+from indicators import IndicatorSet, SMA
+from state_store import load_json, save_json
+
+ALERTS_FILE = "alerts.json"
+KINDS = ("above", "below", "move %", "cross MA")
+FIRED_KEEP = 200
+
+
+def describe(rule):
+    kind = rule["kind"]
+    if kind == "move %":
+        return f"moves {rule['value']:g}% from ${rule['ref']:,.2f}"
+    if kind == "cross MA":
+        return f"crosses {int(rule['value'])}-day SMA"
+    return f"{kind} ${rule['value']:,.2f}"
+
+
+class _Levels:
+    # parallel sorted lists: levels and the rule ids at them
+    def __init__(self):
+        self.levels = []
+        self.ids = []
+
+    def add(self, level, rule_id):
+        i = bisect_right(self.levels, level)
+        self.levels.insert(i, level)
+        self.ids.insert(i, rule_id)
+
+    def remove(self, rule_id):
+        if rule_id in self.ids:
+            i = self.ids.index(rule_id)
+            del self.levels[i], self.ids[i]
+
+    def take_at_or_below(self, price):
+        k = bisect_right(self.levels, price)
+        out = self.ids[:k]
+        del self.levels[:k], self.ids[:k]
+        return out
+
+    def take_at_or_above(self, price):
+        k = bisect_left(self.levels, price)
+        out = self.ids[k:]
+        del self.levels[k:], self.ids[k:]
+        return out
+
+
+class AlertBook:
+    def __init__(self, path=ALERTS_FILE):
+        self.path = path
+        self.rules = {}  # id -> rule dict
+        self.fired = []  # newest last
+        self._next_id = 1
+        self._above = {}  # ticker -> _Levels (fire when price >= level)
+        self._below = {}  # ticker -> _Levels (fire when price <= level)
+        self._ma = {}  # ticker -> {n: {"ids": [...], "set": IndicatorSet or None, "side": +1/-1/None}}
+        self._load()
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _load(self):
+        data = load_json(self.path, None)
+        if not isinstance(data, dict):
+            return
+        self.fired = data.get("fired", [])
+        for rule in data.get("rules", []):
+            self._index(rule)
+        self._next_id = max([r["id"] for r in self.rules.values()] + [0]) + 1
+
+    def save(self):
+        if self.path:
+            save_json(self.path, {"rules": list(self.rules.values()), "fired": self.fired[-FIRED_KEEP:]})
+
+    # -------------------------
+    # Rules
+    # -------------------------
+    def _index(self, rule):
+        rid, t, v = rule["id"], rule["ticker"], float(rule["value"])
+        self.rules[rid] = rule
+        if rule["kind"] == "above":
+            self._above.setdefault(t, _Levels()).add(v, rid)
+        elif rule["kind"] == "below":
+            self._below.setdefault(t, _Levels()).add(v, rid)
+        elif rule["kind"] == "move %":
+            self._above.setdefault(t, _Levels()).add(rule["ref"] * (1 + v / 100.0), rid)
+            self._below.setdefault(t, _Levels()).add(rule["ref"] * (1 - v / 100.0), rid)
+        elif rule["kind"] == "cross MA":
+            group = self._ma.setdefault(t, {}).setdefault(int(v), {"ids": [], "set": None, "side": None})
+            group["ids"].append(rid)
+
+    def add(self, ticker, kind, value, ref=None, note=""):
+        """New rule; "move %" needs the reference price the move is measured from"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown alert type: {kind}")
+        value = float(value)
+        if value <= 0:
+            raise ValueError("Value must be positive")
+        if kind == "move %" and not ref:
+            raise ValueError("A % move alert needs a current price")
+        rule = {"id": self._next_id, "ticker": ticker.upper(), "kind": kind, "value": value,
+                "ref": float(ref) if ref else None, "note": note,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self._next_id += 1
+        self._index(rule)
+        self.save()
+        return rule
+
+    def remove(self, rule_id):
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return False
+        t = rule["ticker"]
+        for book in (self._above.get(t), self._below.get(t)):
+            if book:
+                book.remove(rule_id)
+        if rule["kind"] == "cross MA":
+            self._drop_ma(t, int(rule["value"]), rule_id)
+        self.save()
+        return True
+
+    def _drop_ma(self, ticker, n, rule_id=None):
+        groups = self._ma[ticker]
+        if rule_id is not None:
+            groups[n]["ids"].remove(rule_id)
+        if rule_id is None or not groups[n]["ids"]:
+            del groups[n]
+        if not groups:
+            del self._ma[ticker]
+
+    def tickers(self):
+        return sorted({r["ticker"] for r in self.rules.values()})
+
+    def ma_needs(self):
+        """(ticker, n) MA groups still waiting for history to seed them"""
+        return [(t, n) for t, groups in self._ma.items() for n, g in groups.items() if g["set"] is None]
+
+    def seed_ma(self, ticker, n, index, closes):
+        group = self._ma.get(ticker, {}).get(n)
+        if group is not None and len(closes) >= n:
+            group["set"] = IndicatorSet(index, closes, [SMA(n)])
+            if group["side"] is None:
+                # start from where the last close sat, so the first tick can already cross
+                group["side"] = 1 if closes[-1] >= group["set"].latest[f"SMA {n}"] else -1
+
+    # -------------------------
+    # Evaluation
+    # -------------------------
+    def _fire(self, rule_id, price, text):
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return None  # other leg of a % move that fired on the same tick
+        if rule["kind"] == "move %":
+            # the leg that didn't fire still sits in the other book; drop it so it isn't bisected forever
+            for book in (self._above.get(rule["ticker"]), self._below.get(rule["ticker"])):
+                if book:
+                    book.remove(rule_id)
+        event = {"id": rule_id, "ticker": rule["ticker"], "rule": describe(rule), "price": price,
+                 "message": f"{rule['ticker']} {text} at ${price:,.2f}", "note": rule.get("note", ""),
+                 "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self.fired.append(event)
+        return event
+
+    def check(self, ticker, price):
+        """Fired alert events for one quote; only rules the price crossed are touched"""
+        if price is None:
+            return []
+        events = []
+        above = self._above.get(ticker)
+        if above and above.levels and above.levels[0] <= price:
+            for rid in above.take_at_or_below(price):
+                events.append(self._fire(rid, price, "rose to or above its alert level"))
+        below = self._below.get(ticker)
+        if below and below.levels and below.levels[-1] >= price:
+            for rid in below.take_at_or_above(price):
+                events.append(self._fire(rid, price, "fell to or below its alert level"))
+        for n, group in list(self._ma.get(ticker, {}).items()):
+            if group["set"] is None:
+                continue
+            latest, _ = group["set"].tick(price)
+            ma = latest[f"SMA {n}"]
+            side = 1 if price >= ma else -1
+            if group["side"] is not None and side != group["side"]:
+                word = "crossed above" if side > 0 else "crossed below"
+                for rid in group["ids"]:
+                    events.append(self._fire(rid, price, f"{word} its {n}-day SMA (${ma:,.2f})"))
+                self._drop_ma(ticker, n)
+                continue
+            group["side"] = side
+        events = [e for e in events if e]
+        if events:
+            self.save()
+        return events
+
+    def check_many(self, prices):
+        """{ticker: price} -> fired events; tickers without rules cost one dict lookup"""
+        events = []
+        for t, p in prices.items():
+            if t in self._above or t in self._below or t in self._ma:
+                events += self.check(t, p)
+        return events
@@ -0,0 +1,134 @@
+"""
+Strategy Backtester
+- Lump-sum, scheduled dollar-cost averaging and threshold rebalancing
+- Works on an aligned date x ticker close matrix (stocks, ETFs, gold futures)
+- Every strategy returns a batch of variants: equity curves are (variants x days)
+- Parameter sweeps (DCA frequency x start date) are one set of array operations
+"""
+
+import numpy as np
+
+from performance import time_weighted
+
+TRADING_DAYS = 252
+FREQUENCIES = {"weekly": 5, "biweekly": 10, "monthly": 21, "quarterly": 63}
+
+
+def _weights(prices, weights):
+    n = prices.shape[1]
+    w = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+    return w / w.sum()
+
+
+def _run(prices, contributions, weights):
+    """Equity and per-day flows for contribution schedules.
+
+    contributions is (variants x days) dollars added each day, split by weights
+    and spent at that day's closes.
+    """
+    p = np.asarray(prices, dtype=float)
+    w = _weights(p, weights)
+    c = np.asarray(contributions, dtype=float)
+    # work days-major so the running sums walk contiguous memory
+    c_days = np.ascontiguousarray(c.T)
+    equity = np.zeros(c_days.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j in range(p.shape[1]):  # tickers, not days
+            units_per_dollar = np.where(p[:, j] > 0, w[j] / p[:, j], 0.0)
+            units = np.cumsum(c_days * units_per_dollar[:, None], axis=0)
+            equity += units * np.nan_to_num(p[:, j])[:, None]
+    return equity.T, c
+
+
+def lump_sum(prices, amount, weights=None, start=0):
+    """Invest amount once on day start"""
+    c = np.zeros((1, len(prices)))
+    c[0, start] = amount
+    return _run(prices, c, weights)
+
+
+def dca_schedule(days, every, starts, amount):
+    """(len(starts) x days) contribution matrix: amount every `every` days from each start"""
+    starts = np.asarray(starts, dtype=int)
+    out = np.zeros((len(starts), days))
+    # contribution k of every variant lands on day start + k * every
+    k = np.arange(0, days, every)
+    day = starts[:, None] + k[None, :]
+    rows = np.broadcast_to(np.arange(len(starts))[:, None], day.shape)
+    ok = day < days
+    out[rows[ok], day[ok]] = float(amount)
+    return out
+
+
+def dca(prices, amount, every, weights=None, starts=(0,)):
+    """Invest amount every `every` trading days, one variant per start day"""
+    return _run(prices, dca_schedule(len(prices), every, starts, amount), weights)
+
+
+def dca_sweep(prices, amount, frequencies=None, start_step=21, min_days=TRADING_DAYS, weights=None):
+    """Every DCA frequency x start date at once.
+
+    Returns (equity, flows, labels) where labels[i] = (frequency name, start index).
+    """
+    frequencies = frequencies or FREQUENCIES
+    n = len(prices)
+    starts = np.arange(0, max(1, n - min_days), start_step)
+    blocks, labels = [], []
+    for name, every in frequencies.items():
+        blocks.append(dca_schedule(n, every, starts, amount))
+        labels += [(name, int(s)) for s in starts]
+    equity, flows = _run(prices, np.vstack(blocks), weights)
+    return equity, flows, labels
+
+
+def rebalance(prices, amount, thresholds, weights=None):
+    """Buy target weights once, then rebalance whenever any weight drifts past a threshold.
+
+    Rebalancing is path dependent, so this steps through days, but every
+    threshold variant is handled in the same array step.
+    """
+    p = np.nan_to_num(np.asarray(prices, dtype=float))
+    w = _weights(p, weights)
+    th = np.asarray(thresholds, dtype=float)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units = np.where(p[0] > 0, amount * w / p[0], 0.0)[None, :].repeat(len(th), axis=0)
+        equity = np.zeros((len(th), len(p)))
+        for t in range(len(p)):
+            value = units * p[t]
+            total = value.sum(axis=1, keepdims=True)
+            drift = np.abs(value / total - w).max(axis=1, keepdims=True)
+            redo = (drift > th) & (total > 0)
+            target = np.where(p[t] > 0, total * w / p[t], 0.0)
+            units = np.where(redo, target, units)
+            equity[:, t] = total[:, 0]
+    flows = np.zeros_like(equity)
+    flows[:, 0] = amount
+    return equity, flows
+
+
+def max_drawdown(curves):
+    peaks = np.maximum.accumulate(curves, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nanmin(np.where(peaks > 0, curves / peaks - 1.0, 0.0), axis=-1)
+
+
+def summary(equity, flows):
+    """Per-variant stats: invested, final value, total and time-weighted returns, CAGR, drawdown, vol"""
+    invested = flows.sum(axis=1)
+    final = equity[:, -1]
+    twr = time_weighted(equity, flows)
+    growth = 1.0 + twr
+    active = np.cumsum(flows, axis=1) > 0
+    daily = np.where(active[:, :-1], growth[:, 1:] / growth[:, :-1] - 1.0, np.nan)
+    active_days = active.sum(axis=1)
+    years = np.maximum(active_days / TRADING_DAYS, 1e-9)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "invested": invested,
+            "final_value": final,
+            "total_return": np.where(invested > 0, final / invested - 1.0, np.nan),
+            "twr": twr[:, -1],
+            "cagr": np.where(years >= 1, growth[:, -1] ** (1.0 / years) - 1.0, np.nan),
+            "max_drawdown": max_drawdown(growth),
+            "volatility": np.nanstd(daily, axis=1) * np.sqrt(TRADING_DAYS),
+        }
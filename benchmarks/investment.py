@@ -0,0 +1,315 @@
+"""
+Investment Benchmarks
+- Runs the investment stack offline: yfinance and the pooled HTTP session are stubbed
+  from offline_data (see offline_stubs), so numbers don't depend on the network
+- Times fetch_price per fallback tier, portfolio valuation (10 / 100 / 10,000 positions),
+  comparison data prep (2-50 tickers), chart render / re-render / live tick, and the
+  gold simulation, through the same Investment.py code paths the app uses
+- Charts draw on an Agg canvas in place of the Tk one (no display needed)
+- Results are written as JSON and each case's best run compared against a saved
+  baseline; exits 1 when a case is slower than the baseline by more than the tolerance
+- investment_baseline.json is committed, recorded with the default config (--runs 5
+  --latency 0.002), so a plain run checks for regressions out of the box. Re-record it
+  with --save-baseline (default config) in the commit that makes a case intentionally
+  slower, or when moving to a different machine
+
+    python benchmarks/investment.py [--runs 5] [--latency 0.002] [--only compare]
+                                    [--save-baseline] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+BASELINE_FILE = os.path.join(HERE, "investment_baseline.json")
+RESULTS_FILE = os.path.join(HERE, "investment_results.json")
+POSITIONS = (10, 100, 10000)
+COMPARE_TICKERS = (2, 5, 10, 25, 50)
+CHART_INDICATORS = ("SMA 20", "Bollinger 20", "RSI 14", "MACD")
+SIM_YEARS = 10
+SIM_PATHS = 10000
+DEFAULT_TOLERANCE = 0.25  # fraction slower than baseline that counts as a regression
+FLOOR_MS = 1.0  # ...and only when it is also this many ms slower (timer noise)
+
+
+# ---------------------------
+# Headless app
+# ---------------------------
+class _Widget:
+    # Tk widget stand-in: pack/config/destroy/... do nothing
+    def __getattr__(self, name):
+        return lambda *a, **kw: None
+
+    def winfo_children(self):
+        return []
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def agg_canvas():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    class AggCanvas(FigureCanvasAgg):
+        # FigureCanvasTkAgg(fig, master=...) without a Tk window
+        def __init__(self, figure, master=None):
+            super().__init__(figure)
+
+        def get_tk_widget(self):
+            return _Widget()
+
+    return AggCanvas
+
+
+def headless_app(inv):
+    """InvestmentApp with just the widgets the chart and portfolio paths touch"""
+    inv.FigureCanvasTkAgg = agg_canvas()
+    app = object.__new__(inv.InvestmentApp)
+    app.root = _Widget()  # after() callbacks are dropped: UI hand-offs aren't timed
+    for name in ("status", "chart_frame", "comm_chart_frame", "nb", "ind_label"):
+        setattr(app, name, _Widget())
+    app.tab_chart = None
+    app.period_combo = _Var("1y")
+    app.compare_view = _Var("Rebased")
+    app.indicators = inv.IndicatorEngine()
+    app.ind_vars = {name: _Var(False) for name in inv.INDICATORS}
+    app._chart_canvas = app._chart_fig = app._chart_live = app._chart_hover = None
+    return app
+
+
+# ---------------------------
+# Timing
+# ---------------------------
+def measure(fn, runs, setup=None, market=None):
+    """{median_ms, min_ms, max_ms, runs[, round_trips]} over runs calls of fn(), after one untimed warm-up"""
+    times, calls = [], 0
+    for i in range(runs + 1):  # call 0 is the warm-up
+        if setup:
+            setup(i)
+        if i == 1 and market is not None:
+            calls = market.calls
+        start = time.perf_counter()
+        fn(i)
+        if i:
+            times.append((time.perf_counter() - start) * 1000)
+    out = {"median_ms": statistics.median(times), "min_ms": min(times), "max_ms": max(times), "runs": runs}
+    if market is not None:
+        out["round_trips"] = (market.calls - calls) / runs
+    return out
+
+
+def positions_for(n):
+    currencies = ("USD", "USD", "USD", "EUR", "GBP")
+    return {f"P{i:05d}": {"qty": 1 + i % 50, "avg": 20.0 + i % 480, "currency": currencies[i % len(currencies)]}
+            for i in range(n)}
+
+
+# ---------------------------
+# Cases
+# ---------------------------
+def bench_fetch_price(ctx, runs):
+    from market_data import fetch_price
+    from offline_stubs import TIERS
+    market, out = ctx["market"], {}
+    for tier in TIERS:
+        market.tier = tier
+        out[f"fetch_price.{tier}"] = measure(lambda i: fetch_price(f"FB{tier[:2].upper()}{i}"), runs, market=market)
+    market.tier = "history"
+    return out
+
+
+def bench_valuation(ctx, runs):
+    from valuation import PositionBook
+    from fx import get_fx
+    inv, app, market, out = ctx["inv"], ctx["app"], ctx["market"], {}
+    for n in POSITIONS:
+        positions = positions_for(n)
+        with inv.store.edit(inv.PORT_FILE):
+            inv.state["portfolio"].update({"cash": 10000.0, "currency": "USD", "positions": positions})
+        # the app's path: snapshot, one batched quote request, FX, vectorized valuation
+        out[f"valuation.portfolio[{n}]"] = measure(lambda i: app.value_portfolio(), runs, market=market)
+
+        quotes = market.quotes(list(positions))
+        rates = get_fx().rates(["USD", "EUR", "GBP"], "USD")
+
+        def compute(i):
+            book = PositionBook.from_positions(positions)
+            book.value(quotes, cash=10000.0, rates=rates, cash_currency="USD", currency="USD")
+
+        out[f"valuation.compute[{n}]"] = measure(compute, runs)
+    return out
+
+
+def bench_compare(ctx, runs):
+    import market_data
+    inv, app, market, out = ctx["inv"], ctx["app"], ctx["market"], {}
+    universe = [f"C{i:03d}" for i in range(max(COMPARE_TICKERS))]
+
+    def cold(i):
+        with market_data._history_lock:
+            market_data._history_cache.clear()
+
+    for n in COMPARE_TICKERS:
+        tickers = universe[:n]
+        out[f"compare.prepare[{n}]"] = measure(lambda i: app._compare_and_plot(tickers, "1y"), runs, setup=cold,
+                                               market=market)
+        out[f"compare.prepare_cached[{n}]"] = measure(lambda i: app._compare_and_plot(tickers, "1y"), runs)
+    app._comparison = inv.compute_comparison(universe, period="1y")
+    out[f"render.compare[{len(universe)}]"] = measure(lambda i: app._plot_comparison(), runs)
+    return out
+
+
+def bench_charts(ctx, runs):
+    inv, app, market, out = ctx["inv"], ctx["app"], ctx["market"], {}
+    df = market.history("AAPL", period="1y")
+    out["chart.render"] = measure(lambda i: app._plot_dataframe("AAPL", df, "1d"), runs)
+    for name in CHART_INDICATORS:
+        app.ind_vars[name].set(True)
+    out["chart.rerender_indicators"] = measure(lambda i: app._replot_chart(), runs)
+    # live ticks only feed a Live-mode chart: seed one the way show_chart does
+    intraday = market.history("AAPL", period=inv.LIVE_INTERVALS["5m"], interval="5m")
+    app._plot_dataframe("AAPL", intraday, "5m", live=True)
+    last = float(intraday["Close"].iloc[-1])
+    out["chart.live_tick"] = measure(lambda i: app._tick_indicators({"AAPL": last * (1 + (i % 5 - 2) / 1000)}),
+                                     runs)
+    for name in CHART_INDICATORS:
+        app.ind_vars[name].set(False)
+    return out
+
+
+def bench_simulation(ctx, runs):
+    inv, app, out = ctx["inv"], ctx["app"], {}
+    # price the futures and load the calibration history once; each run reuses the caches
+    inv.fetch_commodity_prices(["gold"])
+    inv.fetch_history(inv.GOLD_TICKER, period="10y")
+    sims = []
+
+    def run(i):
+        sims.append(inv.run_commodity_simulation("gold", SIM_YEARS, n_paths=SIM_PATHS, seed=i))
+
+    out[f"simulation.gold[{SIM_PATHS}x{SIM_YEARS}y]"] = measure(run, runs)
+    out["render.commodity_fan"] = measure(lambda i: app._plot_commodity_fan("gold", sims[-1]), runs)
+    return out
+
+
+CASES = {
+    "fetch_price": bench_fetch_price,
+    "valuation": bench_valuation,
+    "compare": bench_compare,
+    "charts": bench_charts,
+    "simulation": bench_simulation,
+}
+
+
+# ---------------------------
+# Baseline
+# ---------------------------
+def compare_baseline(results, baseline, tolerance):
+    """[(name, best, baseline best or None, regressed)] for every result; best-of-N is
+    compared (like startup.py) because medians swing with whatever else the machine runs"""
+    rows = []
+    for name, r in results.items():
+        b = baseline.get(name, {}).get("min_ms")
+        regressed = b is not None and r["min_ms"] > b * (1 + tolerance) and r["min_ms"] - b > FLOOR_MS
+        rows.append((name, r["min_ms"], b, regressed))
+    return rows
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def setup(latency):
+    """Install the stubs, import the app in a scratch directory, build the headless app"""
+    from offline_stubs import StubMarket, install
+    market = install(StubMarket(latency=latency))
+    # Investment loads and saves its state files in the working directory; keep the user's out of it
+    os.chdir(tempfile.mkdtemp(prefix="ff-bench-"))
+    import Investment as inv
+    return {"market": market, "inv": inv, "app": headless_app(inv)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline investment-stack benchmarks")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.002, help="simulated seconds per upstream call")
+    parser.add_argument("--only", nargs="*", choices=list(CASES), help="run just these groups")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    output, baseline_path = os.path.abspath(args.output), os.path.abspath(args.baseline)
+
+    try:
+        ctx = setup(args.latency)
+    except ImportError as e:
+        print(f"Cannot import the investment stack ({e}); yfinance and HTTP are stubbed, "
+              "but matplotlib, requests, numpy and pandas must be installed")
+        return 2
+
+    results = {}
+    for group in args.only or CASES:
+        print(f"running {group}...", flush=True)
+        results.update(CASES[group](ctx, args.runs))
+
+    report = {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"runs": args.runs, "latency": args.latency},
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = load_baseline(baseline_path)
+    rows = compare_baseline(results, (baseline or {}).get("results", {}), args.tolerance)
+    print(f"\n{'case':36} {'best ms':>10} {'median ms':>10} {'baseline':>10} {'change':>8}")
+    for name, best, base, regressed in rows:
+        base_text, change = (f"{base:.2f}", f"{(best / base - 1) * 100:+.0f}%") if base else ("-", "")
+        print(f"{name:36} {best:10.2f} {results[name]['median_ms']:10.2f} {base_text:>10} {change:>8}"
+              f"{'  REGRESSION' if regressed else ''}")
+    print(f"\nresults: {output}")
+
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved: {baseline_path}")
+        return 0
+    if baseline is None:
+        print("no baseline yet; run with --save-baseline to record one")
+        return 0
+    if baseline.get("config") != report["config"]:
+        print(f"note: baseline was recorded with {baseline.get('config')}")
+    failures = [name for name, *_, regressed in rows if regressed]
+    for name in failures:
+        print("FAIL:", name)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Offline Stubs
+- A stand-in `yfinance` module and HTTP session answering from offline_data.OfflineMarket
+- install() must run before the app modules are imported (they `import yfinance as yf`)
+- StubMarket.tier picks which fetch_price fallback answers: "history", "fast_info" or "chart";
+  the tiers above it come back empty, so every fallback path can be timed
+"""
+
+import re
+import sys
+import types
+
+import pandas as pd
+
+from offline_data import OfflineMarket
+
+TIERS = ("history", "fast_info", "chart")
+CHART_PATH = re.compile(r"/v8/finance/chart/([^/?]+)")
+
+
+class StubMarket(OfflineMarket):
+    def __init__(self, latency=0.0, seed=0):
+        super().__init__(latency=latency, seed=seed)
+        self.tier = "history"
+        self.calls = 0  # simulated round trips, across yfinance and HTTP
+
+    def _sleep(self):
+        self.calls += 1
+        super()._sleep()
+
+    def chart_payload(self, ticker):
+        """v8 chart API body, as parse_chart_quote expects it"""
+        q = self.quote(ticker)
+        return {"chart": {"result": [{"meta": {
+            "symbol": ticker, "regularMarketPrice": q["price"], "chartPreviousClose": q["prev_close"],
+            "regularMarketTime": q["time"], "currency": q["currency"]}}], "error": None}}
+
+
+# ---------------------------
+# yfinance
+# ---------------------------
+class _Ticker:
+    def __init__(self, market, ticker):
+        self._market = market
+        self.ticker = ticker
+
+    def history(self, period="1mo", interval="1d", **kwargs):
+        if self._market.tier != "history" and period == "5d" and interval == "1d":
+            self._market._sleep()
+            return pd.DataFrame()  # fetch_price's first tier comes back empty
+        df = self._market.history(self.ticker, period=period, interval=interval)
+        return df if df is not None else pd.DataFrame()
+
+    @property
+    def fast_info(self):
+        self._market._sleep()
+        if self._market.tier == "chart":
+            return {}
+        return {"last_price": self._market.price(self.ticker)}
+
+    @property
+    def news(self):
+        self._market._sleep()
+        return []
+
+    @property
+    def info(self):
+        self._market._sleep()
+        return {"symbol": self.ticker, "currency": "USD"}
+
+
+def yfinance_module(market):
+    module = types.ModuleType("yfinance")
+    module.Ticker = lambda ticker, *a, **kw: _Ticker(market, ticker)
+    module.__stub__ = True
+    return module
+
+
+# ---------------------------
+# HTTP
+# ---------------------------
+class StubResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f"HTTP {self.status_code}")
+
+
+class StubSession:
+    """The quote engine's pooled session, answering Yahoo chart/search and metals.live"""
+
+    def __init__(self, market):
+        self.market = market
+        self.headers = {}
+
+    def get(self, url, params=None, timeout=None):
+        self.market._sleep()
+        m = CHART_PATH.search(url)
+        if m:
+            return StubResponse(self.market.chart_payload(m.group(1)))
+        if "/finance/search" in url:
+            return StubResponse({"news": [], "quotes": []})
+        if "metals.live" in url:
+            return StubResponse([{"price": self.market.price("GC=F")}])
+        return StubResponse(None, 404)
+
+    def close(self):
+        pass
+
+
+def install(market):
+    """Route yfinance and the shared HTTP session to market (call before importing the app)"""
+    sys.modules["yfinance"] = yfinance_module(market)
+    from quote_engine import get_engine
+    get_engine().session = StubSession(market)
+    from fx import FXRates, set_fx
+    set_fx(FXRates(quotes=market.quotes, history=market.history, path=None))
+    return market
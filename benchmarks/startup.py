@@ -0,0 +1,74 @@
+"""
+Startup Benchmark
+- Imports MainPage in a fresh interpreter under `python -X importtime`
+- Fails if the heavy investment stack is imported before the welcome screen
+  or if the import takes longer than the budget
+- Prints the slowest modules by cumulative import time
+
+    python benchmarks/startup.py [--budget-ms 250] [--runs 3] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# modules that must stay off the startup path (loaded lazily / pre-warmed in the background)
+DEFERRED = ("Investment", "yfinance", "pandas", "numpy", "matplotlib", "requests", "charts_ui")
+DEFAULT_BUDGET_MS = 250
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module="MainPage"):
+    """[(module, self_us, cumulative_us, depth)] for one cold interpreter import"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time check")
+    parser.add_argument("--module", default="MainPage")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="best of N (the first run warms the disk cache)")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        rows = import_profile(args.module)
+        total = next((cum for name, _, cum, depth in rows if name == args.module and depth == 0), 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+
+    print(f"{'module':40} {'self ms':>8} {'cumul ms':>9}")
+    for name, self_us, cum_us, depth in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{'  ' * depth + name:40} {self_us / 1000:8.1f} {cum_us / 1000:9.1f}")
+    print(f"\nimport {args.module}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    loaded = {name.split(".")[0] for name, *_ in rows}
+    eager = [m for m in DEFERRED if m in loaded]
+    if eager:
+        failures.append("imported at startup: " + ", ".join(eager))
+    if total / 1000 > args.budget_ms:
+        failures.append(f"over budget by {total / 1000 - args.budget_ms:.1f} ms")
+    for f in failures:
+        print("FAIL:", f)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,11 @@ from datetime import datetime
 
 
 class CalendarUI(ttk.Frame):
-    def __init__(self, parent, fetch_transactions_callback):
+    def __init__(self, parent, fetch_transactions_callback, fetch_events_callback=None):
         super().__init__(parent)
         self.fetch_transactions = fetch_transactions_callback
+        self.fetch_events = fetch_events_callback  # (year, month) -> {day: [tickers]}, must not block
+        self.events = {}
 
         now = datetime.now()
         self.year = now.year
@@ -56,6 +58,7 @@ class CalendarUI(ttk.Frame):
     def populate_calendar(self, year, month):
         self.month_label.config(text=f"{calendar.month_name[month]} {year}")
         cal = calendar.monthcalendar(year, month)
+        self.events = self.fetch_events(year, month) if self.fetch_events else {}
 
         while len(cal) < 6:
             cal.append([0]*7)
@@ -68,9 +71,25 @@ class CalendarUI(ttk.Frame):
                 if day == 0:
                     btn.config(text='', command=lambda: None)
                 else:
-                    btn.config(text=str(day),
+                    btn.config(text=self.day_label(day),
                                command=lambda d=day: self.show_transactions(d))
 
+    def day_label(self, day):
+        tickers = self.events.get(day)
+        if not tickers:
+            return str(day)
+        shown = ", ".join(tickers[:2])
+        if len(tickers) > 2:
+            shown += f" +{len(tickers) - 2}"
+        return f"{day}\n{shown}"
+
+    def refresh_events(self):
+        self.populate_calendar(self.year, self.month)
+
+    def set_events_source(self, fetch_events_callback):
+        self.fetch_events = fetch_events_callback
+        self.refresh_events()
+
     def show_transactions(self, day):
         txs = self.fetch_transactions(self.year, self.month, day)
         popup = tk.Toplevel(self)
@@ -80,6 +99,10 @@ class CalendarUI(ttk.Frame):
         frame = ttk.Frame(popup)
         frame.pack(fill='both', expand=True, padx=8, pady=8)
 
+        tickers = self.events.get(day)
+        if tickers:
+            ttk.Label(frame, text=f"Earnings: {', '.join(tickers)}", anchor='w').pack(fill='x', pady=(0, 4))
+
         if not txs:
             ttk.Label(frame, text='No transactions').pack()
             return
@@ -0,0 +1,119 @@
+"""
+Chart Hover
+- Crosshair + tooltip for a line chart embedded in Tk
+- x ordinals and date labels are computed once; the nearest point is a binary search
+- Only the crosshair, marker and tooltip are redrawn (blitting over a cached background)
+- Live charts hand their data lines over too, so a tick repaints just those lines
+- Motion events are throttled to about the display refresh rate
+"""
+
+import time
+
+import numpy as np
+
+HOVER_FPS = 60
+
+
+class HoverTooltip:
+    def __init__(self, canvas, ax, xs, ys, labels, axes=None, fmt="${:,.2f}"):
+        self.canvas = canvas
+        self.ax = ax
+        self.fmt = fmt
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.labels = labels  # xs/ys/labels may be swapped for live views (see live_chart)
+        self._index = None
+        self._background = None
+        self._last = 0.0
+        self._pending = None
+        self._timer = None
+        self.live = []  # data lines a live chart updates; blitted with the crosshair
+
+        # animated artists are left out of normal draws and painted by blitting
+        self.vlines = [a.axvline(self.xs[0] if len(self.xs) else 0, color="gray", linewidth=0.8,
+                                 linestyle=":", animated=True, visible=False) for a in (axes or [ax])]
+        self.marker, = ax.plot([], [], "o", color="black", markersize=4, animated=True, visible=False)
+        self.annot = ax.annotate("", xy=(0, 0), xytext=(15, 15), textcoords="offset points",
+                                 bbox=dict(boxstyle="round", fc="w", alpha=0.9),
+                                 arrowprops=dict(arrowstyle="->"), animated=True, visible=False)
+        self._artists = self.vlines + [self.marker, self.annot]
+        self._cids = [canvas.mpl_connect("draw_event", self._on_draw),
+                      canvas.mpl_connect("motion_notify_event", self._on_move)]
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def _on_draw(self, event):
+        # a full redraw happened (resize, new data): re-grab the clean background
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        if self._index is not None or self.live:
+            self._blit()
+
+    def _on_move(self, event):
+        now = time.perf_counter()
+        if now - self._last < 1.0 / HOVER_FPS:
+            # too soon: remember the newest position and flush it once the frame is due
+            self._pending = event
+            if self._timer is None:
+                self._timer = self.canvas.new_timer(interval=int(1000 / HOVER_FPS))
+                self._timer.single_shot = True
+                self._timer.add_callback(self._flush)
+                self._timer.start()
+            return
+        self._last = now
+        self._handle(event)
+
+    def _flush(self):
+        self._timer = None
+        event, self._pending = self._pending, None
+        if event is not None:
+            self._last = time.perf_counter()
+            self._handle(event)
+
+    def _handle(self, event):
+        if event.inaxes is None or event.xdata is None or not len(self.xs):
+            idx = None
+        else:
+            i = int(np.searchsorted(self.xs, event.xdata))
+            if i >= len(self.xs) or (i > 0 and event.xdata - self.xs[i - 1] < self.xs[i] - event.xdata):
+                i -= 1
+            idx = max(i, 0)
+        if idx == self._index:
+            return
+        self._index = idx
+        self._blit()
+
+    def _blit(self):
+        if self._background is None:
+            return
+        idx = self._index
+        visible = idx is not None and idx < len(self.xs)
+        for a in self._artists:
+            a.set_visible(visible)
+        if visible:
+            x, y = self.xs[idx], self.ys[idx]
+            for line in self.vlines:
+                line.set_xdata([x, x])
+            self.marker.set_data([x], [y])
+            self.annot.xy = (x, y)
+            self.annot.set_text(f"{self.labels[idx]}\n{self.fmt.format(y)}")
+        self.canvas.restore_region(self._background)
+        for a in self.live + self._artists:
+            a.axes.draw_artist(a)
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def animate(self, artists):
+        """Leave these (live) artists out of full draws and paint them on every blit"""
+        self.live = list(artists)
+        for a in self.live:
+            a.set_animated(True)
+
+    def redraw(self):
+        """Repaint the live artists and crosshair over the cached background (no full draw)"""
+        self._blit()
+
+    def disconnect(self):
+        for cid in self._cids:
+            self.canvas.mpl_disconnect(cid)
+        if self._timer is not None:
+            self._timer.stop()
@@ -1,7 +1,9 @@
+import threading
 from tkinter import ttk
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from data_fetch import data_fetcher
+from metrics import timed
 
 
 class ChartsUI(ttk.Frame):
@@ -10,6 +12,7 @@ class ChartsUI(ttk.Frame):
         self.get_data = data_fetcher
         self.calendar_ui = calendar_ui
         self.canvas = None
+        self._request = 0  # latest chart asked for; older loads are dropped
         self.build_ui()
 
     def build_ui(self):
@@ -23,6 +26,26 @@ class ChartsUI(ttk.Frame):
         self.figure_container = ttk.Frame(self)
         self.figure_container.pack(fill='both', expand=True)
 
+    def load(self, chart_type, draw):
+        # data_fetch may fetch FX history for other currencies: run it off the Tk thread,
+        # draw when it's back (a newer click wins)
+        year, month = self.calendar_ui.year, self.calendar_ui.month
+        self._request = request = self._request + 1
+
+        def bg():
+            try:
+                data = self.get_data(chart_type, year, month)
+            except Exception as e:
+                print(f"Error loading {chart_type}: {e}")
+                return
+            try:
+                self.after(0, lambda: request == self._request and draw(data))
+            except Exception:
+                pass  # window closed while loading
+
+        threading.Thread(target=bg, daemon=True).start()
+
+    @timed("render.budget_chart")
     def display_chart(self, fig):
         # clear previous
         for widget in self.figure_container.winfo_children():
@@ -33,8 +56,9 @@ class ChartsUI(ttk.Frame):
         self.canvas = canvas
 
     def show_line_chart(self):
-        year, month = self.calendar_ui.year, self.calendar_ui.month
-        data = self.get_data('daily_totals', year, month)
+        self.load('daily_totals', self._draw_line_chart)
+
+    def _draw_line_chart(self, data):
         fig = Figure(figsize=(10, 4))
         ax = fig.add_subplot(111)
         ax.plot(data['dates'], data['values'], marker='o')
@@ -46,8 +70,9 @@ class ChartsUI(ttk.Frame):
         self.display_chart(fig)
 
     def show_pie_chart(self):
-        year, month = self.calendar_ui.year, self.calendar_ui.month
-        data = self.get_data('categories', year, month)
+        self.load('categories', self._draw_pie_chart)
+
+    def _draw_pie_chart(self, data):
         filtered = [(label, value) for label, value in zip(data['labels'], data['values']) if value != 0]
         filtered_labels = [label for label, value in filtered]
         filtered_values = [value for label, value in filtered]
@@ -62,8 +87,9 @@ class ChartsUI(ttk.Frame):
         self.display_chart(fig)
 
     def show_bar_chart(self):
-        year, month = self.calendar_ui.year, self.calendar_ui.month
-        data = self.get_data('income_expenses', year, month)
+        self.load('income_expenses', self._draw_bar_chart)
+
+    def _draw_bar_chart(self, data):
         fig = Figure(figsize=(6, 4))
         ax = fig.add_subplot(111)
         ax.bar(['Income', 'Expenses'], [data['income'], data['expenses']])
@@ -0,0 +1,263 @@
+"""
+Commodity Holdings
+- Gold, silver, platinum, palladium, copper, crude oil, natural gas: each a USD futures quote
+- One document (commodities.json): a cash balance plus qty and average cost per commodity
+- Every commodity is priced from one batched quote request; the cached prices are served
+  at once and revalidated in the background, and the quote age is shown next to them
+- Trades never use a cached or default price: trade_price() needs a quote inside the TTL
+- Summaries value all holdings in one vectorized pass
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from fx import BASE
+from state_store import load_json, save_json
+
+COMMODITIES = {
+    "gold": {"name": "Gold", "ticker": "GC=F", "unit": "oz"},
+    "silver": {"name": "Silver", "ticker": "SI=F", "unit": "oz"},
+    "platinum": {"name": "Platinum", "ticker": "PL=F", "unit": "oz"},
+    "palladium": {"name": "Palladium", "ticker": "PA=F", "unit": "oz"},
+    "copper": {"name": "Copper", "ticker": "HG=F", "unit": "lb"},
+    "oil": {"name": "Crude Oil (WTI)", "ticker": "CL=F", "unit": "bbl"},
+    "brent": {"name": "Brent Crude", "ticker": "BZ=F", "unit": "bbl"},
+    "natgas": {"name": "Natural Gas", "ticker": "NG=F", "unit": "MMBtu"},
+}
+PRICE_TTL_SECONDS = 60  # refresh in the background after this
+STALE_SECONDS = 15 * 60  # older than this is shown as stale
+QUOTE_FILE = "commodity_quotes.json"
+
+
+def format_age(seconds):
+    if seconds is None:
+        return "never"
+    if seconds < 60:
+        return f"{int(seconds)}s ago"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h ago"
+    return f"{int(seconds // 86400)}d ago"
+
+
+def key_for(name):
+    """Commodity key from a key, display name or ticker ("Gold", "GC=F" -> "gold")"""
+    name = (name or "").strip()
+    for key, c in COMMODITIES.items():
+        if name.lower() in (key, c["name"].lower()) or name.upper() == c["ticker"]:
+            return key
+    raise ValueError(f"Unknown commodity: {name}")
+
+
+class CommodityPrices:
+    def __init__(self, fetcher, defaults=None, ttl=PRICE_TTL_SECONDS, path=QUOTE_FILE):
+        self._fetch = fetcher  # [tickers] -> {ticker: quote dict or None}
+        self.defaults = defaults or {}  # key -> price used before any quote arrives
+        self.ttl = ttl
+        self.path = path
+        self._prices = {}  # key -> (fetched_at, USD price)
+        self.last_error = None
+        self._tried = 0.0  # last fetch attempt, so a failing source isn't hit on every call
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._load()
+
+    def _load(self):
+        data = load_json(self.path, None)
+        try:
+            self._prices = {k: (float(t), float(p)) for k, (t, p) in data.items() if k in COMMODITIES}
+        except Exception:
+            pass
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {k: list(v) for k, v in self._prices.items()}
+        save_json(self.path, data)
+
+    def fetch_now(self):
+        """One batched request for every commodity; returns the keys that got a price"""
+        tickers = {c["ticker"]: key for key, c in COMMODITIES.items()}
+        self._tried = time.time()
+        try:
+            quotes = self._fetch(list(tickers)) or {}
+        except Exception as e:
+            quotes = {}
+            self.last_error = str(e)
+        now = time.time()
+        got = {tickers[t]: float(q["price"]) for t, q in quotes.items() if t in tickers and q and q.get("price")}
+        if got:
+            with self._lock:
+                self._prices.update({k: (now, p) for k, p in got.items()})
+                self.last_error = None
+            self._save()
+        return list(got)
+
+    def _refresh_worker(self):
+        try:
+            self.fetch_now()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh(self):
+        """Start a background refresh unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._refresh_worker, daemon=True).start()
+        return True
+
+    def age(self, key):
+        hit = self._prices.get(key)
+        return None if hit is None else max(0.0, time.time() - hit[0])
+
+    def prices(self, keys=None):
+        """{key: USD price}: cached (revalidated in the background); blocks only for keys never priced"""
+        keys = list(keys or COMMODITIES)
+        ages = [self.age(k) for k in keys]
+        if None in ages:
+            if time.time() - self._tried > self.ttl:
+                self.fetch_now()
+        elif max(ages) > self.ttl:
+            self.refresh()
+        with self._lock:
+            out = {k: self._prices[k][1] for k in keys if k in self._prices}
+        for k in keys:
+            if k not in out and k in self.defaults:
+                out[k] = self.defaults[k]
+        return out
+
+    def price(self, key):
+        return self.prices([key]).get(key)
+
+    def trade_price(self, key):
+        """USD price to trade at: a quote no older than the TTL, fetched now if needed.
+        Cached and default prices are for display only; raises ValueError without a fresh one"""
+        age = self.age(key)
+        if age is None or age > self.ttl:
+            self.fetch_now()
+            age = self.age(key)
+        if age is None or age > self.ttl:
+            raise ValueError(f"No current {COMMODITIES[key]['name']} quote; try again when prices refresh")
+        return self._prices[key][1]
+
+    def quote(self, key):
+        """{"price", "age", "source", "stale"} without touching the network"""
+        hit = self._prices.get(key)
+        if hit is None:
+            return {"price": self.defaults.get(key), "age": None, "source": "default", "stale": True}
+        age = self.age(key)
+        return {"price": hit[1], "age": age, "source": "live" if age <= self.ttl else "cached",
+                "stale": age > STALE_SECONDS}
+
+
+class CommodityBook:
+    """Cash balance and holdings in one dict; mutate only inside the state store's edit()"""
+
+    def __init__(self, data):
+        self.data = data
+        data.setdefault("balance", 0.0)
+        data.setdefault("currency", BASE)  # balance and average costs
+        data.setdefault("holdings", {})  # key -> {"qty", "avg"}
+
+    @classmethod
+    def from_gold(cls, gold):
+        """Migrate the old single-gold gold_portfolio.json layout"""
+        data = {"balance": float(gold.get("balance", 0.0)), "currency": gold.get("currency") or BASE,
+                "holdings": {}}
+        if gold.get("gold_owned"):
+            data["holdings"]["gold"] = {"qty": float(gold["gold_owned"]),
+                                        "avg": float(gold.get("avg_purchase_price", 0.0))}
+        return cls(data)
+
+    @property
+    def balance(self):
+        return self.data["balance"]
+
+    @property
+    def currency(self):
+        return self.data["currency"]
+
+    def holding(self, key):
+        """(qty, avg cost) for a commodity; (0, 0) when not held"""
+        h = self.data["holdings"].get(key)
+        return (h["qty"], h["avg"]) if h else (0.0, 0.0)
+
+    def held(self):
+        return [k for k in COMMODITIES if self.holding(k)[0] > 0]
+
+    def set_balance(self, amount):
+        if amount < 0:
+            raise ValueError("Balance can't be negative")
+        self.data["balance"] = float(amount)
+
+    def buy(self, key, amount, price):
+        """Spend amount (in the book's currency) at price per unit; returns units bought"""
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        if amount > self.balance:
+            raise ValueError("Not enough balance.")
+        if not price or price <= 0:
+            raise ValueError(f"No price for {COMMODITIES[key]['name']}")
+        qty, avg = self.holding(key)
+        units = amount / price
+        new_avg = price if qty == 0 else (qty * avg + amount) / (qty + units)
+        self.data["holdings"][key] = {"qty": qty + units, "avg": new_avg}
+        self.data["balance"] -= amount
+        return units
+
+    def sell(self, key, price, qty=None):
+        """Sell qty units (all by default) at price; returns the cash received"""
+        held, avg = self.holding(key)
+        qty = held if qty is None else qty
+        if qty <= 0 or qty > held + 1e-12:
+            raise ValueError(f"You do not own that much {COMMODITIES[key]['name'].lower()}.")
+        cash = qty * price
+        left = held - qty
+        if left > 1e-12:
+            self.data["holdings"][key] = {"qty": left, "avg": avg}
+        else:
+            self.data["holdings"].pop(key, None)
+        self.data["balance"] += cash
+        return cash
+
+    def reset(self):
+        self.data.update({"balance": 0.0, "holdings": {}})
+
+    def summary(self, prices, keys=None):
+        """Value holdings against {key: price in the book's currency}; arrays aligned with keys"""
+        keys = list(keys) if keys is not None else self.held()
+        qty = np.array([self.holding(k)[0] for k in keys], dtype=float)
+        avg = np.array([self.holding(k)[1] for k in keys], dtype=float)
+        price = np.array([prices.get(k, np.nan) for k in keys], dtype=float)
+        value = qty * price
+        cost = qty * avg
+        profit = value - cost
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(cost > 0, profit / cost * 100, 0.0)
+        total_value = float(np.nansum(value))
+        priced = np.isfinite(price)  # unpriced holdings stay out of cost too, as in value_many
+        return {
+            "keys": keys,
+            "qty": qty,
+            "avg": avg,
+            "price": price,
+            "value": value,
+            "cost": cost,
+            "profit": profit,
+            "pct": pct,
+            "totals": {
+                "balance": self.balance,
+                "value": total_value,
+                "cost": float(cost[priced].sum()),
+                "unpriced": [k for k, ok in zip(keys, priced) if not ok],
+                "profit": float(np.nansum(profit)),
+                "total": self.balance + total_value,
+            },
+        }
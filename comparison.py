@@ -0,0 +1,68 @@
+"""
+Comparison Engine
+- Aligned date x ticker close matrix in, every comparison view out in one array pass
+- Rebased-to-100 series from a common base date, cumulative and log returns
+- Relative strength against a benchmark column or the equal-weight basket
+- Summary stats per ticker (total / annualized return, volatility, best and worst day)
+"""
+
+import warnings
+
+import numpy as np
+
+TRADING_DAYS = 252
+VIEWS = ("Rebased", "Cumulative %", "Log return", "Relative strength")
+
+
+def base_row(values):
+    """First row where every column has a price (falls back to 0)"""
+    full = np.flatnonzero(~np.isnan(values).any(axis=1))
+    return int(full[0]) if len(full) else 0
+
+
+def compare(prices, benchmark=None):
+    """All comparison views for an aligned close frame.
+
+    Series are rebased at the first date every ticker trades, so the lines
+    start together. Relative strength is rebased / benchmark rebased * 100,
+    with the equal-weight average of all tickers as the default benchmark.
+    """
+    values = prices.to_numpy(dtype=float)
+    cols = list(prices.columns)
+    b = base_row(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rebased = 100.0 * values / values[b]
+        log_cum = np.log(values / values[b])
+        daily = np.vstack([np.full((1, values.shape[1]), np.nan), values[1:] / values[:-1] - 1.0])
+        if benchmark in cols:
+            ref = rebased[:, cols.index(benchmark)][:, None]
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # rows with no prices stay NaN
+                ref = np.nanmean(rebased, axis=1, keepdims=True)
+        relative = 100.0 * rebased / ref
+
+    last = rebased[-1] / 100.0
+    years = max((len(values) - 1 - b) / TRADING_DAYS, 1e-9)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # tickers with no daily returns
+        stats = {
+            "total_return": last - 1.0,
+            "annual_return": np.where(years >= 1, last ** (1.0 / years) - 1.0, np.nan),
+            "volatility": np.nanstd(daily[b + 1:], axis=0) * np.sqrt(TRADING_DAYS),
+            "best_day": np.nanmax(daily[b + 1:], axis=0) if len(values) > b + 1 else np.full(len(cols), np.nan),
+            "worst_day": np.nanmin(daily[b + 1:], axis=0) if len(values) > b + 1 else np.full(len(cols), np.nan),
+        }
+    return {
+        "dates": prices.index,
+        "tickers": cols,
+        "base_date": prices.index[b],
+        "views": {
+            "Rebased": rebased,
+            "Cumulative %": (rebased - 100.0),
+            "Log return": log_cum,
+            "Relative strength": relative,
+        },
+        "stats": stats,
+        "order": np.argsort(-np.nan_to_num(stats["total_return"], nan=-np.inf)),  # best performer first
+    }
@@ -1,29 +1,97 @@
 import json
+import threading
 from datetime import date
 from pathlib import Path
 
+from metrics import registry, timed
+
 DATA_PATH = Path(__file__).parent / "transactions.json"
 
+_cache = {"stamp": None, "data": {}}  # parsed file, reused until it changes on disk
+_cache_lock = threading.Lock()
+
 
 def load_transactions():
+    # re-parse only when the file's mtime/size change; treat the result as read-only
     try:
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        st = DATA_PATH.stat()
     except FileNotFoundError:
         return {}
-
-
-def data_fetcher(chart_type, year, month):
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        if _cache["stamp"] == stamp:
+            registry.hit("budget.load")
+            return _cache["data"]
+    registry.miss("budget.load")
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    with _cache_lock:
+        _cache["stamp"], _cache["data"] = stamp, data
+    return data
+
+
+def data_fetcher(chart_type, year, month, currency=None):
     if chart_type == 'daily_totals':
-        return get_daily_totals_for_month(year, month)
+        return get_daily_totals_for_month(year, month, currency)
     elif chart_type == 'categories':
-        return get_category_breakdown_for_month(year, month)
+        return get_category_breakdown_for_month(year, month, currency)
     elif chart_type == 'income_expenses':
-        return get_income_expenses_for_month(year, month)
+        return get_income_expenses_for_month(year, month, currency)
     else:
         return {}
 
 
+# Aggregations run on a columnar copy of the file (numpy arrays sorted by day), so a month
+# is a binary-searched slice and currency conversion is one multiply per row. numpy and fx
+# are imported on first use to keep them off the startup path.
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _table():
+    import numpy as np
+    from fx import BASE
+    data = load_transactions()
+    with _cache_lock:
+        table = _cache.get("table")
+        if table is not None and table["data"] is data:
+            return table
+
+    def factorize(values):
+        index = {}
+        codes = [index.setdefault(v, len(index)) for v in values]
+        return list(index), np.asarray(codes, dtype=np.int64)
+
+    keys = sorted(k for k, txs in data.items() if txs)  # ISO dates sort chronologically
+    txs = [t for k in keys for t in data[k]]
+    table = {
+        "data": data,
+        "day": np.repeat([date.fromisoformat(k).toordinal() - _EPOCH for k in keys],
+                         [len(data[k]) for k in keys]).astype(np.int64),
+        "amount": np.fromiter((t.get("amount", 0) for t in txs), dtype=float, count=len(txs)),
+    }
+    table["currencies"], table["currency"] = factorize(t.get("currency") or BASE for t in txs)
+    table["categories"], table["category"] = factorize(t.get("category", "Other") for t in txs)
+    with _cache_lock:
+        _cache["table"] = table
+    return table
+
+
+def _month(year, month, currency):
+    # (first epoch day, days in month, row slice, amounts in currency) for one month
+    import calendar
+    import numpy as np
+    from fx import get_fx
+    t = _table()
+    first = date(year, month, 1).toordinal() - _EPOCH
+    num_days = calendar.monthrange(year, month)[1]
+    lo, hi = np.searchsorted(t["day"], [first, first + num_days])
+    rows = slice(lo, hi)
+    amounts = get_fx().convert_coded(t["amount"][rows], t["currencies"], t["currency"][rows],
+                                     currency, t["day"][rows])
+    return first, num_days, rows, np.nan_to_num(amounts)  # unknown rates were warned about
+
+
+@timed("budget.day")
 def get_transactions_for_day(year: int, month: int, day: int):
     # returns list of dicts for that date
     d = date(year, month, day)
@@ -32,53 +100,65 @@ def get_transactions_for_day(year: int, month: int, day: int):
     return data.get(key, [])
 
 
-def get_daily_totals_for_month(year: int, month: int):
+@timed("budget.daily_totals")
+def get_daily_totals_for_month(year: int, month: int, currency=None):
     # returns lists of dates and totals for days in the month (0 if none)
-    import calendar
-    data = load_transactions()
-    cal = calendar.monthrange(year, month)[1]
-    dates = []
-    totals = []
-    for d in range(1, cal+1):
-        key = date(year, month, d).isoformat()
-        txs = data.get(key, [])
-        total = sum(t.get('amount', 0) for t in txs)
-        dates.append(f"{month}/{d}")
-        totals.append(total)
-    return {"dates": dates, "values": totals}
-
-
-def get_category_breakdown_for_month(year: int, month: int):
-    data = load_transactions()
-    from datetime import date
-    import calendar
-    counts = {}
-    for d in range(1, calendar.monthrange(year, month)[1]+1):
-        key = date(year, month, d).isoformat()
-        for t in data.get(key, []):
-            cat = t.get('category', 'Other')
-            counts[cat] = counts.get(cat, 0) + (-t.get('amount', 0) if t.get('amount', 0) < 0 else 0)
-    labels = list(counts.keys())
-    values = [abs(v) for v in counts.values()]
+    import numpy as np
+    first, num_days, rows, amounts = _month(year, month, currency)
+    totals = np.bincount(_table()["day"][rows] - first, weights=amounts, minlength=num_days)
+    dates = [f"{month}/{d}" for d in range(1, num_days + 1)]
+    return {"dates": dates, "values": totals.tolist()}
+
+
+@timed("budget.categories")
+def get_category_breakdown_for_month(year: int, month: int, currency=None):
+    import numpy as np
+    t = _table()
+    _, _, rows, amounts = _month(year, month, currency)
+    cats = t["category"][rows]
+    spent = np.bincount(cats, weights=np.where(amounts < 0, -amounts, 0.0), minlength=len(t["categories"]))
+    # categories in the order they first appear in the month, like the calendar lists them
+    seen, first = np.unique(cats, return_index=True)
+    order = seen[np.argsort(first)]
+    labels = [t["categories"][i] for i in order]
+    values = spent[order].tolist()
     return {"labels": labels, "values": values}
 
 
-def get_income_expenses_for_month(year: int, month: int):
-    data = load_transactions()
-    from datetime import date
-    import calendar
-    num_days = calendar.monthrange(year, month)[1]
-
-    income = 0.0
-    expenses = 0.0
+@timed("budget.income_expenses")
+def get_income_expenses_for_month(year: int, month: int, currency=None):
+    _, _, _, amounts = _month(year, month, currency)
+    income = float(amounts[amounts > 0].sum())
+    expenses = float(-amounts[amounts < 0].sum())
+    return {"income": income, "expenses": expenses}
 
-    for day in range(1, num_days + 1):
-        key = date(year, month, day).isoformat()
-        for t in data.get(key, []):
-            amt = t.get("amount", 0)
-            if amt > 0:
-                income += amt
-            elif amt < 0:
-                expenses += abs(amt)
 
-    return {"income": income, "expenses": expenses}
+@timed("budget.month_summary")
+def get_month_summary(year: int, month: int, currency=None):
+    # everything the charts need for one month, from a single parse of the file
+    from fx import reporting_currency
+    currency = currency or reporting_currency()
+    return {
+        "year": year,
+        "month": month,
+        "currency": currency,
+        "daily_totals": get_daily_totals_for_month(year, month, currency),
+        "categories": get_category_breakdown_for_month(year, month, currency),
+        "income_expenses": get_income_expenses_for_month(year, month, currency),
+    }
+
+
+@timed("budget.income_expenses_all_years")
+def get_income_expenses_all_years(month: int, currency=None):
+    # income and expenses for one calendar month summed over every year (the home summary)
+    import numpy as np
+    from fx import get_fx, reporting_currency
+    currency = currency or reporting_currency()
+    t = _table()
+    months = (t["day"].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) % 12) + 1
+    rows = months == month
+    amounts = np.nan_to_num(get_fx().convert_coded(t["amount"][rows], t["currencies"], t["currency"][rows],
+                                                   currency, t["day"][rows]))
+    income = float(amounts[amounts > 0].sum())
+    expenses = float(-amounts[amounts < 0].sum())
+    return {"income": income, "expenses": expenses, "currency": currency}
@@ -0,0 +1,157 @@
+"""
+Earnings Calendar
+- Upcoming earnings dates for holdings and favorites, fetched as one concurrent batch
+- Persisted with a per-ticker expiry so restarts and month flips stay offline
+- Date index (sorted + bisect) answers "what reports this month" without any network call
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from state_store import load_json, save_json
+
+EARNINGS_TTL_SECONDS = 12 * 60 * 60
+EARNINGS_WORKERS = 8
+EARNINGS_FILE = "earnings_cache.json"
+
+
+def _to_iso(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if hasattr(value, "to_pydatetime"):  # pandas Timestamp
+        return value.to_pydatetime().strftime("%Y-%m-%d")
+    text = str(value).strip()
+    try:
+        return datetime.strptime(text[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def earnings_dates(cal):
+    """ISO dates from a calendar dict ({"Earnings Date": [..]} or {"Earnings Date": {col: ..}})"""
+    if not cal:
+        return []
+    raw = cal.get("Earnings Date")
+    if isinstance(raw, dict):
+        raw = list(raw.values())
+    elif raw is not None and not isinstance(raw, (list, tuple)):
+        raw = [raw]
+    return sorted({d for d in map(_to_iso, raw or []) if d})
+
+
+class EarningsCalendar:
+    def __init__(self, fetcher, ttl=EARNINGS_TTL_SECONDS, path=EARNINGS_FILE, workers=EARNINGS_WORKERS):
+        self._fetch = fetcher  # ticker -> calendar dict or None
+        self.ttl = ttl
+        self.path = path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._queued = {}  # tickers asked for while a refresh runs (ordered set)
+        self._queued_callbacks = []
+        self._entries = self._load()  # ticker -> {"fetched_at", "dates"}
+        self._reindex()
+
+    def _load(self):
+        return load_json(self.path, {})
+
+    def _save(self, data):
+        if self.path:
+            save_json(self.path, data)
+
+    def _reindex(self):
+        # flat (date, ticker) list sorted by date; month lookups are two bisects
+        with self._lock:
+            events = sorted((d, t) for t, e in self._entries.items() for d in e.get("dates", []))
+        self._index = ([d for d, _ in events], events)  # swapped in one assignment
+
+    # -------------------------
+    # Fetching
+    # -------------------------
+    def stale(self, tickers):
+        now = time.time()
+        with self._lock:
+            return [t for t in dict.fromkeys(tickers)
+                    if t not in self._entries or now - self._entries[t]["fetched_at"] > self.ttl]
+
+    def _fetch_one(self, ticker):
+        try:
+            return ticker, self._fetch(ticker)
+        except Exception as e:
+            print(f"Error fetching earnings for {ticker}: {e}")
+            return ticker, None
+
+    def refresh(self, tickers, force=False):
+        """Fetch stale tickers concurrently; returns the tickers that were fetched"""
+        todo = list(dict.fromkeys(tickers)) if force else self.stale(tickers)
+        if not todo:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+            results = list(pool.map(self._fetch_one, todo))
+        now = time.time()
+        with self._lock:
+            for t, cal in results:
+                self._entries[t] = {"fetched_at": now, "dates": earnings_dates(cal)}
+            snapshot = dict(self._entries)
+        self._save(snapshot)
+        self._reindex()
+        return todo
+
+    def refresh_async(self, tickers, callback=None):
+        """refresh() on a background thread; callback(fetched) runs on that thread when done.
+        While a refresh is running the tickers are queued for the next round instead
+        (returns False then); nothing asked for is dropped"""
+        with self._lock:
+            if self._refreshing:
+                self._queued.update(dict.fromkeys(tickers))
+                if callback:
+                    self._queued_callbacks.append(callback)
+                return False
+            self._refreshing = True
+
+        def worker():
+            todo, callbacks = tickers, [callback] if callback else []
+            while True:
+                try:
+                    fetched = self.refresh(todo)
+                except Exception as e:
+                    print("Earnings refresh failed:", e)
+                    fetched = []
+                with self._lock:
+                    todo, self._queued = list(self._queued), {}
+                    queued, self._queued_callbacks = self._queued_callbacks, []
+                    self._refreshing = bool(todo)
+                for cb in callbacks:
+                    if fetched:
+                        cb(fetched)
+                if not todo:
+                    return
+                callbacks = queued
+
+        threading.Thread(target=worker, name="earnings-refresh", daemon=True).start()
+        return True
+
+    # -------------------------
+    # Lookups (cache only)
+    # -------------------------
+    def dates_for(self, ticker):
+        with self._lock:
+            return list((self._entries.get(ticker) or {}).get("dates", []))
+
+    def events_between(self, start, end):
+        """[(iso date, ticker)] with start <= date <= end (ISO strings)"""
+        dates, events = self._index
+        return events[bisect_left(dates, start):bisect_right(dates, end)]
+
+    def events_for_month(self, year, month):
+        """{day: [tickers]} for one month"""
+        prefix = f"{year:04d}-{month:02d}-"
+        out = {}
+        for d, t in self.events_between(prefix + "01", prefix + "31"):
+            out.setdefault(int(d[8:10]), []).append(t)
+        return out
@@ -0,0 +1,279 @@
+"""
+FX Rates
+- USD per unit of each currency, from Yahoo pairs (EURUSD=X, ...); any cross goes through USD
+- Spot rates are cached for SPOT_TTL_SECONDS; expired ones are served while one batched
+  quote request refreshes them in the background (only unknown currencies block)
+- Daily history (for backdated conversions) is cached for HISTORY_TTL_SECONDS and kept on disk
+  in its own file, so a spot refresh rewrites only the few spot rates
+- convert() multiplies whole arrays: one rate lookup per distinct currency, a binary
+  search per row for dated amounts
+- Minor units (GBp, ZAc, ILA) are scaled to their major currency
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from state_store import load_json, save_json
+
+BASE = "USD"
+CURRENCIES = ("USD", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "INR", "MXN")
+MINOR_UNITS = {"GBp": ("GBP", 0.01), "GBX": ("GBP", 0.01), "ZAc": ("ZAR", 0.01), "ILA": ("ILS", 0.01)}
+SPOT_TTL_SECONDS = 60
+HISTORY_TTL_SECONDS = 12 * 3600
+HISTORY_PERIOD = "5y"
+FX_FILE = "fx_rates.json"
+FX_HISTORY_FILE = "fx_history.json"
+SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "CNY": "¥", "INR": "₹"}
+
+
+def pair_symbol(ccy):
+    """Yahoo symbol quoting USD per unit of ccy"""
+    return f"{ccy}{BASE}=X"
+
+
+def unit(ccy):
+    """(major currency code, scale to it): "GBp" -> ("GBP", 0.01); None means USD"""
+    if not ccy:
+        return BASE, 1.0
+    if ccy in MINOR_UNITS:
+        return MINOR_UNITS[ccy]
+    return ccy.upper(), 1.0
+
+
+def money(amount, ccy=BASE):
+    """Format an amount with its currency: $1,234.56, €1,234.56, CAD 1,234.56"""
+    code, scale = unit(ccy)
+    amount *= scale  # pence are shown as pounds
+    return f"{SYMBOLS[code]}{amount:,.2f}" if code in SYMBOLS else f"{code} {amount:,.2f}"
+
+
+def epoch_days(dates):
+    """Days since 1970-01-01 for ISO date strings, datetimes or a DatetimeIndex"""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def _live_quotes(symbols):
+    from market_data import fetch_quotes
+    return fetch_quotes(symbols)
+
+
+def _live_history(symbol, period=HISTORY_PERIOD):
+    from market_data import fetch_history
+    return fetch_history(symbol, period=period)
+
+
+class FXRates:
+    def __init__(self, quotes=None, history=None, path=FX_FILE, history_path=None,
+                 spot_ttl=SPOT_TTL_SECONDS, history_ttl=HISTORY_TTL_SECONDS):
+        self._quotes = quotes or _live_quotes  # [symbol] -> {symbol: quote dict}
+        self._history = history or _live_history  # symbol, period= -> OHLC frame or None
+        self.path = path  # spot rates; None: memory only (offline stand-ins shouldn't overwrite real rates)
+        if history_path is None and path is not None:
+            history_path = os.path.join(os.path.dirname(path), FX_HISTORY_FILE)
+        self.history_path = history_path
+        self.spot_ttl = spot_ttl
+        self.history_ttl = history_ttl
+        self._spot = {}  # ccy -> (fetched_at, USD per unit)
+        self._hist = {}  # ccy -> (fetched_at, epoch days, USD per unit), days ascending
+        self._tried = {}  # (kind, ccy) -> last fetch attempt, so failures aren't retried every call
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # background refreshes may save at the same time
+        self._warned = set()
+        self._load()
+
+    # -------------------------
+    # Cache
+    # -------------------------
+    def _load(self):
+        data = load_json(self.path, None)
+        if isinstance(data, dict):
+            self._spot = {c: tuple(v) for c, v in data.get("spot", {}).items()}
+        hist = load_json(self.history_path, None)
+        if not isinstance(hist, dict) and isinstance(data, dict):
+            hist = data  # files written before history had its own kept it here
+        for c, h in (hist or {}).get("history", {}).items():
+            self._hist[c] = (h["fetched"], np.asarray(h["days"], dtype=np.int64), np.asarray(h["rates"], dtype=float))
+
+    def _save_spot(self):
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"spot": {c: list(v) for c, v in self._spot.items()}}
+        with self._save_lock:
+            save_json(self.path, data)
+
+    def _save_history(self):
+        if self.history_path is None:
+            return
+        with self._lock:
+            data = {"history": {c: {"fetched": t, "days": d.tolist(), "rates": r.tolist()}
+                                for c, (t, d, r) in self._hist.items()}}
+        with self._save_lock:
+            save_json(self.history_path, data)
+
+    def spot(self, currencies):
+        """{ccy: USD per unit}; stale currencies are refreshed in one batched request"""
+        codes = {unit(c)[0] for c in currencies} - {BASE}
+        now = time.time()
+        with self._lock:
+            stale = [c for c in codes if (c not in self._spot or now - self._spot[c][0] > self.spot_ttl)
+                     and now - self._tried.get(("spot", c), 0) > self.spot_ttl]
+            self._tried.update({("spot", c): now for c in stale})
+            unknown = any(c not in self._spot for c in stale)
+        if stale and unknown:
+            self._fetch_spot(stale)
+        elif stale:
+            threading.Thread(target=self._fetch_spot, args=(stale,), daemon=True).start()
+        with self._lock:
+            # a failed refresh keeps serving the last known rate
+            out = {c: self._spot[c][1] for c in codes if c in self._spot}
+        out[BASE] = 1.0
+        return out
+
+    def _fetch_spot(self, codes):
+        try:
+            quotes = self._quotes([pair_symbol(c) for c in codes]) or {}
+        except Exception as e:
+            print(f"Error fetching FX rates: {e}")
+            quotes = {}
+        now = time.time()
+        got = {}
+        for c in codes:
+            q = quotes.get(pair_symbol(c))
+            if q and q.get("price"):
+                got[c] = (now, float(q["price"]))
+        if not got:
+            return
+        with self._lock:
+            self._spot.update(got)
+        self._save_spot()
+
+    def history(self, ccy):
+        """(epoch days, USD per unit) daily closes for ccy, or None"""
+        code = unit(ccy)[0]
+        if code == BASE:
+            return None
+        now = time.time()
+        with self._lock:
+            hit = self._hist.get(code)
+            fresh = hit and now - hit[0] < self.history_ttl
+            if fresh or now - self._tried.get(("history", code), 0) < self.spot_ttl:
+                return (hit[1], hit[2]) if hit else None
+            self._tried[("history", code)] = now
+        try:
+            df = self._history(pair_symbol(code), period=HISTORY_PERIOD)
+        except Exception as e:
+            print(f"Error fetching FX history for {code}: {e}")
+            df = None
+        if df is not None and not df.empty:
+            closes = df["Close"].dropna()
+            idx = closes.index.tz_localize(None) if getattr(closes.index, "tz", None) else closes.index
+            hit = (time.time(), epoch_days(idx.normalize()), closes.to_numpy(dtype=float))
+            with self._lock:
+                self._hist[code] = hit
+            self._save_history()
+        return (hit[1], hit[2]) if hit else None
+
+    # -------------------------
+    # Rates / conversion
+    # -------------------------
+    def usd_per(self, ccy, days=None):
+        """USD per unit of ccy now (float), or as of each epoch day in days (array); NaN if unknown"""
+        code, scale = unit(ccy)
+        if code == BASE:
+            return scale if days is None else np.full(len(days), scale)
+        spot = self.spot([code]).get(code)
+        hist = self.history(code) if days is not None or spot is None else None
+        if days is None:
+            rate = spot if spot is not None else (hist[1][-1] if hist else np.nan)
+            if np.isnan(rate):
+                self._warn(code)
+            return rate * scale
+        days = np.asarray(days, dtype=np.int64)
+        if hist is None:
+            if spot is None:
+                self._warn(code)
+            return np.full(len(days), (spot if spot is not None else np.nan) * scale)
+        d, r = hist
+        out = r[np.clip(np.searchsorted(d, days, side="right") - 1, 0, len(r) - 1)]
+        if spot is not None:
+            out = np.where(days > d[-1], spot, out)  # newer than the last close: today's rate
+        return out * scale
+
+    def rate(self, frm, to, days=None):
+        """Units of `to` per unit of `frm` (float, or array as of days)"""
+        if unit(frm) == unit(to):
+            return 1.0 if days is None else np.ones(len(days))
+        return self.usd_per(frm, days) / self.usd_per(to, days)
+
+    def rates(self, currencies, to=None):
+        """{ccy: units of `to` per unit} for several currencies from one batched spot refresh"""
+        to = to or reporting_currency()
+        currencies = set(filter(None, currencies)) | {to}
+        self.spot(currencies)
+        return {c: self.rate(c, to) for c in currencies}
+
+    def convert(self, amounts, currencies, to=None, days=None):
+        """amounts (array) in currencies (one code or one per row) -> amounts in `to`"""
+        amounts = np.asarray(amounts, dtype=float)
+        if isinstance(currencies, str) or currencies is None:
+            return amounts * self.rate(currencies, to or reporting_currency(), days)
+        codes, inv = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        return self.convert_coded(amounts, codes, inv, to, days)
+
+    def convert_coded(self, amounts, codes, inv, to=None, days=None):
+        """convert() for currencies already factorized: codes[inv[i]] is row i's currency"""
+        to = to or reporting_currency()
+        amounts = np.asarray(amounts, dtype=float)
+        if all(unit(c) == unit(to) for c in codes):
+            return amounts
+        if len(codes) == 1:
+            return amounts * self.rate(codes[0], to, days)
+        factor = np.empty(len(amounts))
+        for i, c in enumerate(codes):
+            rows = inv == i
+            factor[rows] = self.rate(c, to, days[rows] if days is not None else None)
+        return amounts * factor
+
+    def _warn(self, code):
+        if code not in self._warned:
+            self._warned.add(code)
+            print(f"No FX rate for {code}; amounts in {code} are left out of totals")
+
+
+# ---------------------------
+# Shared rates / reporting currency
+# ---------------------------
+_fx = None
+_fx_lock = threading.Lock()
+_reporting = BASE
+
+
+def get_fx():
+    """Process-wide rate cache, created on first use"""
+    global _fx
+    with _fx_lock:
+        if _fx is None:
+            _fx = FXRates()
+        return _fx
+
+
+def set_fx(rates):
+    """Install a rate cache process-wide (e.g. one backed by offline_data)"""
+    global _fx
+    with _fx_lock:
+        _fx = rates
+    return rates
+
+
+def reporting_currency():
+    return _reporting
+
+
+def set_reporting_currency(ccy):
+    global _reporting
+    _reporting = unit(ccy)[0]
+    return _reporting
@@ -0,0 +1,308 @@
+"""
+Technical Indicators
+- SMA, EMA, RSI (Wilder), Bollinger Bands and MACD over a close array
+- compute() is the vectorized pass over a full history and seeds the indicator's state
+- update() extends it by one tick in O(1): a tick in the current bar revises the
+  last value, a tick in a new bar appends one
+- IndicatorEngine keeps one set per ticker so live quotes feed every chart cheaply
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+BAR_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60}
+PANES = ("price", "rsi", "macd")
+
+
+# ---------------------------
+# Vectorized forms
+# ---------------------------
+def sma(values, n):
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def ema(values, n=None, alpha=None):
+    """Recursive EMA seeded with the first value (pandas ewm, adjust=False)"""
+    alpha = alpha if alpha is not None else 2.0 / (n + 1)
+    return pd.Series(np.asarray(values, dtype=float)).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def rolling_std(values, n):
+    """Population std over a trailing window (windowed sums of x and x^2)"""
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        c1 = np.concatenate(([0.0], np.cumsum(x)))
+        c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+        mean = (c1[n:] - c1[:-n]) / n
+        out[n - 1:] = np.sqrt(np.maximum((c2[n:] - c2[:-n]) / n - mean * mean, 0.0))
+    return out
+
+
+def _wilder(values, n):
+    # RSI plus the smoothed gain/loss averages behind it
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) <= n:
+        return out, np.array([]), np.array([])
+    delta = np.diff(x)
+    gain = ema(np.clip(delta, 0, None), alpha=1.0 / n)
+    loss = ema(np.clip(-delta, 0, None), alpha=1.0 / n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), 100.0)
+    out[:n] = np.nan
+    return out, gain, loss
+
+
+def rsi(values, n=14):
+    return _wilder(values, n)[0]
+
+
+def bollinger(values, n=20, k=2.0):
+    mid = sma(values, n)
+    sd = rolling_std(values, n)
+    return mid, mid + k * sd, mid - k * sd
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    line = ema(values, fast) - ema(values, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+# ---------------------------
+# Incremental indicators
+# ---------------------------
+def _last_two(arr):
+    # (last, one before) as floats, None where missing
+    last = float(arr[-1]) if len(arr) else None
+    prev = float(arr[-2]) if len(arr) > 1 else None
+    return last, prev
+
+
+class _EMAState:
+    def __init__(self, alpha, values=()):
+        self.alpha = alpha
+        self.value, self._prev = _last_two(values)  # _prev: value before the last bar, for revisions
+
+    def update(self, x, replace=False):
+        if not replace:
+            self._prev = self.value
+        base = self._prev
+        self.value = x if base is None else base + self.alpha * (x - base)
+        return self.value
+
+
+class SMA:
+    pane = "price"
+
+    def __init__(self, n=20):
+        self.n = n
+        self.name = f"SMA {n}"
+
+    def compute(self, closes):
+        self._window = deque(np.asarray(closes, dtype=float)[-self.n:], maxlen=self.n)
+        self._sum = float(sum(self._window))
+        return {self.name: sma(closes, self.n)}
+
+    def update(self, x, replace=False):
+        w = self._window
+        if replace and w:
+            self._sum += x - w[-1]
+            w[-1] = x
+        else:
+            if len(w) == self.n:
+                self._sum -= w[0]
+            w.append(x)
+            self._sum += x
+        return {self.name: self._sum / self.n if len(w) == self.n else np.nan}
+
+
+class EMA:
+    pane = "price"
+
+    def __init__(self, n=20):
+        self.n = n
+        self.name = f"EMA {n}"
+
+    def compute(self, closes):
+        out = ema(closes, self.n)
+        self._state = _EMAState(2.0 / (self.n + 1), out)
+        return {self.name: out}
+
+    def update(self, x, replace=False):
+        return {self.name: self._state.update(x, replace)}
+
+
+class Bollinger:
+    pane = "price"
+
+    def __init__(self, n=20, k=2.0):
+        self.n = n
+        self.k = k
+        self.name = f"Bollinger {n}"
+
+    def compute(self, closes):
+        self._window = deque(np.asarray(closes, dtype=float)[-self.n:], maxlen=self.n)
+        self._sum = float(sum(self._window))
+        self._sumsq = float(sum(v * v for v in self._window))
+        mid, upper, lower = bollinger(closes, self.n, self.k)
+        return {f"{self.name} mid": mid, f"{self.name} upper": upper, f"{self.name} lower": lower}
+
+    def update(self, x, replace=False):
+        w = self._window
+        if replace and w:
+            self._sum += x - w[-1]
+            self._sumsq += x * x - w[-1] * w[-1]
+            w[-1] = x
+        else:
+            if len(w) == self.n:
+                self._sum -= w[0]
+                self._sumsq -= w[0] * w[0]
+            w.append(x)
+            self._sum += x
+            self._sumsq += x * x
+        if len(w) < self.n:
+            mid = sd = np.nan
+        else:
+            mid = self._sum / self.n
+            sd = np.sqrt(max(self._sumsq / self.n - mid * mid, 0.0))
+        return {f"{self.name} mid": mid, f"{self.name} upper": mid + self.k * sd,
+                f"{self.name} lower": mid - self.k * sd}
+
+
+class RSI:
+    pane = "rsi"
+
+    def __init__(self, n=14):
+        self.n = n
+        self.name = f"RSI {n}"
+
+    def compute(self, closes):
+        out, gain, loss = _wilder(closes, self.n)
+        last, before = _last_two(closes)
+        g1, g0 = _last_two(gain)
+        l1, l0 = _last_two(loss)
+        self._state = (last, g1, l1)
+        self._prev = (before, g0, l0)  # averages before the last bar, for revising it
+        return {self.name: out}
+
+    def update(self, x, replace=False):
+        if not replace:
+            self._prev = self._state
+        last, gain, loss = self._prev
+        if last is None:
+            self._state = (x, gain, loss)
+            return {self.name: np.nan}
+        a = 1.0 / self.n
+        d = x - last
+        gain = max(d, 0.0) if gain is None else gain + a * (max(d, 0.0) - gain)
+        loss = max(-d, 0.0) if loss is None else loss + a * (max(-d, 0.0) - loss)
+        self._state = (x, gain, loss)
+        return {self.name: 100.0 - 100.0 / (1.0 + gain / loss) if loss > 0 else 100.0}
+
+
+class MACD:
+    pane = "macd"
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.name = "MACD"
+
+    def compute(self, closes):
+        f, s = ema(closes, self.fast), ema(closes, self.slow)
+        line = f - s
+        sig = ema(line, self.signal)
+        self._states = (
+            _EMAState(2.0 / (self.fast + 1), f),
+            _EMAState(2.0 / (self.slow + 1), s),
+            _EMAState(2.0 / (self.signal + 1), sig),
+        )
+        return {"MACD": line, "MACD signal": sig, "MACD hist": line - sig}
+
+    def update(self, x, replace=False):
+        fast, slow, sig = self._states
+        line = fast.update(x, replace) - slow.update(x, replace)
+        s = sig.update(line, replace)
+        return {"MACD": line, "MACD signal": s, "MACD hist": line - s}
+
+
+INDICATORS = {
+    "SMA 20": lambda: SMA(20),
+    "SMA 50": lambda: SMA(50),
+    "EMA 20": lambda: EMA(20),
+    "Bollinger 20": lambda: Bollinger(20),
+    "RSI 14": lambda: RSI(14),
+    "MACD": lambda: MACD(),
+}
+
+
+# ---------------------------
+# Per-ticker sets
+# ---------------------------
+def bar_key(when, interval):
+    """Which bar a timestamp falls in, for the chart interval"""
+    if interval in BAR_MINUTES:
+        minutes = when.hour * 60 + when.minute
+        return when.date(), minutes // BAR_MINUTES[interval]
+    if interval == "1wk":
+        return tuple(when.isocalendar()[:2])
+    if interval == "1mo":
+        return when.year, when.month
+    return when.date()
+
+
+class IndicatorSet:
+    def __init__(self, index, closes, names, interval="1d"):
+        closes = np.asarray(closes, dtype=float)
+        self.interval = interval
+        self.tz = getattr(index, "tz", None)
+        self.last_bar = bar_key(index[-1], interval) if len(index) else None
+        # names from INDICATORS, or indicator instances for custom windows
+        self.indicators = [INDICATORS[n]() if isinstance(n, str) else n
+                           for n in names if not isinstance(n, str) or n in INDICATORS]
+        self.series = {}  # output name -> full array (from the vectorized pass)
+        self.panes = {}  # output name -> pane
+        for ind in self.indicators:
+            for key, arr in ind.compute(closes).items():
+                self.series[key] = arr
+                self.panes[key] = ind.pane
+        self.latest = {k: (v[-1] if len(v) else np.nan) for k, v in self.series.items()}
+
+    def tick(self, price, when=None):
+        """Fold a live price in; returns (latest values, True if it started a new bar)"""
+        when = pd.Timestamp.now(tz=self.tz) if when is None else pd.Timestamp(when)
+        key = bar_key(when, self.interval)
+        new_bar = key != self.last_bar
+        self.last_bar = key
+        for ind in self.indicators:
+            self.latest.update(ind.update(float(price), replace=not new_bar))
+        return self.latest, new_bar
+
+
+class IndicatorEngine:
+    def __init__(self):
+        self.sets = {}
+
+    def load(self, ticker, df, names, interval="1d"):
+        """Vectorized pass over a fetch_history frame; replaces any previous set for ticker"""
+        closes = df["Close"].dropna()
+        self.sets[ticker] = IndicatorSet(closes.index, closes.to_numpy(), names, interval)
+        return self.sets[ticker]
+
+    def tick(self, ticker, price, when=None):
+        s = self.sets.get(ticker)
+        if s is None or price is None:
+            return None
+        return s.tick(price, when)
+
+    def tick_many(self, prices, when=None):
+        """{ticker: price} -> {ticker: (latest, new_bar)} for tickers with a loaded set"""
+        return {t: self.tick(t, p, when) for t, p in prices.items() if t in self.sets and p is not None}
@@ -0,0 +1,214 @@
+"""
+Trade Ledger
+- Append-only trade history (buys, sells, opening balances)
+- Lot-level cost basis: FIFO, LIFO or specific-lot selling
+- Indexed by ticker and by date, so reports only touch one ticker's lots
+- Migrates the old {ticker: {qty, avg}} positions into opening lots
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+METHODS = ("fifo", "lifo", "specific")
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class TradeLedger:
+    def __init__(self, trades=None):
+        self.trades = []  # append-only, never rewritten
+        self.lots = {}  # ticker -> open lots, oldest first
+        self.realized = {}  # ticker -> closed lot slices
+        self._by_ticker = {}  # ticker -> [trade index]
+        self._by_date = []  # sorted (date, trade index)
+        for t in trades or []:
+            self._apply(t)
+
+    # -------------------------
+    # Construction / persistence
+    # -------------------------
+    @classmethod
+    def from_positions(cls, positions, date=None):
+        """Opening lots for an existing portfolio.json positions mapping"""
+        ledger = cls()
+        date = date or _now()
+        for ticker, pos in positions.items():
+            if pos.get("qty", 0) > 0:
+                ledger.record("open", ticker, pos["qty"], pos.get("avg", 0.0), date=date)
+        return ledger
+
+    def to_json(self):
+        return list(self.trades)
+
+    # -------------------------
+    # Recording trades
+    # -------------------------
+    def record(self, side, ticker, qty, price, date=None, method="fifo", lot_ids=None, currency=None):
+        """Append a trade and update lots; returns the trade dict (price is in currency, the ticker's own)"""
+        if side not in ("buy", "sell", "open"):
+            raise ValueError(f"Unknown side: {side}")
+        if qty <= 0:
+            raise ValueError("Quantity must be positive")
+        trade = {
+            "id": len(self.trades) + 1,
+            "date": date or _now(),
+            "ticker": ticker,
+            "side": side,
+            "qty": qty,
+            "price": float(price),
+        }
+        if currency:
+            trade["currency"] = currency
+        if side == "sell":
+            # resolve which lots are sold now, so replaying the ledger is exact
+            trade["lots"] = self._select_lots(ticker, qty, method, lot_ids)
+            trade["method"] = method
+        self._apply(trade)
+        return trade
+
+    def _select_lots(self, ticker, qty, method, lot_ids=None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown cost basis method: {method}")
+        open_lots = self.lots.get(ticker, [])
+        if sum(l["remaining"] for l in open_lots) < qty:
+            raise Exception("Not enough shares")
+        if method == "fifo":
+            order = open_lots
+        elif method == "lifo":
+            order = list(reversed(open_lots))
+        else:
+            by_id = {l["lot_id"]: l for l in open_lots}
+            missing = [i for i in lot_ids or [] if i not in by_id]
+            if missing or not lot_ids:
+                raise Exception(f"Unknown lot(s): {', '.join(missing) or 'none given'}")
+            repeated = [i for i in dict.fromkeys(lot_ids) if lot_ids.count(i) > 1]
+            if repeated:
+                raise Exception(f"Lot(s) listed more than once: {', '.join(repeated)}")
+            order = [by_id[i] for i in dict.fromkeys(lot_ids)]
+
+        picks = []
+        left = qty
+        taken = {}  # lot_id -> shares already picked, so no lot is sold past its remaining
+        for lot in order:
+            if left <= 0:
+                break
+            take = min(lot["remaining"] - taken.get(lot["lot_id"], 0), left)
+            if take <= 0:
+                continue
+            taken[lot["lot_id"]] = taken.get(lot["lot_id"], 0) + take
+            picks.append([lot["lot_id"], take])
+            left -= take
+        if left > 0:
+            raise Exception("Selected lots do not cover the quantity")
+        return picks
+
+    def _apply(self, trade):
+        idx = len(self.trades)
+        self.trades.append(trade)
+        ticker = trade["ticker"]
+        self._by_ticker.setdefault(ticker, []).append(idx)
+        insort(self._by_date, (trade["date"], idx))
+
+        if trade["side"] in ("buy", "open"):
+            self.lots.setdefault(ticker, []).append({
+                "lot_id": f"{ticker}-{trade['id']}",
+                "date": trade["date"],
+                "qty": trade["qty"],
+                "remaining": trade["qty"],
+                "price": trade["price"],
+            })
+            return
+
+        lots = {l["lot_id"]: l for l in self.lots.get(ticker, [])}
+        closed = self.realized.setdefault(ticker, [])
+        for lot_id, take in trade["lots"]:
+            lot = lots[lot_id]
+            lot["remaining"] -= take
+            cost = take * lot["price"]
+            proceeds = take * trade["price"]
+            closed.append({
+                "trade_id": trade["id"],
+                "lot_id": lot_id,
+                "qty": take,
+                "open_date": lot["date"],
+                "close_date": trade["date"],
+                "cost": cost,
+                "proceeds": proceeds,
+                "gain": proceeds - cost,
+            })
+        self.lots[ticker] = [l for l in self.lots[ticker] if l["remaining"] > 0]
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def trades_for(self, ticker):
+        return [self.trades[i] for i in self._by_ticker.get(ticker, [])]
+
+    def trades_between(self, start, end):
+        """Trades with start <= date <= end (ISO strings or dates)"""
+        start, end = str(start), str(end)
+        # pad the end so a bare date includes trades made later that day
+        lo = bisect_left(self._by_date, (start, -1))
+        hi = bisect_right(self._by_date, (end + "\uffff", len(self.trades)))
+        return [self.trades[i] for _, i in self._by_date[lo:hi]]
+
+    def open_lots(self, ticker):
+        return list(self.lots.get(ticker, []))
+
+    def tickers(self):
+        return [t for t, lots in self.lots.items() if lots]
+
+    def currency(self, ticker, default=None):
+        """Currency of the ticker's latest trade that recorded one (older trades may not)"""
+        for i in reversed(self._by_ticker.get(ticker, [])):
+            if self.trades[i].get("currency"):
+                return self.trades[i]["currency"]
+        return default
+
+    def position(self, ticker):
+        """(qty, average cost of the remaining lots)"""
+        lots = self.lots.get(ticker, [])
+        qty = sum(l["remaining"] for l in lots)
+        cost = sum(l["remaining"] * l["price"] for l in lots)
+        return qty, (cost / qty if qty else 0.0)
+
+    def positions(self):
+        """Positions mapping in the portfolio.json shape"""
+        out = {}
+        for t in self.tickers():
+            qty, avg = self.position(t)
+            out[t] = {"qty": qty, "avg": avg}
+        return out
+
+    # -------------------------
+    # Reports
+    # -------------------------
+    def realized_gains(self, ticker):
+        closed = self.realized.get(ticker, [])
+        return {
+            "ticker": ticker,
+            "qty": sum(c["qty"] for c in closed),
+            "cost": sum(c["cost"] for c in closed),
+            "proceeds": sum(c["proceeds"] for c in closed),
+            "gain": sum(c["gain"] for c in closed),
+        }
+
+    def unrealized_gains(self, ticker, price):
+        lots = self.lots.get(ticker, [])
+        rows = [{
+            "lot_id": l["lot_id"],
+            "date": l["date"],
+            "qty": l["remaining"],
+            "cost": l["remaining"] * l["price"],
+            "value": l["remaining"] * price,
+            "gain": l["remaining"] * (price - l["price"]),
+        } for l in lots]
+        return {
+            "ticker": ticker,
+            "lots": rows,
+            "cost": sum(r["cost"] for r in rows),
+            "value": sum(r["value"] for r in rows),
+            "gain": sum(r["gain"] for r in rows),
+        }
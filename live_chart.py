@@ -0,0 +1,115 @@
+"""
+Live Chart Series
+- Keeps a chart's line artists in sync with live ticks without rebuilding the figure
+- Points live in preallocated buffers; a tick revises the last point or appends one
+- Optional sliding window (live intraday mode): old bars fall off, the x range follows
+- Axis limits change only when a new value leaves the visible range
+"""
+
+import numpy as np
+
+Y_PAD = 0.05  # fraction of the range added when a limit has to grow
+
+
+class _Ring:
+    # append-only buffer with a sliding start; compacts once the spare half is used,
+    # so appends stay O(1) amortized and the visible slice is always contiguous
+    def __init__(self, values, window=None, dtype=float):
+        values = np.asarray(values, dtype=dtype)
+        if window:
+            values = values[-window:]
+        self.window = window
+        cap = max(2 * (window or len(values)), 64)
+        self.buf = np.empty(cap, dtype=dtype)
+        self.buf[:len(values)] = values
+        self.start, self.end = 0, len(values)
+
+    def view(self):
+        return self.buf[self.start:self.end]
+
+    def set_last(self, value):
+        if self.end > self.start:
+            self.buf[self.end - 1] = value
+
+    def append(self, value):
+        if self.end == len(self.buf):
+            n = self.end - self.start
+            if self.window is None:
+                grown = np.empty(2 * len(self.buf), dtype=self.buf.dtype)
+                grown[:n] = self.view()
+                self.buf = grown
+            else:
+                self.buf[:n] = self.view().copy()
+            self.start, self.end = 0, n
+        self.buf[self.end] = value
+        self.end += 1
+        if self.window and self.end - self.start > self.window:
+            self.start += 1
+
+
+class LiveChart:
+    def __init__(self, ticker, lines, xs, labels, window=None, hover=None):
+        """lines: {series name: Line2D} plotted against xs; "Close" is the price line"""
+        self.ticker = ticker
+        self.lines = lines
+        self.window = window
+        self.hover = hover
+        self.x = _Ring(xs, window)
+        self.labels = _Ring(labels, window, dtype=object)
+        self.y = {k: _Ring(line.get_ydata(), window) for k, line in lines.items()}
+        self._bars_since_rescale = 0
+        if window:
+            self._apply()
+
+    def _apply(self):
+        xs = self.x.view()
+        for k, line in self.lines.items():
+            line.set_data(xs, self.y[k].view())
+        if self.hover is not None:
+            self.hover.xs = xs
+            self.hover.ys = self.y["Close"].view()
+            self.hover.labels = self.labels.view()
+
+    def push(self, x, values, label, new_bar):
+        """Fold one tick in: {series name: value}; returns True if any axis limits moved"""
+        if new_bar:
+            self.x.append(x)
+            self.labels.append(label)
+            for k, ring in self.y.items():
+                ring.append(values.get(k, np.nan))
+        else:
+            for k, ring in self.y.items():
+                if k in values:
+                    ring.set_last(values[k])
+        self._apply()
+        return self._rescale(new_bar)
+
+    def _rescale(self, new_bar):
+        moved = False
+        axes = {line.axes for line in self.lines.values()}
+        if new_bar and self.window:
+            xs = self.x.view()
+            pad = (xs[-1] - xs[0]) * 0.02 if len(xs) > 1 else 0.001
+            for ax in axes:
+                ax.set_xlim(xs[0], xs[-1] + pad)
+            moved = True
+            self._bars_since_rescale += 1
+            if self._bars_since_rescale >= self.window:
+                # a full window has scrolled by: shrink y back to what is visible
+                self._bars_since_rescale = 0
+                for ax in axes:
+                    ax.relim()
+                    ax.autoscale_view(scalex=False)
+                return True
+        for ax in axes:
+            lo, hi = ax.get_ylim()
+            vals = [self.y[k].view()[-1] for k, line in self.lines.items() if line.axes is ax and len(self.y[k].view())]
+            vals = [v for v in vals if np.isfinite(v)]
+            if not vals:
+                continue
+            vmin, vmax = min(vals), max(vals)
+            if vmin < lo or vmax > hi:
+                pad = (max(hi, vmax) - min(lo, vmin)) * Y_PAD
+                ax.set_ylim(min(lo, vmin - pad), max(hi, vmax + pad))
+                moved = True
+        return moved
@@ -0,0 +1,137 @@
+"""
+Market Data
+- Quotes and price histories without any GUI imports (shared by the app and service.py)
+- yfinance first, with the pooled quote engine's direct chart API as fallback
+- Histories are cached for HISTORY_CACHE_SECONDS and safe to share across threads
+"""
+
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from quote_engine import get_engine, CHART_URL, parse_chart_quote
+from metrics import registry, span, timed
+
+HISTORY_CACHE_SECONDS = 15 * 60  # reuse fetched histories for this long
+
+
+@timed("fetch.price", none_is_error=True)
+def fetch_price(ticker, timeout=6):
+    """Return float price or None"""
+    if not ticker:
+        return None
+    try:
+        t = yf.Ticker(ticker)
+        # try historical closes (5d)
+        df = t.history(period="5d")
+        if isinstance(df, (pd.DataFrame,)) and not df.empty:
+            closes = df["Close"].dropna()
+            if not closes.empty:
+                return float(closes.iloc[-1])
+        # fallback: try fast_info safely
+        try:
+            fast = getattr(t, "fast_info", None)
+            if fast:
+                # fast_info might be a dict-like
+                if isinstance(fast, dict):
+                    p = fast.get("last_price")
+                else:
+                    p = getattr(fast, "get", lambda k, d=None: None)("last_price")
+                if p:
+                    return float(p)
+        except Exception:
+            pass
+        # last fallback: direct Yahoo chart API over the pooled session
+        try:
+            r = get_engine().session.get(CHART_URL.format(ticker), timeout=timeout)
+            r.raise_for_status()
+            quote = parse_chart_quote(ticker, r.json())
+            return quote["price"] if quote else None
+        except Exception:
+            return None
+    except Exception:
+        return None
+
+
+@timed("fetch.quotes")
+def fetch_quotes(tickers, timeout=6):
+    """Return {ticker: quote dict or None} for many tickers in one concurrent batch"""
+    tickers = [t for t in tickers if t]
+    if not tickers:
+        return {}
+    engine = get_engine()
+    try:
+        quotes = engine.run(engine.quotes(tickers, timeout=timeout))
+        # tickers the chart API missed go through the usual fetch_price fallbacks
+        missing = [t for t, q in quotes.items() if q is None]
+        if missing:
+            prices = engine.run(engine.map_blocking(fetch_price, missing))
+            for t, price in zip(missing, prices):
+                if price is not None:
+                    quotes[t] = {"symbol": t, "price": price, "prev_close": None}
+        return quotes
+    except Exception:
+        return {t: None for t in tickers}
+
+
+def stream_quotes(tickers, on_quote, timeout=6):
+    """Blocking: call on_quote(ticker, quote or None) for each ticker as soon as it lands"""
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    if not tickers:
+        return
+    engine = get_engine()
+
+    async def one(t):
+        q = await engine.quote(t, timeout=timeout)
+        if q is None:
+            # same fallbacks as fetch_quotes, one ticker at a time
+            price = await engine.run_blocking(fetch_price, t)
+            q = {"symbol": t, "price": price, "prev_close": None} if price is not None else None
+        return t, q
+
+    async def run():
+        for fut in asyncio.as_completed([one(t) for t in tickers]):
+            t, q = await fut
+            on_quote(t, q)
+
+    with span("fetch.stream_quotes", n=len(tickers)):
+        engine.run(run())
+
+
+_history_cache = {}  # (ticker, period, interval) -> (fetched_at, DataFrame)
+_history_lock = threading.Lock()
+
+
+@timed("fetch.history", none_is_error=True)
+def fetch_history(ticker, period="1y", interval="1d", timeout=8):
+    if not ticker:
+        return None
+    key = (ticker, period, interval)
+    with _history_lock:
+        hit = _history_cache.get(key)
+    if hit and time.time() - hit[0] < HISTORY_CACHE_SECONDS:
+        registry.hit("fetch.history")
+        return hit[1]
+    registry.miss("fetch.history")
+    try:
+        t = yf.Ticker(ticker)
+        df = t.history(period=period, interval=interval)
+        if df is None or df.empty:
+            return None
+        with _history_lock:
+            _history_cache[key] = (time.time(), df)
+        return df
+    except Exception:
+        return None
+
+
+@timed("fetch.closes")
+def fetch_closes(tickers, period="1y", interval="1d"):
+    """{ticker: Close series or None}, fetched concurrently through the history cache"""
+    tickers = list(dict.fromkeys(tickers))
+    engine = get_engine()
+    frames = engine.run(engine.map_blocking(lambda t: fetch_history(t, period=period, interval=interval), tickers))
+    return {t: (df["Close"].dropna() if df is not None else None) for t, df in zip(tickers, frames)}
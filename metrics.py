@@ -0,0 +1,170 @@
+"""
+Metrics
+- Process-wide registry of timings: count, errors, latency histogram, cache hits/misses
+- @timed("name") / with span("name"): one lock-protected record per call
+- Recent calls are kept as Chrome trace events (open in chrome://tracing or Perfetto)
+- No GUI or third-party imports, so every layer (data_fetch, service, app) can use it
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+TRACE_EVENTS = 20000  # most recent spans kept for trace export
+
+
+class _Stat:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets", "hits", "misses")
+
+    def __init__(self):
+        self.count = self.errors = self.hits = self.misses = 0
+        self.total_ms = self.max_ms = 0.0
+        self.buckets = [0] * (len(BOUNDS_MS) + 1)  # last bucket: above the top bound
+
+    def percentile(self, q):
+        # upper bound of the bucket holding the q-th percentile
+        if not self.count:
+            return None
+        need = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= need:
+                return BOUNDS_MS[i] if i < len(BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._trace = deque(maxlen=TRACE_EVENTS)
+        self._threads = {}
+        self._t0 = time.perf_counter_ns()
+
+    def _stat(self, name):
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = _Stat()
+        return st
+
+    def record(self, name, start_ns, end_ns, error=False, args=None, trace=True):
+        """trace=False: histogram only, for high-rate samples that would flush the trace ring"""
+        ms = (end_ns - start_ns) / 1e6
+        t = threading.current_thread()
+        event = None
+        if trace:
+            event = {"name": name, "ph": "X", "ts": (start_ns - self._t0) / 1000, "dur": ms * 1000,
+                     "pid": os.getpid(), "tid": t.ident}
+            if args or error:
+                event["args"] = dict(args or {}, **({"error": True} if error else {}))
+        with self._lock:
+            st = self._stat(name)
+            st.count += 1
+            st.errors += bool(error)
+            st.total_ms += ms
+            st.max_ms = max(st.max_ms, ms)
+            st.buckets[bisect_left(BOUNDS_MS, ms)] += 1
+            if event is not None:
+                self._trace.append(event)
+                self._threads[t.ident] = t.name
+
+    def hit(self, name):
+        with self._lock:
+            self._stat(name).hits += 1
+
+    def miss(self, name):
+        with self._lock:
+            self._stat(name).misses += 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._trace.clear()
+
+    def snapshot(self):
+        """{name: {count, errors, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, hits, misses, hit_rate}}"""
+        with self._lock:
+            items = [(n, _copy(s)) for n, s in self._stats.items()]
+        out = {}
+        for name, st in sorted(items):
+            lookups = st.hits + st.misses
+            out[name] = {
+                "count": st.count,
+                "errors": st.errors,
+                "mean_ms": st.total_ms / st.count if st.count else None,
+                "p50_ms": st.percentile(50),
+                "p95_ms": st.percentile(95),
+                "p99_ms": st.percentile(99),
+                "max_ms": st.max_ms if st.count else None,
+                "total_ms": st.total_ms,
+                "hits": st.hits,
+                "misses": st.misses,
+                "hit_rate": st.hits / lookups if lookups else None,
+            }
+        return out
+
+    def trace(self):
+        """Chrome trace-event JSON object (complete events plus thread names)"""
+        with self._lock:
+            events = list(self._trace)
+            threads = dict(self._threads)
+        meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in threads.items()]
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        """Write metrics (.json) or, for paths ending in .trace.json, a Chrome trace"""
+        data = self.trace() if path.endswith(".trace.json") else {"generated": time.time(), "metrics": self.snapshot()}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=None if "traceEvents" in data else 2)
+        return path
+
+
+def _copy(st):
+    c = _Stat()
+    c.count, c.errors, c.total_ms, c.max_ms = st.count, st.errors, st.total_ms, st.max_ms
+    c.buckets, c.hits, c.misses = list(st.buckets), st.hits, st.misses
+    return c
+
+
+registry = Registry()
+
+
+class span:
+    """with span("chart.render", ticker="AAPL"): ...  -- timed block"""
+
+    def __init__(self, name, **args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        registry.record(self.name, self.start, time.perf_counter_ns(), exc_type is not None, self.args)
+        return False
+
+
+def timed(name, none_is_error=False):
+    """Decorator recording every call; none_is_error counts a None result as a failure
+    (for fetch helpers that swallow exceptions and return None)"""
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*a, **kw):
+            start = time.perf_counter_ns()
+            try:
+                result = func(*a, **kw)
+            except BaseException:
+                registry.record(name, start, time.perf_counter_ns(), True)
+                raise
+            registry.record(name, start, time.perf_counter_ns(), none_is_error and result is None)
+            return result
+        return inner
+    return wrap
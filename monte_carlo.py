@@ -0,0 +1,96 @@
+"""
+Monte Carlo Engine
+- Yearly price paths for thousands to millions of paths in one array pass
+- Geometric Brownian motion or bootstrapped annual returns, calibrated from daily closes
+- Seedable RNG; optional process-pool chunking with independent child seeds
+- Outcome distribution: percentile fan, probability of loss, best-sell year
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+TRADING_DAYS = 252
+DEFAULT_DRIFT = 0.03  # used when there is not enough history to calibrate
+DEFAULT_VOL = 0.15
+CHUNK_PATHS = 250_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def calibrate(closes):
+    """Annual log drift, annual vol and overlapping 1-year log returns from daily closes"""
+    p = np.asarray(closes, dtype=float)
+    p = p[~np.isnan(p)]
+    if len(p) < 30:
+        return {"drift": DEFAULT_DRIFT, "vol": DEFAULT_VOL, "annual_returns": None}
+    daily = np.diff(np.log(p))
+    annual = None
+    if len(p) > TRADING_DAYS + 20:
+        annual = np.log(p[TRADING_DAYS:] / p[:-TRADING_DAYS])
+    return {
+        "drift": float(daily.mean() * TRADING_DAYS),
+        "vol": float(daily.std(ddof=1) * np.sqrt(TRADING_DAYS)),
+        "annual_returns": annual,
+    }
+
+
+def _simulate_chunk(args):
+    # top-level so process pools can pickle it
+    seed, n, years, start_price, drift, vol, annual_returns = args
+    rng = np.random.default_rng(seed)
+    if annual_returns is not None:
+        steps = rng.choice(annual_returns, size=(n, years))
+    else:
+        steps = drift + vol * rng.standard_normal((n, years))
+    return (start_price * np.exp(np.cumsum(steps, axis=1))).astype(np.float32)
+
+
+def simulate_paths(start_price, years, n_paths, params, method="gbm", seed=None, workers=1,
+                   chunk=CHUNK_PATHS):
+    """(n_paths x years) simulated year-end prices.
+
+    method is "gbm" or "bootstrap" (resamples overlapping historical 1-year
+    log returns; falls back to GBM without enough history).
+    """
+    if n_paths < 1:
+        raise ValueError("Paths must be at least 1")  # np.concatenate([]) would fail below
+    annual = params.get("annual_returns") if method == "bootstrap" else None
+    sizes = [min(chunk, n_paths - i) for i in range(0, n_paths, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, n, years, start_price, params["drift"], params["vol"], annual) for s, n in zip(seeds, sizes)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, jobs))
+    else:
+        parts = [_simulate_chunk(j) for j in jobs]
+    return np.concatenate(parts, axis=0)
+
+
+def summarize(paths, start_price, qty, avg_price):
+    """Distribution of outcomes for holding qty units bought at avg_price.
+    final_profit_percentiles is the profit in dollars at each of PERCENTILES"""
+    if len(paths) == 0:
+        raise ValueError("No simulated paths to summarize")
+    years = paths.shape[1]
+    fan = np.percentile(paths, PERCENTILES, axis=0)  # (len(PERCENTILES), years)
+    best_idx = paths.argmax(axis=1)
+    best_price = paths[np.arange(len(paths)), best_idx]
+    year_counts = np.bincount(best_idx, minlength=years)
+    cost = qty * avg_price
+    final_profit = qty * paths[:, -1].astype(float) - cost
+    best_profit = qty * best_price.astype(float) - cost
+    return {
+        "paths": len(paths),
+        "years": years,
+        "start_price": float(start_price),
+        "percentiles": PERCENTILES,
+        "fan": fan,
+        "median_by_year": fan[PERCENTILES.index(50)],
+        "final_profit_percentiles": dict(zip(PERCENTILES, np.percentile(final_profit, PERCENTILES))),
+        "prob_loss_final": float((final_profit < 0).mean()),
+        "prob_loss_best": float((best_profit < 0).mean()),
+        "best_year_mode": int(year_counts.argmax()) + 1,
+        "best_year_mean": float(best_idx.mean()) + 1,
+        "best_year_share": year_counts / len(paths),
+        "best_price_median": float(np.median(best_price)),
+    }
@@ -0,0 +1,166 @@
+"""
+News Cache
+- Items cached per ticker with a TTL, persisted so the News tab opens warm
+- Both files are saved by the state store's background writer: the latest snapshot wins,
+  and marking a story seen never writes on the caller's (Tk) thread
+- Deduplicated across sources by normalized title / link hash
+- Remembers which stories were opened (the latest SEEN_KEEP) so the UI can mark them as seen
+- Low-priority background prefetch (one worker, paced) for favorites and holdings
+"""
+
+import hashlib
+import queue
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from state_store import StateStore, load_json
+
+NEWS_TTL_SECONDS = 15 * 60
+NEWS_MAX_ITEMS = 30
+PREFETCH_GAP_SECONDS = 2.0  # pause between prefetches so interactive loads go first
+NEWS_FILE = "news_cache.json"
+SEEN_FILE = "news_seen.json"
+SEEN_KEEP = 2000  # most recently opened stories remembered as read
+
+
+def normalize_title(title):
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", "", (title or "").lower())).strip()
+
+
+def normalize_link(link):
+    if not link:
+        return ""
+    parts = urlsplit(link)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+
+def item_key(item):
+    """Stable id for a story: hash of its normalized title (falls back to link)"""
+    basis = normalize_title(item.get("title")) or normalize_link(item.get("link"))
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()[:16]
+
+
+def dedupe(items):
+    """Drop repeats by title or link, keeping the first occurrence"""
+    out, titles, links = [], set(), set()
+    for it in items:
+        key = item_key(it)
+        link = normalize_link(it.get("link"))
+        if key in titles or (link and link in links):
+            continue
+        titles.add(key)
+        if link:
+            links.add(link)
+        out.append(dict(it, key=key))
+    return out
+
+
+class NewsCache:
+    def __init__(self, fetcher, ttl=NEWS_TTL_SECONDS, path=NEWS_FILE, seen_path=SEEN_FILE, store=None):
+        self._fetch = fetcher  # ticker -> list of {"title", "link"}
+        self.ttl = ttl
+        self.path = path
+        self.seen_path = seen_path
+        self._lock = threading.Lock()
+        self._entries = self._load(path, {})  # ticker -> {"fetched_at", "items"}
+        self._seen = dict.fromkeys(self._load(seen_path, [])[-SEEN_KEEP:])  # ordered set, oldest first
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.store = store or StateStore()
+        # the writer serializes these snapshots when it runs, so a slower save can't land last
+        if path:
+            self.store.register(path, self._entries_snapshot)
+        if seen_path:
+            self.store.register(seen_path, self._seen_snapshot)
+
+    @staticmethod
+    def _load(path, default):
+        return load_json(path, default)
+
+    def _entries_snapshot(self):
+        with self._lock:
+            return dict(self._entries)
+
+    def _seen_snapshot(self):
+        with self._lock:
+            return list(self._seen)
+
+    def _changed(self, path):
+        if path:
+            self.store.changed(path)
+
+    # -------------------------
+    # Cache access
+    # -------------------------
+    def cached(self, ticker):
+        """(items, age seconds) from cache without touching the network; (None, None) if absent"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if not entry:
+            return None, None
+        return entry["items"], time.time() - entry["fetched_at"]
+
+    def is_fresh(self, ticker):
+        _, age = self.cached(ticker)
+        return age is not None and age < self.ttl
+
+    def fetch(self, ticker, force=False):
+        """Cached items if fresh, otherwise fetch, merge and store"""
+        if not force and self.is_fresh(ticker):
+            return self.cached(ticker)[0]
+        fresh = self._fetch(ticker) or []
+        with self._lock:
+            old = (self._entries.get(ticker) or {}).get("items", [])
+            # new stories first; older cached ones keep their place after them
+            items = dedupe(fresh + old)[:NEWS_MAX_ITEMS]
+            self._entries[ticker] = {"fetched_at": time.time(), "items": items}
+        self._changed(self.path)
+        return items
+
+    # -------------------------
+    # Seen tracking
+    # -------------------------
+    def mark_seen(self, key):
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen[key] = None
+            while len(self._seen) > SEEN_KEEP:
+                del self._seen[next(iter(self._seen))]
+        self._changed(self.seen_path)
+
+    def is_seen(self, key):
+        return key in self._seen
+
+    # -------------------------
+    # Background prefetch
+    # -------------------------
+    def prefetch(self, tickers):
+        """Queue tickers for a paced background refresh (stale ones only)"""
+        with self._worker_lock:
+            for t in dict.fromkeys(tickers):
+                self._queue.put(t)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._prefetch_loop, name="news-prefetch", daemon=True)
+                self._worker.start()
+
+    def _prefetch_loop(self):
+        while True:
+            try:
+                ticker = self._queue.get(timeout=30)
+            except queue.Empty:
+                with self._worker_lock:
+                    if self._queue.empty():
+                        self._worker = None  # idle: prefetch() starts a new worker
+                        return
+                continue
+            if self.is_fresh(ticker):
+                continue
+            try:
+                self.fetch(ticker)
+            except Exception as e:
+                print(f"Error prefetching news for {ticker}: {e}")
+            time.sleep(PREFETCH_GAP_SECONDS)
@@ -0,0 +1,89 @@
+"""
+Offline Market Data
+- Deterministic stand-in for yfinance / the quote engine (no network, no API keys)
+- Same shapes as the live helpers: quote dicts and OHLCV history frames
+- Optional simulated latency so load tests see realistic request overlap
+"""
+
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504,
+               "5y": 1260, "10y": 2520, "max": 5040}
+INTERVAL_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60}
+# USD per unit, so FX pairs like EURUSD=X wander around realistic levels
+FX_LEVELS = {"EUR": 1.08, "GBP": 1.27, "JPY": 0.0067, "CAD": 0.73, "AUD": 0.66, "CHF": 1.12,
+             "CNY": 0.14, "INR": 0.012, "MXN": 0.055, "ZAR": 0.054, "ILS": 0.27}
+
+
+def _seed(*parts):
+    return zlib.crc32("|".join(map(str, parts)).encode("utf-8"))
+
+
+def _round(price):
+    return round(price, 2 if price >= 1 else 6)  # FX rates like JPY need the extra digits
+
+
+class OfflineMarket:
+    def __init__(self, latency=0.0, seed=0):
+        self.latency = latency  # seconds slept per call, to mimic a network round trip
+        self.seed = seed
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _base_price(self, ticker):
+        if ticker.endswith("USD=X") and ticker[:3] in FX_LEVELS:
+            return FX_LEVELS[ticker[:3]]
+        return 20.0 + _seed(self.seed, ticker) % 480
+
+    def price(self, ticker, at=None):
+        """Price that drifts slowly with wall-clock time (changes every few seconds)"""
+        bucket = int((time.time() if at is None else at) // 5)
+        rng = np.random.default_rng(_seed(self.seed, ticker, bucket))
+        base = self._base_price(ticker)
+        return _round(base * (1 + rng.normal(0, 0.01)))
+
+    def quote(self, ticker):
+        now = time.time()
+        return {"symbol": ticker, "price": self.price(ticker, now),
+                "prev_close": _round(self._base_price(ticker)), "time": int(now), "currency": "USD"}
+
+    def quotes(self, tickers):
+        """{ticker: quote} for a batch, one simulated round trip"""
+        self._sleep()
+        return {t: self.quote(t) for t in dict.fromkeys(tickers) if t}
+
+    def history(self, ticker, period="1y", interval="1d"):
+        """yfinance-shaped OHLCV frame (tz-aware index) from a seeded random walk"""
+        self._sleep()
+        if period not in PERIOD_DAYS:
+            return None
+        days = PERIOD_DAYS[period]
+        if interval in INTERVAL_MINUTES:
+            n = days * 390 // INTERVAL_MINUTES[interval]
+            end = pd.Timestamp.now(tz="America/New_York").floor(f"{INTERVAL_MINUTES[interval]}min")
+            index = pd.date_range(end=end, periods=n, freq=f"{INTERVAL_MINUTES[interval]}min")
+            step_vol = 0.01 / np.sqrt(390 / INTERVAL_MINUTES[interval])
+        else:
+            index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="America/New_York")
+            if interval == "1wk":
+                index = index[::5]
+            elif interval == "1mo":
+                index = index[::21]
+            n = len(index)
+            step_vol = 0.01 * np.sqrt(days / max(n, 1))  # scale daily vol to the bar size
+        rng = np.random.default_rng(_seed(self.seed, ticker, period, interval))
+        close = self._base_price(ticker) * np.exp(np.cumsum(rng.normal(0.0003, step_vol, n)))
+        spread = np.abs(rng.normal(0, step_vol, n)) * close
+        return pd.DataFrame({
+            "Open": np.round(close * (1 + rng.normal(0, step_vol / 3, n)), 4),
+            "High": np.round(close + spread, 4),
+            "Low": np.round(close - spread, 4),
+            "Close": np.round(close, 4),
+            "Volume": rng.integers(100_000, 5_000_000, n),
+        }, index=index)
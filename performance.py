@@ -0,0 +1,125 @@
+"""
+Portfolio Performance
+- Rebuilds daily holdings and value from the trade ledger over a date x ticker price matrix
+- Time-weighted (TWR) and money-weighted (MWR / IRR) returns
+- Benchmark series on the same calendar
+All per-day work is array operations; nothing loops over days in Python.
+"""
+
+import numpy as np
+
+
+def trade_arrays(trades, tickers):
+    """(day, column, signed qty, cash flow) arrays for trades on known tickers.
+
+    Cash flow is money put into the book: positive for buys and opening lots,
+    negative for sell proceeds.
+    """
+    col_of = {t: i for i, t in enumerate(tickers)}
+    rows = [t for t in trades if t["ticker"] in col_of]
+    days = np.array([str(t["date"])[:10] for t in rows], dtype="datetime64[D]")
+    cols = np.array([col_of[t["ticker"]] for t in rows], dtype=int)
+    sign = np.array([-1.0 if t["side"] == "sell" else 1.0 for t in rows])
+    qty = sign * np.array([t["qty"] for t in rows], dtype=float)
+    flow = qty * np.array([t["price"] for t in rows], dtype=float)
+    return days, cols, qty, flow
+
+
+def holdings_and_flows(trades, prices):
+    """Per-day share counts (dates x tickers) and net cash flow per day"""
+    dates = prices.index.values.astype("datetime64[D]")
+    tickers = list(prices.columns)
+    days, cols, qty, flow = trade_arrays(trades, tickers)
+    # trades on non-trading days land on the next bar
+    rows = np.searchsorted(dates, days, side="left")
+    keep = rows < len(dates)
+    delta = np.zeros((len(dates), len(tickers)))
+    np.add.at(delta, (rows[keep], cols[keep]), qty[keep])
+    flows = np.zeros(len(dates))
+    np.add.at(flows, rows[keep], flow[keep])
+    return np.cumsum(delta, axis=0), flows
+
+
+def time_weighted(values, flows):
+    """Cumulative TWR along the last axis; each day's return excludes that day's flow"""
+    prev = values[..., :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily = np.where(prev > 0, (values[..., 1:] - flows[..., 1:]) / prev - 1.0, 0.0)
+    zero = np.zeros(values.shape[:-1] + (1,))
+    return np.concatenate([zero, np.cumprod(1.0 + daily, axis=-1) - 1.0], axis=-1)
+
+
+def money_weighted(dates, flows, final_value):
+    """Annualized IRR of the flows plus the final value, or None.
+
+    NPV is evaluated for a whole grid of rates at once, then the bracketing
+    pair is refined by bisection.
+    """
+    mask = flows != 0
+    if not mask.any() or final_value <= 0:
+        return None
+    t = (dates[mask] - dates[mask][0]).astype("timedelta64[D]").astype(float) / 365.25
+    t_end = (dates[-1] - dates[mask][0]).astype("timedelta64[D]").astype(float) / 365.25
+    # investor view: money in is negative, the ending value comes back out
+    cf = np.concatenate([-flows[mask], [final_value]])
+    t = np.concatenate([t, [t_end]])
+    if t_end <= 0:
+        return None
+
+    def npv(rates):
+        return (cf[None, :] * (1.0 + rates[:, None]) ** (-t[None, :])).sum(axis=1)
+
+    grid = np.concatenate([np.linspace(-0.99, 1.0, 400), np.linspace(1.0, 20.0, 200)[1:]])
+    vals = npv(grid)
+    cross = np.nonzero(np.sign(vals[:-1]) != np.sign(vals[1:]))[0]
+    if len(cross) == 0:
+        return None
+    lo, hi = grid[cross[0]], grid[cross[0] + 1]
+    lo_sign = np.sign(vals[cross[0]])
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if np.sign(npv(np.array([mid]))[0]) == lo_sign:
+            lo = mid
+        else:
+            hi = mid
+    return float((lo + hi) / 2)
+
+
+def performance_series(trades, prices, benchmark=None):
+    """Daily value, flows and returns for the book.
+
+    prices is an aligned date x ticker close matrix (see timeseries.align_closes);
+    benchmark is an optional close Series on the same daily calendar.
+    """
+    if prices.empty or not trades:
+        return None
+    holdings, flows = holdings_and_flows(trades, prices)
+    px = np.nan_to_num(prices.to_numpy(dtype=float))
+    values = (holdings * px).sum(axis=1)
+
+    # start at the first day anything is held
+    active = np.nonzero(values > 0)[0]
+    if len(active) == 0:
+        return None
+    start = active[0]
+    dates = prices.index[start:]
+    values, flows = values[start:], flows[start:]
+    day_dates = dates.values.astype("datetime64[D]")
+
+    twr = time_weighted(values, flows)
+    years = max((day_dates[-1] - day_dates[0]).astype(int) / 365.25, 1e-9)
+    out = {
+        "dates": dates,
+        "value": values,
+        "invested": np.cumsum(flows),
+        "twr": twr,
+        "twr_total": float(twr[-1]),
+        "twr_annualized": float((1 + twr[-1]) ** (1 / years) - 1) if years >= 1 else None,
+        "mwr": money_weighted(day_dates, flows, float(values[-1])),
+        "benchmark": None,
+    }
+    if benchmark is not None and len(benchmark):
+        b = benchmark.reindex(dates).ffill().to_numpy(dtype=float)
+        first = b[~np.isnan(b)][0] if (~np.isnan(b)).any() else np.nan
+        out["benchmark"] = b / first - 1.0
+    return out
@@ -0,0 +1,168 @@
+"""
+Async Quote Engine
+- One asyncio event loop running in a background daemon thread
+- Pooled keep-alive HTTP session shared by every direct-URL fetch
+- Concurrency limit on in-flight requests
+- Thread-safe bridge to Tk: futures delivered on the UI thread via root.after
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------------------------
+# Config / Constants
+# ---------------------------
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{}"
+SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search"
+MAX_CONNECTIONS = 20  # keep-alive sockets kept per host
+MAX_CONCURRENT = 10  # requests allowed in flight at once
+USER_AGENT = "Mozilla/5.0 (FinanceFlow)"
+
+
+def make_session(max_connections=MAX_CONNECTIONS):
+    """Build a requests session with a keep-alive connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections, max_retries=1)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def parse_chart_quote(ticker, data):
+    """Turn a v8 chart API payload into a quote dict (or None)"""
+    try:
+        meta = data["chart"]["result"][0]["meta"]
+        price = meta.get("regularMarketPrice")
+        if price is None:
+            return None
+        prev = meta.get("chartPreviousClose") or meta.get("previousClose")
+        return {
+            "symbol": ticker,
+            "price": float(price),
+            "prev_close": float(prev) if prev else None,
+            "time": meta.get("regularMarketTime"),
+            "currency": meta.get("currency"),
+        }
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+class QuoteEngine:
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_concurrent=MAX_CONCURRENT):
+        self.session = make_session(max_connections)
+        # blocking socket I/O runs here; sized to the concurrency limit
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="quote-io")
+        self._limit = asyncio.Semaphore(max_concurrent)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="quote-engine", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    # -------------------------
+    # Coroutines (run on the engine loop)
+    # -------------------------
+    async def get_json(self, url, params=None, timeout=6):
+        """GET a URL through the pooled session and decode JSON"""
+        async with self._limit:
+            resp = await self._loop.run_in_executor(
+                self._executor, partial(self.session.get, url, params=params, timeout=timeout))
+        resp.raise_for_status()
+        return resp.json()
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking callable (e.g. a yfinance call) under the concurrency limit"""
+        async with self._limit:
+            return await self._loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def map_blocking(self, func, items):
+        """Run func(item) for every item concurrently; results in input order"""
+        return await asyncio.gather(*(self.run_blocking(func, i) for i in items))
+
+    async def quote(self, ticker, timeout=6):
+        """Quote dict for one ticker or None"""
+        try:
+            data = await self.get_json(CHART_URL.format(ticker), timeout=timeout)
+        except Exception:
+            return None
+        return parse_chart_quote(ticker, data)
+
+    async def quotes(self, tickers, timeout=6):
+        """Quotes for many tickers concurrently -> {ticker: quote or None}"""
+        tickers = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(*(self.quote(t, timeout) for t in tickers))
+        return dict(zip(tickers, results))
+
+    async def search_news(self, ticker, timeout=6):
+        """News items from the Yahoo search endpoint"""
+        try:
+            data = await self.get_json(SEARCH_URL, params={"q": ticker}, timeout=timeout)
+        except Exception:
+            return []
+        return [{"title": r.get("title") or "Untitled Article", "link": r.get("link") or r.get("url")}
+                for r in data.get("news", [])[:10]]
+
+    # -------------------------
+    # Thread-safe entry points
+    # -------------------------
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop; returns a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the engine loop and block for its result"""
+        return self.submit(coro).result(timeout)
+
+    def deliver(self, widget, coro, callback, errback=None):
+        """Run coro in the background, then call callback(result) on the Tk thread;
+        a failure goes to errback(exception) there, or is printed without one"""
+        fut = self.submit(coro)
+
+        def done(f):
+            try:
+                result = f.result()
+            except Exception as e:
+                if errback is None:
+                    print(f"Background task failed: {e!r}")
+                    return
+                try:
+                    widget.after(0, lambda err=e: errback(err))
+                except Exception:
+                    pass  # widget destroyed before the error arrived
+                return
+            try:
+                widget.after(0, lambda: callback(result))
+            except Exception:
+                pass  # widget destroyed before the result arrived
+
+        fut.add_done_callback(done)
+        return fut
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+# ---------------------------
+# Shared engine
+# ---------------------------
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide engine, started on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = QuoteEngine()
+        return _engine
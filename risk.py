@@ -0,0 +1,119 @@
+"""
+Risk Analytics
+- Annualized volatility, beta to a benchmark, max drawdown
+- Rolling correlation to the benchmark
+- Historical and parametric VaR / CVaR
+Everything works column-wise on an aligned date x ticker price matrix.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from timeseries import returns_matrix
+
+TRADING_DAYS = 252
+ROLLING_WINDOW = 60
+
+
+def max_drawdown(prices):
+    """Worst peak-to-trough fall per column (negative fraction)"""
+    p = np.asarray(prices, dtype=float)
+    peaks = np.fmax.accumulate(p, axis=0)  # fmax skips leading NaNs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = p / peaks - 1.0
+    return np.nanmin(dd, axis=0)
+
+
+def beta(rets, bench):
+    """Beta of every column of rets to bench, using rows where both exist"""
+    r = np.asarray(rets, dtype=float)
+    b = np.asarray(bench, dtype=float)[:, None]
+    both = ~np.isnan(r) & ~np.isnan(b)
+    n = both.sum(axis=0)
+    rb = np.where(both, r, 0.0)
+    bb = np.where(both, b, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_mean = rb.sum(axis=0) / n
+        b_mean = bb.sum(axis=0) / n
+        cov = (np.where(both, (r - r_mean) * (b - b_mean), 0.0)).sum(axis=0) / (n - 1)
+        var = (np.where(both, (b - b_mean) ** 2, 0.0)).sum(axis=0) / (n - 1)
+        return cov / var
+
+
+def rolling_corr(rets, bench, window=ROLLING_WINDOW, min_periods=None):
+    """Rolling correlation of every column of rets to bench via windowed cumulative sums"""
+    r = np.asarray(rets, dtype=float)
+    b = np.broadcast_to(np.asarray(bench, dtype=float)[:, None], r.shape)
+    both = ~np.isnan(r) & ~np.isnan(b)
+    x = np.where(both, r, 0.0)
+    y = np.where(both, b, 0.0)
+
+    def window_sum(a):
+        c = np.cumsum(np.vstack([np.zeros((1, a.shape[1])), a]), axis=0)
+        out = np.full(a.shape, np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    n = window_sum(both.astype(float))
+    sx, sy = window_sum(x), window_sum(y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = window_sum(x * y) - sx * sy / n
+        vx = window_sum(x * x) - sx * sx / n
+        vy = window_sum(y * y) - sy * sy / n
+        corr = cov / np.sqrt(vx * vy)
+    corr[n < (min_periods or window // 2)] = np.nan
+    return corr
+
+
+def value_at_risk(rets, confidence=0.95):
+    """(historical VaR, historical CVaR, parametric VaR, parametric CVaR) per column.
+
+    Values are positive one-day loss fractions.
+    """
+    r = np.asarray(rets, dtype=float)
+    alpha = 1.0 - confidence
+    q = np.nanquantile(r, alpha, axis=0)
+    tail = np.where(r <= q, r, np.nan)
+    with np.errstate(invalid="ignore"):
+        hist_cvar = -np.nanmean(tail, axis=0)
+    mu = np.nanmean(r, axis=0)
+    sigma = np.nanstd(r, axis=0, ddof=1)
+    z = NormalDist().inv_cdf(alpha)
+    param_var = -(mu + z * sigma)
+    param_cvar = -(mu - sigma * NormalDist().pdf(z) / alpha)
+    return -q, hist_cvar, param_var, param_cvar
+
+
+def risk_report(prices, benchmark=None, weights=None, confidence=0.95, window=ROLLING_WINDOW):
+    """Risk table (one row per ticker, plus Portfolio when weights are given).
+
+    prices: aligned date x ticker close matrix; benchmark: close Series on the
+    same calendar; weights: {ticker: weight}. Returns (table, rolling_corr).
+    """
+    rets = returns_matrix(prices)
+    if weights:
+        w = np.array([weights.get(t, 0.0) for t in rets.columns], dtype=float)
+        if w.sum():
+            w = w / w.sum()
+            rets["Portfolio"] = np.nan_to_num(rets.to_numpy()) @ w
+            growth = np.concatenate([[1.0], np.cumprod(1.0 + rets["Portfolio"].to_numpy())])
+            prices = prices.assign(Portfolio=growth)
+
+    r = rets.to_numpy(dtype=float)
+    table = pd.DataFrame(index=rets.columns)
+    table["Ann. Vol %"] = np.nanstd(r, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+    table["Max DD %"] = max_drawdown(prices[rets.columns].to_numpy()) * 100
+    hv, hc, pv, pc = value_at_risk(r, confidence)
+    table["Hist VaR %"] = hv * 100
+    table["Hist CVaR %"] = hc * 100
+    table["Param VaR %"] = pv * 100
+    table["Param CVaR %"] = pc * 100
+
+    rolling = None
+    if benchmark is not None:
+        b = returns_matrix(benchmark.to_frame("b")).iloc[:, 0].reindex(rets.index)
+        table.insert(1, "Beta", beta(r, b.to_numpy()))
+        rolling = pd.DataFrame(rolling_corr(r, b.to_numpy(), window), index=rets.index, columns=rets.columns)
+    return table, rolling
@@ -0,0 +1,302 @@
+"""
+Finance Flow Service (headless)
+- JSON over a local HTTP server; no Tk or matplotlib imports
+- GET /health, /quotes?symbols=A,B, /history?symbol=A&period=1y&interval=1d,
+  /portfolio, /budget?year=2025&month=1, /metrics (add ?format=trace for a Chrome trace)
+- /portfolio and /budget take ?currency=EUR (default: the reporting currency)
+- Threaded server; quotes and histories sit in shared TTL caches where concurrent
+  requests for the same key wait on one upstream fetch instead of stampeding
+- --offline serves the deterministic stand-in from offline_data; --load-test N
+  starts a server and hammers it with N concurrent clients
+
+    python service.py [--port 8765] [--offline] [--load-test 32]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import urlopen
+
+import numpy as np
+
+import data_fetch
+from fx import BASE, FXRates, get_fx, set_fx, reporting_currency
+from metrics import registry, span
+from valuation import PositionBook, valuation_rows
+
+DEFAULT_PORT = 8765
+QUOTE_TTL_SECONDS = 5
+HISTORY_TTL_SECONDS = 15 * 60
+FETCH_WAIT_SECONDS = 30  # longest a request waits on another request's fetch
+MAX_SYMBOLS = 200
+ROUTES = ("/health", "/metrics", "/quotes", "/history", "/portfolio", "/budget")
+PORT_FILE = "portfolio.json"
+
+
+class TTLCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}  # key -> (stored_at, value)
+        self._inflight = {}  # key -> Event set when its fetch lands
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_many(self, keys, loader):
+        """{key: value} for keys; loader(missing keys) -> {key: value} runs once per key at a time"""
+        now = time.time()
+        out, mine, waits = {}, [], []
+        with self._lock:
+            for k in dict.fromkeys(keys):
+                hit = self._data.get(k)
+                if hit and now - hit[0] < self.ttl:
+                    out[k] = hit[1]
+                    self.hits += 1
+                elif k in self._inflight:
+                    waits.append((k, self._inflight[k]))
+                else:
+                    self._inflight[k] = threading.Event()
+                    mine.append(k)
+                    self.misses += 1
+        if mine:
+            loaded = {}
+            try:
+                loaded = loader(mine) or {}
+            finally:
+                with self._lock:
+                    stamp = time.time()
+                    for k in mine:
+                        if loaded.get(k) is not None:
+                            self._data[k] = (stamp, loaded[k])
+                        self._inflight.pop(k).set()
+            out.update({k: loaded.get(k) for k in mine})
+        for k, event in waits:
+            event.wait(FETCH_WAIT_SECONDS)
+            with self._lock:
+                hit = self._data.get(k)
+            out[k] = hit[1] if hit else None
+        return out
+
+    def get(self, key, loader):
+        return self.get_many([key], lambda keys: {key: loader()})[key]
+
+
+class LiveMarket:
+    # the app's fetch helpers; imported here so offline runs need no network stack
+    def __init__(self):
+        import market_data
+        self._md = market_data
+
+    def quotes(self, tickers):
+        return self._md.fetch_quotes(tickers)
+
+    def history(self, ticker, period="1y", interval="1d"):
+        return self._md.fetch_history(ticker, period=period, interval=interval)
+
+
+def _num(x):
+    x = float(x)
+    return None if np.isnan(x) else x
+
+
+class FinanceService:
+    def __init__(self, market, portfolio_path=PORT_FILE):
+        self.market = market
+        self.portfolio_path = portfolio_path
+        self.quote_cache = TTLCache(QUOTE_TTL_SECONDS)
+        self.history_cache = TTLCache(HISTORY_TTL_SECONDS)
+        self._portfolio = (None, None)  # (file stamp, parsed)
+        self._portfolio_lock = threading.Lock()
+        self.started = time.time()
+
+    def quotes(self, symbols):
+        return self.quote_cache.get_many(symbols, self.market.quotes)
+
+    def history(self, symbol, period="1y", interval="1d"):
+        def load():
+            df = self.market.history(symbol, period=period, interval=interval)
+            if df is None or df.empty:
+                return None
+            # serialize once; every request for this key reuses the payload
+            return {
+                "symbol": symbol, "period": period, "interval": interval,
+                "dates": [d.isoformat() for d in df.index],
+                "close": [_num(v) for v in df["Close"].to_numpy()],
+                "volume": [int(v) for v in df["Volume"].fillna(0).to_numpy()] if "Volume" in df else None,
+            }
+        return self.history_cache.get((symbol, period, interval), load)
+
+    def _load_portfolio(self):
+        try:
+            st = os.stat(self.portfolio_path)
+        except OSError:
+            return {"cash": 0.0, "positions": {}}
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._portfolio_lock:
+            if self._portfolio[0] == stamp:
+                return self._portfolio[1]
+        with open(self.portfolio_path, "r") as f:
+            data = json.load(f)
+        with self._portfolio_lock:
+            self._portfolio = (stamp, data)
+        return data
+
+    def portfolio(self, currency=None):
+        p = self._load_portfolio()
+        book = PositionBook.from_positions(p.get("positions", {}))
+        quotes = self.quotes(book.tickers)
+        ccy, cash_ccy = currency or reporting_currency(), p.get("currency") or BASE
+        rates = get_fx().rates(book.currencies(quotes) + [cash_ccy], ccy)
+        val = book.value(quotes, cash=p.get("cash", 0), rates=rates, cash_currency=cash_ccy, currency=ccy)
+        return valuation_rows(val)
+
+    def budget(self, year, month, currency=None):
+        return data_fetch.get_month_summary(year, month, currency)
+
+    def health(self):
+        return {"status": "ok", "market": type(self.market).__name__, "uptime": round(time.time() - self.started, 1),
+                "quote_cache": {"hits": self.quote_cache.hits, "misses": self.quote_cache.misses},
+                "history_cache": {"hits": self.history_cache.hits, "misses": self.history_cache.misses}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+    protocol_version = "HTTP/1.1"  # keep-alive for script/dashboard clients
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # quiet; load tests would flood stderr
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        # unknown paths share one metric so scanners can't grow the registry
+        with span("service" + (url.path if url.path in ROUTES else "/other")):
+            self._route(url, q)
+
+    def _route(self, url, q):
+        svc = self.service
+        try:
+            if url.path == "/health":
+                return self._send(200, svc.health())
+            if url.path == "/metrics":
+                return self._send(200, registry.trace() if q.get("format") == "trace" else registry.snapshot())
+            if url.path == "/quotes":
+                symbols = [s.strip().upper() for s in q.get("symbols", "").split(",") if s.strip()]
+                if not symbols or len(symbols) > MAX_SYMBOLS:
+                    return self._send(400, {"error": f"symbols: 1 to {MAX_SYMBOLS} comma-separated tickers"})
+                return self._send(200, svc.quotes(symbols))
+            if url.path == "/history":
+                symbol = q.get("symbol", "").strip().upper()
+                if not symbol:
+                    return self._send(400, {"error": "symbol is required"})
+                data = svc.history(symbol, q.get("period", "1y"), q.get("interval", "1d"))
+                return self._send(200, data) if data else self._send(404, {"error": f"no history for {symbol}"})
+            currency = q.get("currency", "").strip() or None
+            if url.path == "/portfolio":
+                return self._send(200, svc.portfolio(currency))
+            if url.path == "/budget":
+                today = date.today()
+                year, month = int(q.get("year", today.year)), int(q.get("month", today.month))
+                if not 1 <= month <= 12:
+                    return self._send(400, {"error": "month must be 1-12"})
+                return self._send(200, svc.budget(year, month, currency))
+            return self._send(404, {"error": f"unknown path {url.path}"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            print(f"Error handling {self.path}: {e}")
+            return self._send(500, {"error": "internal error"})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops connections under bursts
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT):
+    handler = type("Handler", (_Handler,), {"service": service})
+    return _Server((host, port), handler)
+
+
+def load_test(base_url, clients=32, requests_per_client=50, symbols=("AAPL", "MSFT", "NVDA", "SPY", "GC=F")):
+    """Concurrent clients mixing all endpoints; prints throughput and latency percentiles"""
+    paths = [f"/quotes?symbols={','.join(symbols)}", "/portfolio", "/budget",
+             f"/history?symbol={symbols[0]}&period=1y", "/health"]
+
+    def client(i):
+        lat, errors = [], 0
+        for j in range(requests_per_client):
+            t0 = time.perf_counter()
+            try:
+                with urlopen(base_url + paths[(i + j) % len(paths)], timeout=30) as r:
+                    r.read()
+            except Exception:
+                errors += 1
+            lat.append(time.perf_counter() - t0)
+        return lat, errors
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    wall = time.perf_counter() - t0
+    lat = np.array([x for r in results for x in r[0]]) * 1000
+    errors = sum(r[1] for r in results)
+    print(f"{len(lat)} requests from {clients} clients in {wall:.2f}s "
+          f"({len(lat) / wall:,.0f} req/s), errors: {errors}")
+    print(f"latency ms  p50 {np.percentile(lat, 50):.1f}  p95 {np.percentile(lat, 95):.1f}  "
+          f"p99 {np.percentile(lat, 99):.1f}  max {lat.max():.1f}")
+    return {"requests": len(lat), "seconds": wall, "errors": errors, "p50_ms": float(np.percentile(lat, 50)),
+            "p95_ms": float(np.percentile(lat, 95))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Finance Flow headless JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--offline", action="store_true", help="serve deterministic offline data")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated upstream latency (offline)")
+    parser.add_argument("--load-test", type=int, metavar="CLIENTS", help="run a load test and exit")
+    parser.add_argument("--requests", type=int, default=50, help="requests per load-test client")
+    args = parser.parse_args()
+
+    if args.offline:
+        from offline_data import OfflineMarket
+        market = OfflineMarket(latency=args.latency)
+        set_fx(FXRates(quotes=market.quotes, history=market.history, path=None))
+    else:
+        market = LiveMarket()
+    server = make_server(FinanceService(market), args.host, 0 if args.load_test else args.port)
+    host, port = server.server_address[:2]
+
+    if args.load_test:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            load_test(f"http://{host}:{port}", args.load_test, args.requests)
+        finally:
+            server.shutdown()
+        return
+
+    print(f"Serving on http://{host}:{port} ({type(market).__name__})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+State Store
+- Documents (favorites, portfolio, trades, commodities) registered under their JSON path
+- One re-entrant lock guards every mutation; each change bumps the document's version
+- A background writer coalesces bursts of changes into one write per interval
+- Writes are atomic: temp file + fsync + rename, so a crash leaves the old file or
+  the new one, never a truncated mix
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import span
+
+WRITE_INTERVAL = 0.5  # seconds a change may wait to be batched with the next ones
+RETRY_SECONDS = 30  # after a failed write, retry this often (or on the next change)
+
+
+def write_json(path, data):
+    """Atomically replace path with data as JSON"""
+    text = json.dumps(data, indent=2, default=str)
+    _write_text(path, text)
+
+
+def load_json(path, default):
+    """Parsed JSON at path (timed as storage.load); default when missing or unreadable"""
+    if path and os.path.exists(path):
+        try:
+            with span("storage.load", path=path), open(path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return default
+    return default
+
+
+def save_json(path, data):
+    """write_json timed as storage.save; failures are printed, not raised"""
+    try:
+        with span("storage.save", path=path):
+            write_json(path, data)
+    except Exception as e:
+        print("Failed to save", path, e)
+
+
+def _write_text(path, text):
+    # a temp file of its own per write, so concurrent writers of one path never share it;
+    # the last os.replace wins and readers always see a whole file
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644  # mkstemp files are 0600; keep the permissions open() gave before
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # make the rename itself durable (POSIX only)
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class _Doc:
+    __slots__ = ("source", "version", "saved")
+
+    def __init__(self, source):
+        self.source = source  # the live object, or a callable returning the data to save
+        self.version = 0
+        self.saved = 0
+
+    def data(self):
+        return self.source() if callable(self.source) else self.source
+
+
+class StateStore:
+    def __init__(self, interval=WRITE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.RLock()
+        self._docs = {}  # path -> _Doc
+        self._wake = threading.Condition(self.lock)
+        self._flush_lock = threading.Lock()  # one writer at a time (background, close, atexit)
+        self._writer = None
+        atexit.register(self.flush)
+
+    def register(self, path, source):
+        """Track source under path; returns it so it can be assigned in place"""
+        with self.lock:
+            self._docs[path] = _Doc(source)
+        return source
+
+    @contextmanager
+    def edit(self, *paths):
+        """with store.edit(PORT_FILE): mutate...  -- the change is saved in the next batch
+        (nothing is marked if the block raises, so validate before mutating)"""
+        with self.lock:
+            yield
+            self.changed(*paths)
+
+    def changed(self, *paths):
+        with self.lock:
+            for path in paths:
+                self._docs[path].version += 1
+            self._wake.notify()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="state-writer", daemon=True)
+                self._writer.start()
+
+    def version(self, path):
+        with self.lock:
+            return self._docs[path].version
+
+    def snapshot(self, path):
+        """(version, deep copy) of a document, consistent with in-progress edits"""
+        with self.lock:
+            doc = self._docs[path]
+            return doc.version, json.loads(json.dumps(doc.data(), default=str))
+
+    def pending(self):
+        with self.lock:
+            return [p for p, d in self._docs.items() if d.version != d.saved]
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.pending():
+                    self._wake.wait()
+            time.sleep(self.interval)  # let the rest of the burst land
+            batch = self.pending()
+            written = self.flush()
+            if len(written) < len(batch):
+                with self.lock:
+                    self._wake.wait(RETRY_SECONDS)
+
+    def flush(self):
+        """Write every changed document now; returns the paths written"""
+        with self._flush_lock:
+            with self.lock:
+                # serialize under the lock so each file is a consistent snapshot
+                batch = [(path, d.version, json.dumps(d.data(), indent=2, default=str))
+                         for path, d in self._docs.items() if d.version != d.saved]
+            written = []
+            for path, version, text in batch:
+                try:
+                    with span("storage.save", path=path):
+                        _write_text(path, text)
+                except Exception as e:
+                    print("Failed to save", path, e)
+                    continue  # stays pending; retried later or on the next change
+                with self.lock:
+                    self._docs[path].saved = version
+                written.append(path)
+            return written
@@ -0,0 +1,134 @@
+"""
+Symbol Index
+- Local symbol master file (symbols.csv: Symbol,Name)
+- Sorted arrays + bisect for ticker prefixes and company-name word prefixes
+- Trigram index for fuzzy name matching when prefixes come up short
+- `python symbol_index.py --download` rebuilds symbols.csv from the NASDAQ Trader symbol directory
+"""
+
+import csv
+import os
+import sys
+from bisect import bisect_left
+from collections import Counter
+
+SYMBOL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.csv")
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+MAX_POSTING = 5000  # trigrams shared by more names than this carry no signal
+
+
+def _trigrams(text):
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _tokens(name):
+    return [w for w in "".join(c if c.isalnum() else " " for c in name.upper()).split() if w]
+
+
+class SymbolIndex:
+    def __init__(self, entries):
+        # entries: iterable of (symbol, name); sorted by symbol for bisect
+        rows = sorted({s.upper(): n for s, n in entries if s}.items())
+        self.symbols = [s for s, _ in rows]
+        self.names = [n or "" for _, n in rows]
+
+        words = sorted((w, i) for i, n in enumerate(self.names) for w in set(_tokens(n)))
+        self._words = [w for w, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        self._grams = {}
+        for i, n in enumerate(self.names):
+            for g in _trigrams(n.upper()):
+                self._grams.setdefault(g, []).append(i)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _symbol_prefix(self, q, limit):
+        lo = bisect_left(self.symbols, q)
+        hi = bisect_left(self.symbols, q + "\uffff", lo)
+        return range(lo, min(hi, lo + limit))
+
+    def _name_prefix(self, q, limit):
+        lo = bisect_left(self._words, q)
+        hi = bisect_left(self._words, q + "\uffff", lo)
+        seen = []
+        for j in range(lo, hi):
+            i = self._word_ids[j]
+            if i not in seen:
+                seen.append(i)
+                if len(seen) >= limit:
+                    break
+        return seen
+
+    def _fuzzy(self, q, limit):
+        grams = _trigrams(q)
+        scores = Counter()
+        for g in grams:
+            ids = self._grams.get(g)
+            if ids and len(ids) <= MAX_POSTING:
+                scores.update(ids)
+        need = max(2, len(grams) // 2)
+        return [i for i, sc in scores.most_common(limit) if sc >= need]
+
+    def search(self, query, limit=20):
+        """[(symbol, name)] ranked: ticker prefix, then name-word prefix, then fuzzy name"""
+        q = query.upper().strip()
+        if not q:
+            return []
+        ids = list(self._symbol_prefix(q, limit))
+        if len(ids) < limit:
+            for i in self._name_prefix(q.split()[0], limit * 2):
+                if i not in ids:
+                    ids.append(i)
+                    if len(ids) >= limit:
+                        break
+        if len(ids) < limit and len(q) >= 3:
+            for i in self._fuzzy(q, limit):
+                if i not in ids:
+                    ids.append(i)
+                    if len(ids) >= limit:
+                        break
+        return [(self.symbols[i], self.names[i]) for i in ids]
+
+
+def load_symbols(path=SYMBOL_FILE, extra=()):
+    """(symbol, name) rows from the master file, plus any extra bare tickers"""
+    rows = []
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                rows = [(r["Symbol"], r.get("Name", "")) for r in csv.DictReader(f)]
+        except Exception as e:
+            print("Failed to read", path, e)
+    known = {s for s, _ in rows}
+    rows += [(t, "") for t in extra if t not in known]
+    return rows
+
+
+def download_symbol_master(path=SYMBOL_FILE):
+    """Rebuild the master file from the NASDAQ Trader directories (NASDAQ, NYSE, AMEX, ARCA)"""
+    from urllib.request import urlopen
+
+    rows = {}
+    for url, sym_col in ((NASDAQ_LISTED_URL, "Symbol"), (OTHER_LISTED_URL, "ACT Symbol")):
+        with urlopen(url, timeout=30) as resp:
+            lines = resp.read().decode("utf-8", "replace").splitlines()
+        for r in csv.DictReader(lines, delimiter="|"):
+            sym = (r.get(sym_col) or "").strip()
+            if not sym or sym.startswith("File Creation Time") or r.get("Test Issue") == "Y":
+                continue
+            rows[sym.replace(".", "-")] = (r.get("Security Name") or "").strip()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Symbol", "Name"])
+        for sym in sorted(rows):
+            w.writerow([sym, rows[sym]])
+    return len(rows)
+
+
+if __name__ == "__main__":
+    if "--download" in sys.argv:
+        print(f"Wrote {download_symbol_master()} symbols to {SYMBOL_FILE}")
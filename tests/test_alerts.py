@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from alerts import AlertBook
+
+
+def test_fired_move_alert_leaves_no_level_behind():
+    book = AlertBook(path=None)
+    rule = book.add("AAA", "move %", 10, ref=100.0)
+    assert book._above["AAA"].ids == [rule["id"]]
+    assert book._below["AAA"].ids == [rule["id"]]
+    events = book.check("AAA", 111.0)
+    assert [e["id"] for e in events] == [rule["id"]]
+    assert book._above["AAA"].ids == []
+    assert book._below["AAA"].ids == []
+    assert book.check("AAA", 80.0) == []
+
+
+def test_level_alerts_fire_once_and_only_when_crossed():
+    book = AlertBook(path=None)
+    up = book.add("aaa", "above", 110)
+    down = book.add("AAA", "below", 90)
+    assert book.check("AAA", 105.0) == []
+    assert [e["id"] for e in book.check("AAA", 110.0)] == [up["id"]]
+    assert book.check("AAA", 120.0) == []
+    assert [e["id"] for e in book.check_many({"AAA": 85.0, "BBB": 1.0})] == [down["id"]]
+    assert book.rules == {}
+    assert [e["id"] for e in book.fired] == [up["id"], down["id"]]
+
+
+def test_rules_and_fired_alerts_survive_a_reload(tmp_path):
+    path = str(tmp_path / "alerts.json")
+    book = AlertBook(path=path)
+    fired = book.add("AAA", "above", 50)
+    kept = book.add("AAA", "move %", 5, ref=100.0, note="watch")
+    book.check("AAA", 100.0)  # clears the 50 level, inside the 5% band
+
+    again = AlertBook(path=path)
+    assert list(again.rules) == [kept["id"]]
+    assert [e["id"] for e in again.fired] == [fired["id"]]
+    assert again.add("BBB", "below", 1)["id"] == kept["id"] + 1
+    assert [e["note"] for e in again.check("AAA", 94.0)] == ["watch"]
+
+
+def test_ma_cross_fires_when_price_changes_side():
+    book = AlertBook(path=None)
+    rule = book.add("AAA", "cross MA", 3)
+    assert book.ma_needs() == [("AAA", 3)]
+    closes = np.array([10.0, 10.0, 10.0, 11.0])
+    book.seed_ma("AAA", 3, pd.bdate_range("2024-01-01", periods=4), closes)
+    assert book.ma_needs() == []
+    assert book.check("AAA", 11.5) == []  # still above the average
+    events = book.check("AAA", 9.0)
+    assert [e["id"] for e in events] == [rule["id"]]
+    assert "crossed below" in events[0]["message"]
+    assert book._ma == {}
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from backtest import dca, dca_schedule, dca_sweep, lump_sum, rebalance, summary
+
+
+def test_lump_sum_tracks_the_price():
+    equity, flows = lump_sum(np.array([[10.0], [20.0], [15.0]]), 100.0)
+    assert equity.tolist() == [[100.0, 200.0, 150.0]]
+    assert flows.tolist() == [[100.0, 0.0, 0.0]]
+
+
+def test_dca_matches_a_day_by_day_loop():
+    rng = np.random.default_rng(0)
+    prices = 50 * np.cumprod(1 + rng.normal(0, 0.02, (60, 2)), axis=0)
+    equity, flows = dca(prices, 100.0, every=7, weights=[3, 1], starts=(0, 4))
+    for row, start in enumerate((0, 4)):
+        units = np.zeros(2)
+        for t in range(60):
+            if t >= start and (t - start) % 7 == 0:
+                units += 100.0 * np.array([0.75, 0.25]) / prices[t]
+            assert equity[row, t] == pytest.approx(units @ prices[t])
+        assert flows[row].sum() == 100.0 * len(range(start, 60, 7))
+
+
+def test_schedule_and_sweep_labels():
+    assert dca_schedule(6, 2, [0, 3], 10).tolist() == [[10, 0, 10, 0, 10, 0], [0, 0, 0, 10, 0, 10]]
+    prices = np.linspace(10, 20, 40)[:, None]
+    equity, flows, labels = dca_sweep(prices, 10.0, {"a": 5, "b": 10}, start_step=10, min_days=20)
+    assert labels == [("a", 0), ("a", 10), ("b", 0), ("b", 10)]
+    assert np.allclose(equity[3], dca(prices, 10.0, 10, starts=(10,))[0][0])
+
+
+def test_rebalance_only_past_the_threshold():
+    prices = np.array([[10.0, 10.0], [20.0, 10.0], [10.0, 10.0]])
+    equity, flows = rebalance(prices, 100.0, thresholds=[0.5, 0.1])
+    assert equity[0].tolist() == [100.0, 150.0, 100.0]  # 2/3 vs 1/2 is under 50 points: buy and hold
+    assert equity[1].tolist() == [100.0, 150.0, 112.5]  # back to 50/50 on day 1, before the drop
+    assert flows[:, 0].tolist() == [100.0, 100.0]
+
+
+def test_summary_returns():
+    equity, flows = lump_sum(np.array([[10.0], [12.0], [9.0], [15.0]]), 100.0)
+    s = summary(equity, flows)
+    assert s["invested"][0] == 100.0
+    assert s["total_return"][0] == pytest.approx(0.5)
+    assert s["twr"][0] == pytest.approx(0.5)
+    assert s["max_drawdown"][0] == pytest.approx(9 / 12 - 1)
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+from matplotlib.figure import Figure  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+from chart_hover import HoverTooltip  # noqa: E402
+
+
+def _hover(xs, ys):
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(xs, ys)
+    hover = HoverTooltip(canvas, ax, xs, ys, [f"d{i}" for i in range(len(xs))])
+    canvas.draw()  # grabs the background so moves blit
+    return hover, ax
+
+
+def _at(hover, ax, x):
+    hover._handle(SimpleNamespace(inaxes=ax, xdata=x))
+    return hover._index
+
+
+def test_hover_snaps_to_the_nearest_point():
+    xs = [0.0, 1.0, 2.0, 10.0]
+    hover, ax = _hover(xs, [5.0, 6.0, 7.0, 8.0])
+    assert _at(hover, ax, -3.0) == 0
+    assert _at(hover, ax, 0.4) == 0
+    assert _at(hover, ax, 0.6) == 1
+    assert _at(hover, ax, 5.9) == 2
+    assert _at(hover, ax, 6.1) == 3
+    assert _at(hover, ax, 99.0) == 3
+    assert hover.marker.get_visible()
+    assert hover.annot.get_text() == "d3\n$8.00"
+
+
+def test_hover_hides_when_the_pointer_leaves():
+    hover, ax = _hover([0.0, 1.0], [1.0, 2.0])
+    _at(hover, ax, 1.0)
+    hover._handle(SimpleNamespace(inaxes=None, xdata=None))
+    assert hover._index is None
+    assert not hover.marker.get_visible()
@@ -0,0 +1,17 @@
+import pytest
+
+from commodities import CommodityBook
+
+
+def test_summary_leaves_unpriced_holdings_out_of_cost():
+    book = CommodityBook({"balance": 100.0, "currency": "USD",
+                          "holdings": {"gold": {"qty": 2.0, "avg": 100.0},
+                                       "silver": {"qty": 10.0, "avg": 20.0}}})
+    s = book.summary({"gold": 110.0})  # silver has no quote
+    t = s["totals"]
+    assert t["value"] == pytest.approx(220.0)
+    assert t["cost"] == pytest.approx(200.0)
+    assert t["profit"] == pytest.approx(20.0)
+    assert t["profit"] / t["cost"] == pytest.approx(0.10)
+    assert t["unpriced"] == ["silver"]
+    assert t["total"] == pytest.approx(320.0)
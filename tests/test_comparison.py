@@ -0,0 +1,42 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comparison import compare
+from timeseries import align_closes
+
+
+def test_align_closes_joins_on_dates_and_fills_gaps():
+    a = pd.Series([1.0, 2.0, 3.0], index=pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]))
+    b = pd.Series([10.0, 30.0], index=pd.to_datetime(["2024-01-03 16:00", "2024-01-05 16:00"]))
+    frame = align_closes({"A": a, "B": b, "EMPTY": pd.Series(dtype=float)})
+    assert list(frame.columns) == ["A", "B"]
+    assert len(frame) == 4
+    assert np.isnan(frame["B"].iloc[0])  # before B's first bar stays empty
+    assert frame["B"].tolist()[1:] == [10.0, 10.0, 30.0]
+    assert frame["A"].iloc[-1] == 3.0
+
+
+def test_views_rebase_at_the_first_common_date():
+    idx = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+    frame = pd.DataFrame({"A": [np.nan, 50.0, 100.0], "B": [5.0, 10.0, 5.0]}, index=idx)
+    out = compare(frame)
+    assert out["base_date"] == idx[1]
+    assert out["views"]["Rebased"][1:].tolist() == [[100.0, 100.0], [200.0, 50.0]]
+    assert out["views"]["Cumulative %"][-1].tolist() == [100.0, -50.0]
+    assert out["views"]["Log return"][-1] == pytest.approx(np.log([2.0, 0.5]))
+    # equal-weight basket: (200 + 50) / 2 = 125
+    assert out["views"]["Relative strength"][-1] == pytest.approx([160.0, 40.0])
+    assert out["stats"]["total_return"].tolist() == [1.0, -0.5]
+    assert [out["tickers"][i] for i in out["order"]] == ["A", "B"]
+
+
+def test_benchmark_column_and_no_warnings_on_empty_rows():
+    idx = pd.bdate_range("2024-01-01", periods=4)
+    frame = pd.DataFrame({"A": [np.nan, np.nan, 1.0, 2.0], "B": [np.nan, np.nan, 4.0, 4.0]}, index=idx)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        out = compare(frame, benchmark="B")
+    assert out["views"]["Relative strength"][-1].tolist() == [200.0, 100.0]
@@ -0,0 +1,20 @@
+import threading
+
+from earnings import EarningsCalendar
+
+
+def test_tickers_asked_for_during_a_refresh_are_fetched_next():
+    gate, calls, done = threading.Event(), [], threading.Event()
+
+    def fetch(ticker):
+        calls.append(ticker)
+        gate.wait(5)
+        return {"Earnings Date": ["2030-01-15"]}
+
+    cal = EarningsCalendar(fetch, path=None)
+    assert cal.refresh_async(["AAA"])
+    assert not cal.refresh_async(["BBB", "AAA"], lambda fetched: done.set())
+    gate.set()
+    assert done.wait(5)
+    assert calls == ["AAA", "BBB"]
+    assert cal.dates_for("BBB") == ["2030-01-15"]
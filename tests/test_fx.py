@@ -0,0 +1,87 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fx import FXRates, epoch_days
+
+
+def _quotes(symbols):
+    return {s: {"price": 1.25} for s in symbols}
+
+
+def _history(symbol, period=None):
+    idx = pd.date_range("2024-01-01", periods=3, freq="D")
+    return pd.DataFrame({"Close": [1.0, 1.1, 1.2]}, index=idx)
+
+
+def test_spot_refresh_leaves_the_history_file_alone(tmp_path):
+    path = str(tmp_path / "fx_rates.json")
+    fx = FXRates(quotes=_quotes, history=_history, path=path, spot_ttl=0)
+    fx.history("EUR")
+    hist_path = fx.history_path
+    before = os.stat(hist_path).st_mtime_ns
+    fx.spot(["EUR"])
+    fx._fetch_spot(["EUR"])
+    assert os.stat(hist_path).st_mtime_ns == before
+
+    again = FXRates(quotes=_quotes, history=_history, path=path)
+    assert again._spot["EUR"][1] == 1.25
+    assert again.history("EUR")[1].tolist() == [1.0, 1.1, 1.2]
+
+
+def _offline(spot, history=None):
+    # rates known only from the given dicts; nothing touches the network or disk
+    def quotes(symbols):
+        return {s: {"price": spot[s[:3]]} for s in symbols if s[:3] in spot}
+
+    def hist(symbol, period=None):
+        return (history or {}).get(symbol[:3])
+    return FXRates(quotes=quotes, history=hist, path=None)
+
+
+def test_unknown_currency_converts_to_nan_and_warns_once(capsys):
+    fx = _offline({"EUR": 1.1})
+    codes = np.array(["USD", "EUR", "XYZ"])
+    out = fx.convert_coded([10.0, 10.0, 10.0, 5.0], codes, np.array([0, 1, 2, 2]), to="USD")
+    assert out[:2] == pytest.approx([10.0, 11.0])
+    assert np.isnan(out[2:]).all()
+    fx.convert([1.0], ["XYZ"], to="USD")
+    assert capsys.readouterr().out.count("No FX rate for XYZ") == 1
+
+
+def test_dated_conversion_uses_the_close_on_or_before_each_day():
+    closes = pd.DataFrame({"Close": [1.20, 1.30]}, index=pd.to_datetime(["2024-01-02", "2024-01-04"]))
+    fx = _offline({"GBP": 1.40, "EUR": 1.1}, {"GBP": closes})
+    days = epoch_days(["2024-01-01", "2024-01-03", "2024-01-04", "2024-02-01", "2024-01-03"])
+    codes = np.array(["GBP", "EUR"])
+    out = fx.convert_coded(np.ones(5), codes, np.array([0, 0, 0, 0, 1]), to="USD", days=days)
+    # before the first close: earliest close; after the last one: today's spot
+    assert out == pytest.approx([1.20, 1.20, 1.30, 1.40, 1.1])
+    assert fx.convert([100.0], "GBp", to="USD") == pytest.approx([1.40])  # pence
+
+
+def test_budget_totals_leave_out_amounts_without_a_rate(tmp_path, monkeypatch):
+    import fx as fx_module
+    import data_fetch
+
+    path = tmp_path / "transactions.json"
+    path.write_text(json.dumps({
+        "2024-03-01": [{"amount": 100.0, "currency": "EUR", "category": "Pay"},
+                       {"amount": -30.0, "category": "Food"}],
+        "2024-03-02": [{"amount": -50.0, "currency": "XYZ", "category": "Travel"}],
+        "2023-03-05": [{"amount": -20.0, "category": "Food"}],
+    }))
+    monkeypatch.setattr(data_fetch, "DATA_PATH", path)
+    monkeypatch.setattr(data_fetch, "_cache", {"stamp": None, "data": {}})
+    monkeypatch.setattr(fx_module, "_fx", _offline({"EUR": 1.1}))
+
+    month = data_fetch.get_income_expenses_for_month(2024, 3, "USD")
+    assert month == pytest.approx({"income": 110.0, "expenses": 30.0})
+    daily = data_fetch.get_daily_totals_for_month(2024, 3, "USD")["values"]
+    assert daily[:3] == pytest.approx([80.0, 0.0, 0.0])
+    years = data_fetch.get_income_expenses_all_years(3, "USD")
+    assert years["income"] == pytest.approx(110.0)
+    assert years["expenses"] == pytest.approx(50.0)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import INDICATORS, IndicatorSet, bar_key, bollinger, rsi, sma
+
+
+def _closes(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2024-01-01", periods=n, tz="America/New_York")
+    return idx, 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+
+
+def _full(closes):
+    # latest values from a fresh vectorized pass over the whole history
+    idx = pd.bdate_range("2020-01-01", periods=len(closes))
+    return IndicatorSet(idx, closes, list(INDICATORS)).latest
+
+
+def test_tick_matches_a_full_recompute_for_new_and_revised_bars():
+    idx, closes = _closes()
+    s = IndicatorSet(idx, closes, list(INDICATORS))
+    day1 = idx[-1] + pd.Timedelta(days=3)
+    day2 = day1 + pd.Timedelta(days=1)
+
+    latest, new_bar = s.tick(101.0, when=day1)
+    assert new_bar
+    assert latest == pytest.approx(_full(np.append(closes, 101.0)), nan_ok=True)
+
+    latest, new_bar = s.tick(99.5, when=day1 + pd.Timedelta(hours=2))  # same bar: revises it
+    assert not new_bar
+    assert latest == pytest.approx(_full(np.append(closes, 99.5)), nan_ok=True)
+
+    latest, new_bar = s.tick(102.0, when=day2)
+    assert new_bar
+    assert latest == pytest.approx(_full(np.append(closes, [99.5, 102.0])), nan_ok=True)
+
+
+def test_vectorized_forms_match_pandas():
+    _, closes = _closes(80, seed=1)
+    c = pd.Series(closes)
+    assert np.allclose(sma(closes, 20)[19:], c.rolling(20).mean()[19:])
+    mid, upper, lower = bollinger(closes, 20, 2.0)
+    assert np.allclose((upper - mid)[19:], 2.0 * c.rolling(20).std(ddof=0)[19:])
+    delta = c.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    # pandas seeds the smoothing one bar later (its first diff is NaN); compare once both settle
+    assert np.allclose(rsi(closes, 14)[60:], (100 - 100 / (1 + gain / loss))[60:], atol=1e-6)
+    assert np.isnan(rsi(closes, 14)[:14]).all()
+
+
+def test_bar_keys():
+    t = pd.Timestamp("2024-03-05 10:07")
+    assert bar_key(t, "5m") == bar_key(pd.Timestamp("2024-03-05 10:09"), "5m")
+    assert bar_key(t, "5m") != bar_key(pd.Timestamp("2024-03-05 10:10"), "5m")
+    assert bar_key(t, "1d") == t.date()
+    assert bar_key(t, "1mo") == (2024, 3)
@@ -0,0 +1,23 @@
+import pytest
+
+from ledger import TradeLedger
+
+
+def test_specific_lot_sale_rejects_repeated_lot_ids():
+    ledger = TradeLedger()
+    ledger.record("buy", "X", 10, 1.0)
+    ledger.record("buy", "X", 10, 2.0)
+    with pytest.raises(Exception, match="more than once"):
+        ledger.record("sell", "X", 20, 3.0, method="specific", lot_ids=["X-1", "X-1"])
+    # nothing was recorded: both lots are still fully open
+    assert [l["remaining"] for l in ledger.lots["X"]] == [10, 10]
+    assert len(ledger.trades) == 2
+
+
+def test_specific_lot_sale_picks_each_lot_once():
+    ledger = TradeLedger()
+    ledger.record("buy", "X", 10, 1.0)
+    ledger.record("buy", "X", 10, 2.0)
+    trade = ledger.record("sell", "X", 15, 3.0, method="specific", lot_ids=["X-2", "X-1"])
+    assert trade["lots"] == [["X-2", 10], ["X-1", 5]]
+    assert sum(l["remaining"] for l in ledger.lots["X"]) == 5
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from live_chart import _Ring
+
+
+def test_windowed_ring_keeps_the_last_window_across_compactions():
+    ring = _Ring(np.arange(10.0), window=4)
+    assert ring.view().tolist() == [6.0, 7.0, 8.0, 9.0]
+    cap = len(ring.buf)
+    for v in range(10, 200):
+        ring.append(float(v))
+        assert ring.view().tolist() == [v - 3.0, v - 2.0, v - 1.0, float(v)]
+    assert len(ring.buf) == cap  # compacted in place, never grown
+    ring.set_last(-1.0)
+    assert ring.view().tolist() == [196.0, 197.0, 198.0, -1.0]
+
+
+def test_unbounded_ring_grows_and_keeps_everything():
+    ring = _Ring([1.0, 2.0])
+    for v in range(3, 201):
+        ring.append(float(v))
+    assert ring.view().tolist() == [float(v) for v in range(1, 201)]
+    assert len(ring.buf) >= 200
+
+
+def test_push_revises_or_appends_and_moves_limits_only_when_needed():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from live_chart import LiveChart
+
+    ax = Figure().add_subplot()
+    line, = ax.plot([0.0, 1.0, 2.0], [10.0, 11.0, 12.0])
+    ax.set_ylim(0, 20)
+    chart = LiveChart("AAA", {"Close": line}, [0.0, 1.0, 2.0], ["a", "b", "c"])
+
+    assert chart.push(2.0, {"Close": 13.0}, "c", new_bar=False) is False
+    assert list(line.get_ydata()) == [10.0, 11.0, 13.0]
+    assert chart.push(3.0, {"Close": 14.0}, "d", new_bar=True) is False
+    assert list(line.get_xdata()) == [0.0, 1.0, 2.0, 3.0]
+    assert chart.push(3.0, {"Close": 25.0}, "d", new_bar=False) is True
+    assert ax.get_ylim()[1] > 25.0
+
+
+def test_windowed_push_scrolls_the_x_range():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from live_chart import LiveChart
+
+    ax = Figure().add_subplot()
+    xs = [float(i) for i in range(10)]
+    line, = ax.plot(xs, xs)
+    chart = LiveChart("AAA", {"Close": line}, xs, [str(i) for i in range(10)], window=5)
+    assert list(line.get_xdata()) == [5.0, 6.0, 7.0, 8.0, 9.0]
+    assert chart.push(10.0, {"Close": 10.0}, "10", new_bar=True) is True
+    assert list(line.get_xdata()) == [6.0, 7.0, 8.0, 9.0, 10.0]
+    assert ax.get_xlim()[0] == 6.0
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from monte_carlo import PERCENTILES, simulate_paths, summarize
+
+PARAMS = {"drift": 0.0, "vol": 0.1, "annual_returns": None}
+
+
+def test_zero_paths_is_rejected():
+    with pytest.raises(ValueError):
+        simulate_paths(100.0, 5, 0, PARAMS, seed=1)
+    with pytest.raises(ValueError):
+        summarize(np.empty((0, 5), dtype=np.float32), 100.0, 1.0, 100.0)
+
+
+def test_final_profit_percentiles_are_in_dollars():
+    paths = np.tile(np.array([[110.0, 120.0]], dtype=np.float32), (10, 1))
+    out = summarize(paths, 100.0, 2.0, 100.0)
+    assert list(out["final_profit_percentiles"]) == list(PERCENTILES)
+    assert all(v == pytest.approx(40.0) for v in out["final_profit_percentiles"].values())
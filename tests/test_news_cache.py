@@ -0,0 +1,28 @@
+from news_cache import NewsCache
+from state_store import StateStore, load_json
+
+
+def test_saves_go_through_the_store_with_the_latest_snapshot(tmp_path):
+    path, seen_path = str(tmp_path / "news.json"), str(tmp_path / "seen.json")
+    store = StateStore(interval=60)  # nothing is written until flush()
+    cache = NewsCache(lambda t: [{"title": f"{t} story", "link": f"https://x/{t}"}],
+                      path=path, seen_path=seen_path, store=store)
+    cache.fetch("AAA")
+    cache.fetch("BBB")
+    cache.mark_seen("k1")
+    assert not (tmp_path / "seen.json").exists()  # marking seen doesn't write in the caller
+    store.flush()
+    assert sorted(load_json(path, {})) == ["AAA", "BBB"]
+    assert load_json(seen_path, []) == ["k1"]
+
+
+def test_seen_list_is_capped(tmp_path, monkeypatch):
+    import news_cache
+    monkeypatch.setattr(news_cache, "SEEN_KEEP", 2)
+    store = StateStore(interval=60)
+    cache = NewsCache(lambda t: [], path=None, seen_path=str(tmp_path / "seen.json"), store=store)
+    for key in ("a", "b", "c"):
+        cache.mark_seen(key)
+    store.flush()
+    assert load_json(str(tmp_path / "seen.json"), []) == ["b", "c"]
+    assert not cache.is_seen("a")
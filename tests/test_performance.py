@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from performance import money_weighted, performance_series
+
+
+def _trade(date, ticker, qty, price, side="buy"):
+    return {"date": date, "ticker": ticker, "qty": qty, "price": price, "side": side}
+
+
+def test_twr_ignores_the_size_of_a_mid_period_deposit():
+    prices = pd.DataFrame({"AAA": [100.0, 110.0, 110.0, 121.0]},
+                          index=pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]))
+    trades = [_trade("2024-01-02", "AAA", 10, 100.0), _trade("2024-01-04", "AAA", 10, 110.0)]
+    perf = performance_series(trades, prices)
+    assert perf["value"].tolist() == [1000.0, 1100.0, 2200.0, 2420.0]
+    assert perf["invested"].tolist() == [1000.0, 1000.0, 2100.0, 2100.0]
+    assert perf["twr"] == pytest.approx([0.0, 0.10, 0.10, 0.21])
+    assert perf["twr_annualized"] is None  # under a year
+
+
+def test_mwr_of_a_single_deposit_is_its_annualized_growth():
+    dates = np.array(["2023-01-02", "2024-01-02"], dtype="datetime64[D]")
+    flows = np.array([1000.0, 0.0])
+    years = 365 / 365.25
+    assert money_weighted(dates, flows, 1100.0) == pytest.approx(1.1 ** (1 / years) - 1, abs=1e-9)
+    assert money_weighted(dates, np.zeros(2), 1100.0) is None
+
+
+def test_sells_and_benchmark():
+    idx = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+    prices = pd.DataFrame({"AAA": [10.0, 20.0, 20.0]}, index=idx)
+    trades = [_trade("2024-01-02", "AAA", 10, 10.0), _trade("2024-01-03", "AAA", 5, 20.0, side="sell")]
+    bench = pd.Series([4000.0, 4400.0, 4200.0], index=idx)
+    perf = performance_series(trades, prices, bench)
+    assert perf["value"].tolist() == [100.0, 100.0, 100.0]
+    assert perf["twr_total"] == pytest.approx(1.0)  # doubled, then flat; the sale is a flow
+    assert perf["benchmark"] == pytest.approx([0.0, 0.10, 0.05])
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+pytest.importorskip("requests")  # the engine's pooled HTTP session
+
+from quote_engine import QuoteEngine  # noqa: E402
+
+
+class _Widget:
+    def __init__(self, destroyed=False):
+        self.destroyed = destroyed
+        self.calls = []
+
+    def after(self, ms, fn):
+        if self.destroyed:
+            raise RuntimeError("widget destroyed")
+        self.calls.append(fn)
+
+
+async def _fail():
+    raise ValueError("boom")
+
+
+def _wait(fut):
+    done = threading.Event()
+    fut.add_done_callback(lambda f: done.set())  # runs after deliver's own callback
+    assert done.wait(5)
+
+
+def test_failure_without_errback_is_logged(capsys):
+    engine = QuoteEngine()
+    try:
+        _wait(engine.deliver(_Widget(), _fail(), lambda r: None))
+        assert "boom" in capsys.readouterr().out
+    finally:
+        engine.stop()
+
+
+def test_errback_on_destroyed_widget_does_not_raise():
+    engine = QuoteEngine()
+    errors = []
+    try:
+        fut = engine.deliver(_Widget(destroyed=True), _fail(), lambda r: None, errors.append)
+        _wait(fut)
+        assert errors == []
+    finally:
+        engine.stop()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk import beta, max_drawdown, risk_report, rolling_corr, value_at_risk
+
+
+def test_max_drawdown_per_column_skips_leading_gaps():
+    p = np.array([[100.0, np.nan], [120.0, 50.0], [90.0, 40.0], [130.0, 60.0]])
+    assert max_drawdown(p) == pytest.approx([-0.25, -0.20])
+
+
+def test_beta_of_a_scaled_series():
+    rng = np.random.default_rng(0)
+    b = rng.normal(0, 0.01, 300)
+    r = np.column_stack([2 * b, -0.5 * b + 0.001])
+    r[5, 0] = np.nan  # a gap in one column only drops that row for it
+    assert beta(r, b) == pytest.approx([2.0, -0.5])
+
+
+def test_rolling_corr_matches_pandas():
+    rng = np.random.default_rng(1)
+    b = rng.normal(0, 0.01, 120)
+    r = np.column_stack([b + rng.normal(0, 0.01, 120), rng.normal(0, 0.01, 120)])
+    got = rolling_corr(r, b, window=20)
+    want = pd.DataFrame(r).rolling(20).corr(pd.Series(b)).to_numpy()
+    assert np.allclose(got[19:], want[19:])
+    assert np.isnan(got[:19]).all()
+
+
+def test_historical_var_is_the_loss_quantile():
+    r = np.linspace(-0.10, 0.09, 20)[:, None]
+    hv, hc, pv, pc = value_at_risk(r, confidence=0.90)
+    assert hv[0] == pytest.approx(-np.quantile(r, 0.10))
+    assert hc[0] == pytest.approx(-r[r <= np.quantile(r, 0.10)].mean())
+    assert pc[0] > pv[0] > 0
+
+
+def test_portfolio_row_and_beta_column():
+    idx = pd.bdate_range("2024-01-01", periods=80)
+    rng = np.random.default_rng(2)
+    bench = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, 80)), index=idx)
+    prices = pd.DataFrame({"AAA": bench * 2, "BBB": 50 * np.cumprod(1 + rng.normal(0, 0.01, 80))}, index=idx)
+    table, rolling = risk_report(prices, benchmark=bench, weights={"AAA": 1, "BBB": 1})
+    assert list(table.index) == ["AAA", "BBB", "Portfolio"]
+    assert table.loc["AAA", "Beta"] == pytest.approx(1.0)
+    assert list(rolling.columns) == ["AAA", "BBB", "Portfolio"]
@@ -0,0 +1,25 @@
+import json
+import os
+import threading
+
+from state_store import load_json, write_json
+
+
+def test_concurrent_writes_leave_one_whole_file(tmp_path):
+    path = str(tmp_path / "doc.json")
+    docs = [{"writer": i, "items": list(range(2000))} for i in range(8)]
+    threads = [threading.Thread(target=write_json, args=(path, d)) for d in docs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with open(path) as f:
+        assert json.load(f) in docs
+    assert os.listdir(tmp_path) == ["doc.json"]  # no temp files left behind
+
+
+def test_load_json_falls_back_to_default(tmp_path):
+    path = tmp_path / "bad.json"
+    assert load_json(str(path), {"x": 1}) == {"x": 1}
+    path.write_text("{not json")
+    assert load_json(str(path), []) == []
@@ -0,0 +1,24 @@
+import numpy as np
+
+from valuation import PositionBook, value_many
+
+
+def test_value_many_leaves_unpriced_tickers_out_of_cost_basis():
+    qty = [[1.0, 2.0], [3.0, 0.0]]
+    avg = [10.0, 50.0]
+    price = [12.0, np.nan]
+    out = value_many(qty, avg, price, prev=[11.0, np.nan], cash=[5.0, 0.0])
+    assert out["priced"].tolist() == [True, False]
+    assert out["market_value"].tolist() == [12.0, 36.0]
+    assert out["cost_basis"].tolist() == [10.0, 30.0]
+    assert out["unrealized"].tolist() == [2.0, 6.0]
+    assert out["day_change"].tolist() == [1.0, 3.0]
+    assert out["total_value"].tolist() == [17.0, 36.0]
+
+
+def test_value_many_matches_position_book_totals():
+    book = PositionBook(["A", "B"], [1.0, 2.0], [10.0, 50.0])
+    val = book.value({"A": {"price": 12.0}, "B": None})
+    out = value_many([[1.0, 2.0]], [10.0, 50.0], [12.0, np.nan])
+    assert out["market_value"][0] == val["totals"]["market_value"]
+    assert out["cost_basis"][0] == val["totals"]["cost_basis"]
@@ -0,0 +1,29 @@
+from watchlist import MAX_INTERVAL, RETRY_INTERVAL, Watchlist
+
+
+def test_failed_batches_back_off_until_a_quote_arrives():
+    wl = Watchlist()
+    wl.sync(["AAA", "BBB"])
+    wl.failed(["AAA"], now=100.0)
+    assert wl.items["AAA"].next_due == 100.0 + RETRY_INTERVAL
+    wl.failed(["AAA"], now=200.0)
+    assert wl.items["AAA"].next_due == 200.0 + 2 * RETRY_INTERVAL
+    assert wl.due(now=200.0) == ["BBB"]
+    for _ in range(20):
+        wl.failed(["AAA"], now=300.0)
+    assert wl.items["AAA"].next_due == 300.0 + MAX_INTERVAL
+
+    wl.apply({"AAA": {"price": 10.0, "prev_close": 9.0}}, now=400.0)
+    assert wl.items["AAA"].failures == 0
+    assert wl.items["AAA"].next_due == 400.0 + wl.items["AAA"].interval
+
+
+def test_missing_quote_counts_as_a_failure():
+    wl = Watchlist()
+    wl.sync(["AAA"])
+    wl.failed(["AAA"], now=0.0)
+    wl.failed(["AAA"], now=0.0)
+    assert wl.apply({"AAA": None}, now=100.0) == []
+    assert wl.items["AAA"].failures == 3
+    assert wl.items["AAA"].next_due == 100.0 + 4 * RETRY_INTERVAL
+    assert wl.items["AAA"].price is None
@@ -0,0 +1,53 @@
+"""
+Time Series Helpers
+- Align per-ticker close series onto one date x ticker matrix
+- Shared by the performance, risk, backtest and comparison engines
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _daily_index(series):
+    # yfinance indexes are tz-aware timestamps; compare daily bars by calendar date
+    idx = pd.DatetimeIndex(series.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize()
+
+
+def align_closes(closes, ffill=True, daily=True):
+    """Outer-join {ticker: close Series} onto a common sorted calendar.
+
+    Daily data is keyed by calendar date, gaps are forward-filled, and leading
+    gaps (before a ticker's first bar) stay NaN. Tickers with no data are dropped.
+    """
+    cols = {}
+    for t, s in closes.items():
+        if s is None or len(s) == 0:
+            continue
+        s = pd.Series(np.asarray(s, dtype=float), index=_daily_index(s) if daily else s.index)
+        cols[t] = s[~s.index.duplicated(keep="last")]
+    if not cols:
+        return pd.DataFrame()
+    frame = pd.concat(cols, axis=1, join="outer").sort_index()
+    return frame.ffill() if ffill else frame
+
+
+def returns_matrix(prices, log=False):
+    """Row-to-row returns of a price matrix (first row dropped)"""
+    values = prices.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = np.log(values[1:] / values[:-1]) if log else values[1:] / values[:-1] - 1
+    return pd.DataFrame(rets, index=prices.index[1:], columns=prices.columns)
+
+
+def period_for_start(start, today=None):
+    """Smallest yfinance period string that covers history back to start"""
+    today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+    days = (today - pd.Timestamp(start).normalize()).days
+    for period, span in (("1mo", 30), ("3mo", 91), ("6mo", 182), ("1y", 365),
+                         ("2y", 730), ("5y", 1826), ("10y", 3652)):
+        if days <= span - 5:
+            return period
+    return "max"
@@ -0,0 +1,126 @@
+"""
+UI Stall Watchdog
+- A Tk after() probe fires every interval; how late it fires is the event-loop lag
+- A monitor thread notices when the probe stops firing and samples the Tk thread's
+  stack while it is still stuck, so the log shows what blocked the UI
+- Every probe lands in the "ui.lag" histogram (not the trace, which it would flood);
+  stalls over the threshold are traced, printed and kept for the Diagnostics panel ("ui.stall")
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from metrics import registry
+
+PROBE_MS = 100
+STALL_MS = 250
+KEEP_STALLS = 50
+STDLIB = os.path.dirname(os.__file__)
+
+
+class StallWatchdog:
+    def __init__(self, root, interval_ms=PROBE_MS, threshold_ms=STALL_MS, log=print):
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.log = log
+        self.stalls = deque(maxlen=KEEP_STALLS)  # {"time", "ms", "where", "stack"} newest last
+        self._tk_thread = threading.get_ident()  # started from the thread that runs mainloop
+        self._lock = threading.Lock()
+        self._due = None  # perf_counter time the pending probe should fire
+        self._stack = None  # Tk-thread frames sampled during the current stall
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._schedule()
+        threading.Thread(target=self._monitor, name="ui-watchdog", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+
+    # -------------------------
+    # Tk side
+    # -------------------------
+    def _schedule(self):
+        with self._lock:
+            self._due = time.perf_counter() + self.interval
+        try:
+            self.root.after(int(self.interval * 1000), self._probe)
+        except Exception:
+            self._running = False  # root destroyed
+
+    def _probe(self):
+        if not self._running:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            due, stack, self._stack = self._due, self._stack, None
+        lag = max(now - due, 0.0)
+        # every probe feeds the lag histogram; only stalls become trace events
+        registry.record("ui.lag", int(due * 1e9), int(now * 1e9), trace=False)
+        if lag >= self.threshold:
+            self._report(due, now, stack)
+        self._schedule()
+
+    def _report(self, due, now, stack):
+        ms = (now - due) * 1000
+        registry.record("ui.stall", int(due * 1e9), int(now * 1e9), args={"where": _top(stack)})
+        lines = stack.format() if stack else []
+        self.stalls.append({"time": time.strftime("%H:%M:%S"), "ms": ms, "where": _top(stack), "stack": lines})
+        if self.log:
+            where = "".join(lines) if lines else "  (no stack captured)\n"
+            self.log(f"UI stall: event loop blocked {ms:,.0f} ms\n{where}".rstrip())
+
+    # -------------------------
+    # Monitor thread
+    # -------------------------
+    def _monitor(self):
+        # poll at a fraction of the threshold so the sample lands while the UI is still stuck
+        step = min(self.interval, self.threshold) / 2
+        while self._running:
+            time.sleep(step)
+            with self._lock:
+                late = self._due is not None and time.perf_counter() - self._due >= self.threshold
+                if not late or self._stack is not None:
+                    continue
+            frame = sys._current_frames().get(self._tk_thread)
+            stack = traceback.extract_stack(frame) if frame is not None else None
+            with self._lock:
+                if self._stack is None:
+                    self._stack = stack
+
+
+def _top(stack):
+    # innermost frame of the app's own code, e.g. "Investment.py:1812 _refresh_port_ui"
+    frames = list(stack or [])
+    for f in reversed(frames):
+        if f.filename.startswith(STDLIB) or "site-packages" in f.filename:
+            continue
+        return f"{os.path.basename(f.filename)}:{f.lineno} {f.name}"
+    return f"{os.path.basename(frames[-1].filename)}:{frames[-1].lineno} {frames[-1].name}" if frames else None
+
+
+# ---------------------------
+# Shared watchdog
+# ---------------------------
+_watchdog = None
+
+
+def watch(root, **kwargs):
+    """Start the process-wide watchdog on the Tk root that runs mainloop (first call wins)"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = StallWatchdog(root, **kwargs).start()
+    return _watchdog
+
+
+def recent_stalls():
+    return list(_watchdog.stalls) if _watchdog is not None else []
@@ -0,0 +1,160 @@
+"""
+Portfolio Valuation Engine
+- Positions held as aligned NumPy arrays (tickers, qty, avg cost)
+- Market value, unrealized P&L, weights and day change for the whole book in one pass
+- Many simulated portfolios valued at once against the same quote snapshot
+"""
+
+import numpy as np
+
+from fx import BASE
+
+
+def quote_arrays(tickers, quotes):
+    """Aligned (price, prev_close) arrays for tickers; NaN where no quote"""
+    n = len(tickers)
+    price = np.full(n, np.nan)
+    prev = np.full(n, np.nan)
+    for i, t in enumerate(tickers):
+        q = quotes.get(t)
+        if not q:
+            continue
+        if q.get("price") is not None:
+            price[i] = q["price"]
+        if q.get("prev_close") is not None:
+            prev[i] = q["prev_close"]
+    return price, prev
+
+
+def rate_array(currencies, rates):
+    """Per-row conversion factors from a {currency: rate} mapping; NaN where no rate"""
+    codes, inv = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+    return np.array([rates.get(c, np.nan) for c in codes], dtype=float)[inv]
+
+
+class PositionBook:
+    def __init__(self, tickers, qty, avg, currency=None):
+        self.tickers = list(tickers)
+        self.qty = np.asarray(qty, dtype=float)
+        self.avg = np.asarray(avg, dtype=float)
+        # currency each position's avg cost is in (quotes may override it for prices)
+        self.currency = list(currency) if currency is not None else [BASE] * len(self.tickers)
+
+    @classmethod
+    def from_positions(cls, positions):
+        """Build from the portfolio.json {ticker: {"qty", "avg", "currency"}} mapping"""
+        tickers = list(positions)
+        qty = [positions[t]["qty"] for t in tickers]
+        avg = [positions[t]["avg"] for t in tickers]
+        currency = [positions[t].get("currency") or BASE for t in tickers]
+        return cls(tickers, qty, avg, currency)
+
+    def currencies(self, quotes=None):
+        """Currencies whose rates value() needs: positions' plus any the quotes report"""
+        quoted = [(q or {}).get("currency") for q in (quotes or {}).values()]
+        return sorted(set(self.currency) | {c for c in quoted if c})
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def value(self, quotes, cash=0.0, rates=None, cash_currency=None, currency=None):
+        """Value the book against a {ticker: quote} snapshot.
+
+        rates ({currency: units of the reporting currency per unit}, see fx.FXRates.rates)
+        converts prices, costs and cash; cost basis uses today's rate. Without rates
+        everything is taken to be in one currency. Positions with no rate count as unpriced.
+        """
+        price, prev = quote_arrays(self.tickers, quotes)
+        avg = self.avg
+        if rates is not None:
+            quoted = [(quotes.get(t) or {}).get("currency") or c for t, c in zip(self.tickers, self.currency)]
+            fx = rate_array(quoted, rates)
+            price, prev = price * fx, prev * fx
+            avg = avg * rate_array(self.currency, rates)
+            cash = float(cash) * rates.get(cash_currency or BASE, np.nan)
+        priced = ~np.isnan(price)
+        market_value = np.where(priced, self.qty * price, np.nan)
+        cost_basis = self.qty * avg
+        unrealized = market_value - cost_basis
+        with np.errstate(divide="ignore", invalid="ignore"):
+            unrealized_pct = np.where(cost_basis > 0, unrealized / cost_basis * 100, np.nan)
+            day_change = self.qty * (price - prev)
+            day_change_pct = (price - prev) / prev * 100
+        total_mv = float(np.nansum(market_value))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = market_value / total_mv * 100 if total_mv else np.full(len(self), np.nan)
+
+        return {
+            "tickers": self.tickers,
+            "qty": self.qty,
+            "avg": avg,
+            "currency": currency or cash_currency or BASE,
+            "price": price,
+            "priced": priced,
+            "market_value": market_value,
+            "cost_basis": cost_basis,
+            "unrealized": unrealized,
+            "unrealized_pct": unrealized_pct,
+            "weight": weight,
+            "day_change": day_change,
+            "day_change_pct": day_change_pct,
+            "totals": {
+                "cash": float(cash),
+                "market_value": total_mv,
+                "cost_basis": float(cost_basis[priced].sum()),
+                "unrealized": float(np.nansum(unrealized)),
+                "day_change": float(np.nansum(day_change)),
+                "total_value": float(cash) + total_mv,
+                "unpriced": [t for t, ok in zip(self.tickers, priced) if not ok],
+            },
+        }
+
+
+def value_many(qty_matrix, avg, price, prev=None, cash=None):
+    """Value many portfolios over the same tickers at once.
+
+    qty_matrix is (portfolios x tickers); avg/price/prev are per-ticker arrays.
+    Returns per-portfolio arrays. Unpriced tickers are left out of both market value
+    and cost basis, as in PositionBook.value, so they don't show up as losses.
+    """
+    q = np.asarray(qty_matrix, dtype=float)
+    px = np.asarray(price, dtype=float)
+    priced = ~np.isnan(px)
+    held = q[:, priced]
+    market_value = held @ px[priced]
+    cost_basis = held @ np.asarray(avg, dtype=float)[priced]
+    out = {
+        "priced": priced,
+        "market_value": market_value,
+        "cost_basis": cost_basis,
+        "unrealized": market_value - cost_basis,
+    }
+    if prev is not None:
+        delta = px - np.asarray(prev, dtype=float)
+        moved = ~np.isnan(delta)
+        out["day_change"] = q[:, moved] @ delta[moved]
+    if cash is not None:
+        out["total_value"] = market_value + np.asarray(cash, dtype=float)
+    return out
+
+
+def valuation_rows(val):
+    """JSON-friendly per-position rows plus totals (NaN -> None)"""
+    def num(x):
+        x = float(x)
+        return None if np.isnan(x) else x
+
+    rows = []
+    for i, t in enumerate(val["tickers"]):
+        rows.append({
+            "ticker": t,
+            "qty": num(val["qty"][i]),
+            "avg": num(val["avg"][i]),
+            "price": num(val["price"][i]),
+            "market_value": num(val["market_value"][i]),
+            "unrealized": num(val["unrealized"][i]),
+            "unrealized_pct": num(val["unrealized_pct"][i]),
+            "weight": num(val["weight"][i]),
+            "day_change": num(val["day_change"][i]),
+        })
+    return {"currency": val.get("currency", BASE), "positions": rows, "totals": val["totals"]}
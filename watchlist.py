@@ -0,0 +1,156 @@
+"""
+Watchlist Engine
+- Keeps live quotes for every favorite using batched polls
+- Per-ticker refresh interval adapts to market hours and recent volatility
+- Backs off while the window is hidden, and exponentially after failed batches
+- Short price history per ticker for sparklines
+"""
+
+import math
+import time
+from collections import deque
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+
+# ---------------------------
+# Config / Constants
+# ---------------------------
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+OPEN_INTERVAL = 10  # base seconds between polls while the market is open
+CLOSED_INTERVAL = 300  # base seconds between polls outside market hours
+MIN_INTERVAL = 5
+MAX_INTERVAL = 1800
+HIDDEN_FACTOR = 6  # poll this much slower while the window is hidden
+RETRY_INTERVAL = 15  # first retry after a failed batch; doubles per failure up to MAX_INTERVAL
+VOL_REFERENCE = 0.002  # per-poll move (0.2%) that keeps the base interval
+SPARK_POINTS = 24
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def market_is_open(now=None):
+    """True during regular US equity hours (weekdays 9:30-16:00 New York)"""
+    now = now or datetime.now(MARKET_TZ)
+    now = now.astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def sparkline(values):
+    """Render a sequence of prices as unicode block characters"""
+    values = list(values)
+    if len(values) < 2:
+        return ""
+    lo, hi = min(values), max(values)
+    if hi == lo:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (hi - lo)
+    return "".join(SPARK_CHARS[int((v - lo) * scale)] for v in values)
+
+
+class WatchItem:
+    __slots__ = ("symbol", "price", "prev_close", "history", "interval", "next_due", "row", "failures")
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.price = None
+        self.prev_close = None
+        self.history = deque(maxlen=SPARK_POINTS)
+        self.interval = MIN_INTERVAL
+        self.next_due = 0.0  # poll immediately
+        self.row = None  # last rendered row, used to skip unchanged redraws
+        self.failures = 0  # failed batches in a row
+
+    def volatility(self):
+        """Std dev of relative moves between recent polls"""
+        h = self.history
+        if len(h) < 3:
+            return None
+        moves = [(b - a) / a for a, b in zip(h, list(h)[1:]) if a]
+        if len(moves) < 2:
+            return None
+        mean = sum(moves) / len(moves)
+        return math.sqrt(sum((m - mean) ** 2 for m in moves) / (len(moves) - 1))
+
+    def render(self):
+        """(price, change, sparkline) display strings"""
+        if self.price is None:
+            return ("--", "--", "")
+        change = ""
+        if self.prev_close:
+            diff = self.price - self.prev_close
+            change = f"{diff:+,.2f} ({diff / self.prev_close * 100:+.2f}%)"
+        return (f"{self.price:,.2f}", change, sparkline(self.history))
+
+
+class Watchlist:
+    def __init__(self, open_interval=OPEN_INTERVAL, closed_interval=CLOSED_INTERVAL):
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.items = {}
+
+    def sync(self, symbols):
+        """Track exactly these symbols, keeping state for ones already tracked"""
+        symbols = list(dict.fromkeys(symbols))
+        for s in list(self.items):
+            if s not in symbols:
+                del self.items[s]
+        for s in symbols:
+            if s not in self.items:
+                self.items[s] = WatchItem(s)
+
+    def interval_for(self, item, market_open, hidden=False):
+        base = self.open_interval if market_open else self.closed_interval
+        vol = item.volatility()
+        if vol is not None:
+            # calm tickers slow down (up to 2x), jumpy ones speed up (down to 1/4)
+            base *= min(2.0, max(0.25, VOL_REFERENCE / vol if vol > 0 else 2.0))
+        if hidden:
+            base *= HIDDEN_FACTOR
+        return min(MAX_INTERVAL, max(MIN_INTERVAL, base))
+
+    def due(self, now=None):
+        """Symbols whose next poll time has passed"""
+        now = time.monotonic() if now is None else now
+        return [s for s, it in self.items.items() if it.next_due <= now]
+
+    def seconds_until_due(self, now=None):
+        if not self.items:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(it.next_due for it in self.items.values()) - now)
+
+    def apply(self, quotes, hidden=False, now=None):
+        """Fold a batch of quotes in, reschedule, and return symbols whose row changed;
+        symbols that came back without a price back off as in failed()"""
+        now = time.monotonic() if now is None else now
+        market_open = market_is_open()
+        changed = []
+        for s, q in quotes.items():
+            it = self.items.get(s)
+            if it is None:
+                continue  # removed while the batch was in flight
+            if not q or q.get("price") is None:
+                self.failed([s], now)  # the engine returns None for a failed fetch
+                continue
+            it.price = q["price"]
+            it.prev_close = q.get("prev_close") or it.prev_close
+            it.history.append(q["price"])
+            it.failures = 0
+            it.interval = self.interval_for(it, market_open, hidden)
+            it.next_due = now + it.interval
+            row = it.render()
+            if row != it.row:
+                it.row = row
+                changed.append(s)
+        return changed
+
+    def failed(self, symbols, now=None):
+        """A batch for symbols failed: push their polls back, doubling the wait each time"""
+        now = time.monotonic() if now is None else now
+        for s in symbols:
+            it = self.items.get(s)
+            if it is None:
+                continue
+            it.failures += 1
+            it.next_due = now + min(MAX_INTERVAL, RETRY_INTERVAL * 2 ** (it.failures - 1))